@@ -1,8 +1,4 @@
-import json
-
-# Load existing data
-with open('pe_firms_database.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+from atomic_write import update_json
 
 # New firms to add
 new_firms = {
@@ -81,12 +77,13 @@ new_firms = {
     }
 }
 
-# Add new firms
-data['pe_firms'].update(new_firms)
+def add_firms(data):
+    data['pe_firms'].update(new_firms)
+    return data
+
 
-# Save updated data
-with open('pe_firms_database.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+# Add the new firms under the file's write lock
+data = update_json('pe_firms_database.json', add_firms)
 
 print("✅ Added new PE firms: CapMan, Celero, Polaris")
 print(f"Total PE firms: {len(data['pe_firms'])}")
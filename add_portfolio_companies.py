@@ -1,8 +1,4 @@
-import json
-
-# Load existing portfolio
-with open('portfolio_enriched.json', 'r', encoding='utf-8') as f:
-    portfolio_data = json.load(f)
+from atomic_write import update_json
 
 # Add portfolio companies for new firms
 new_companies = {
@@ -37,21 +33,26 @@ new_companies = {
     ]
 }
 
-# Add companies to portfolio (skip duplicates)
-existing_keys = {(c.get('company'), c.get('source')) for c in portfolio_data['companies']}
 added = 0
-for firm, companies in new_companies.items():
-    for company in companies:
-        company['source'] = firm
-        key = (company.get('company'), firm)
-        if key not in existing_keys:
-            portfolio_data['companies'].append(company)
-            existing_keys.add(key)
-            added += 1
 
-# Save updated portfolio
-with open('portfolio_enriched.json', 'w', encoding='utf-8') as f:
-    json.dump(portfolio_data, f, indent=2, ensure_ascii=False)
+
+def add_companies(portfolio_data):
+    """Add companies to portfolio (skip duplicates)."""
+    global added
+    existing_keys = {(c.get('company'), c.get('source')) for c in portfolio_data['companies']}
+    for firm, companies in new_companies.items():
+        for company in companies:
+            company['source'] = firm
+            key = (company.get('company'), firm)
+            if key not in existing_keys:
+                portfolio_data['companies'].append(company)
+                existing_keys.add(key)
+                added += 1
+    return portfolio_data
+
+
+# Load, update and save the portfolio under its write lock
+portfolio_data = update_json('portfolio_enriched.json', add_companies)
 
 print(f"✅ Added {added} new portfolio companies (skipped duplicates)")
 print(f"Total companies in portfolio: {len(portfolio_data['companies'])}")
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Add company descriptions for Trill Impact portfolio companies."""
 
-import json
 import os
 
+from atomic_write import update_json
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, 'portfolio_enriched.json')
 
@@ -31,26 +32,26 @@ TRILL_DESCRIPTIONS = {
 }
 
 def main():
-    with open(DATA_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    companies = data.get('companies', [])
     updated = 0
-    
-    for c in companies:
-        if c.get('source') != 'Trill Impact':
-            continue
-        name = c.get('company', '')
-        desc = TRILL_DESCRIPTIONS.get(name)
-        if desc:
-            existing = c.get('detailed_description', '') or c.get('description', '')
-            if not existing or len(existing) < 50:
-                c['detailed_description'] = desc
-                updated += 1
-                print(f"  Added description for {name}")
-    
-    with open(DATA_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def add_descriptions(data):
+        nonlocal updated
+        companies = data.get('companies', [])
+
+        for c in companies:
+            if c.get('source') != 'Trill Impact':
+                continue
+            name = c.get('company', '')
+            desc = TRILL_DESCRIPTIONS.get(name)
+            if desc:
+                existing = c.get('detailed_description', '') or c.get('description', '')
+                if not existing or len(existing) < 50:
+                    c['detailed_description'] = desc
+                    updated += 1
+                    print(f"  Added description for {name}")
+        return data
+
+    update_json(DATA_PATH, add_descriptions)
     
     print(f"\nUpdated {updated} Trill Impact company descriptions.")
 
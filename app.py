@@ -6,14 +6,28 @@ It handles requests from your browser and serves web pages.
 """
 # Updated: Added 45+ Swedish AI news (Klarna, H&M, Spotify, Scania, Volvo, Nordea, etc.); Enhanced cards with company logos & colored borders
 
-from flask import Flask, render_template, jsonify, request, abort, redirect, flash
+from flask import Flask, render_template, jsonify, request, abort, redirect, flash, send_file
+from contextlib import nullcontext
 from datetime import datetime, timezone, timedelta
+import gc
+import hashlib
+import heapq
 import json
 import os
+import re
 from scraper import MAScraper
 import subprocess
 import sys
+import time
 from forum_feature import forum_bp, init_forum_db, log_page_view
+from geoip import geoip
+from data_store import DatasetStore, MaterializedView, file_signature, freeze
+from signup_log import signups
+from search_index import SearchIndex
+from search_index_file import SearchIndexFile
+from http_cache import ConditionalGet
+from deal_store import DEAL_FLOW_COLUMNS, DEALS_DATA_COLUMNS, DealTable, parse_date_bound
+from sqlite_store import SqliteStore
 
 # Create a Flask application
 # Flask is a framework that helps create web applications easily
@@ -26,21 +40,34 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 def data_path(filename):
     return os.path.join(BASE_DIR, filename)
 
-PLATFORM_SIGNUPS_FILE = data_path("platform_signups.json")
+# Parsed JSON databases, shared by all handlers in this worker (re-parsed only when the file changes).
+# Parse results are pickled per file content for fast cold starts:
+# DATASET_SNAPSHOTS=0 turns that off, DATASET_SNAPSHOTS=mmap reads snapshots through a shared mmap.
+DATASET_SNAPSHOTS = os.environ.get('DATASET_SNAPSHOTS', '1').strip().lower()
+datasets = DatasetStore(
+    BASE_DIR,
+    snapshot_dir=None if DATASET_SNAPSHOTS in ('0', 'false', 'no', 'off') else os.environ.get(
+        'DATASET_SNAPSHOT_DIR', os.path.join(BASE_DIR, '.dataset_snapshots')),
+    snapshot_mmap=DATASET_SNAPSHOTS == 'mmap',
+)
+# Optional SQLite copy of the databases for indexed queries (DATA_BACKEND=sqlite).
+# The JSON files stay the source of truth; changed files are re-synced on the next query.
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'json').strip().lower()
+sqlite_store = SqliteStore(
+    os.environ.get('SQLITE_DATA_PATH', data_path('data.sqlite3')), datasets,
+) if DATA_BACKEND == 'sqlite' else None
+# ETag / Last-Modified / 304 for read APIs, keyed on the dataset files each one reads;
+# cache=True also keeps the serialized (and gzip/brotli) body for the current version
+conditional_get = ConditionalGet(datasets, salt=file_signature(os.path.abspath(__file__)))
+
 
 # Fixed offer end (UTC) - does not restart on refresh. Override with env OFFER_END_ISO if needed.
 OFFER_END_ISO = os.environ.get("OFFER_END_ISO", "2025-12-31T23:59:59Z")
 
 def save_platform_signup_json(email):
-    """Append email to platform_signups.json. Simple file-based storage."""
+    """Append email to the platform signup log (platform_signups.jsonl, one line per signup)."""
     try:
-        data = []
-        if os.path.exists(PLATFORM_SIGNUPS_FILE):
-            with open(PLATFORM_SIGNUPS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        data.append({"email": email.strip().lower(), "created_at": datetime.now(timezone.utc).isoformat()})
-        with open(PLATFORM_SIGNUPS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        signups.append(email.strip().lower(), datetime.now(timezone.utc).isoformat())
         return True
     except Exception:
         return False
@@ -48,6 +75,8 @@ def save_platform_signup_json(email):
 # This will store our news articles in memory
 # In a real application, you'd use a database (we'll keep it simple for beginners)
 news_storage = []
+# Bumped whenever news_storage changes (keeps the news search index in sync)
+news_version = 0
 
 # This will store portfolio companies
 portfolio_storage = []
@@ -56,16 +85,16 @@ portfolio_storage = []
 # Load news from database file at startup
 def load_news_database():
     """Load news articles from ma_news_database.json into memory"""
-    global news_storage
+    global news_storage, news_version
     try:
         if os.path.exists(data_path('ma_news_database.json')):
-            with open(data_path('ma_news_database.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if 'articles' in data:
-                    news_storage = data['articles']
-                    print(f"Loaded {len(news_storage)} news articles from database")
-                else:
-                    print("No articles found in database file")
+            data = datasets.get('ma_news_database.json')
+            if 'articles' in data:
+                news_storage = list(data['articles'])
+                news_version += 1
+                print(f"Loaded {len(news_storage)} news articles from database")
+            else:
+                print("No articles found in database file")
         else:
             print("ma_news_database.json not found")
     except Exception as e:
@@ -78,13 +107,12 @@ def load_portfolio_database():
     try:
         # Load from enriched database first
         if os.path.exists(data_path('portfolio_enriched.json')):
-            with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                portfolio_storage = data.get('companies', [])
-                print(f"Loaded {len(portfolio_storage)} portfolio companies from enriched database")
-                valedo_count = len([c for c in portfolio_storage if c.get('source') == 'Valedo Partners'])
-                verdane_count = len([c for c in portfolio_storage if c.get('source') == 'Verdane'])
-                print(f"   Valedo Partners: {valedo_count}, Verdane: {verdane_count}")
+            data = datasets.get('portfolio_enriched.json')
+            portfolio_storage = list(data.get('companies', []))
+            print(f"Loaded {len(portfolio_storage)} portfolio companies from enriched database")
+            valedo_count = len([c for c in portfolio_storage if c.get('source') == 'Valedo Partners'])
+            verdane_count = len([c for c in portfolio_storage if c.get('source') == 'Verdane'])
+            print(f"   Valedo Partners: {valedo_count}, Verdane: {verdane_count}")
         # Fallback to old database
         elif os.path.exists(data_path(data_path('portfolio_complete.json'))):
             with open(data_path(data_path('portfolio_complete.json')), 'r', encoding='utf-8') as f:
@@ -197,13 +225,13 @@ def _overlay_enriched_onto_row(row, enriched):
 
 
 def _fresh_portfolio_list():
-    """Always read latest companies from portfolio_enriched.json."""
-    if os.path.exists(data_path('portfolio_enriched.json')):
-        try:
-            with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                return json.load(f).get('companies', [])
-        except Exception:
-            pass
+    """Latest companies from portfolio_enriched.json (re-parsed only when the file changed)."""
+    try:
+        data = datasets.get('portfolio_enriched.json', None)
+        if data is not None:
+            return data.get('companies', [])
+    except Exception:
+        pass
     return list(portfolio_storage)
 
 
@@ -213,12 +241,20 @@ def _merged_portfolio_companies(portfolio_storage_local=None):
     plus portfolio_companies from pe_firms_database for those sources.
     Curated rows are overlaid with portfolio_enriched (financials, metrics, revenue).
     Used so /api/company/<slug> resolves the same row the portfolio table shows.
+
+    Without an explicit list this returns the shared, read-only materialized view
+    (rebuilt only when portfolio_enriched.json or pe_firms_database.json changes).
     """
     if portfolio_storage_local is None:
-        portfolio_storage_local = []
+        return portfolio_view.get()['companies']
+    return _build_merged_portfolio_companies(portfolio_storage_local)
+
+
+def _build_merged_portfolio_companies(portfolio_storage_local=None):
+    """Build the merged portfolio list from scratch (see _merged_portfolio_companies)."""
+    if portfolio_storage_local is None:
         if os.path.exists(data_path('portfolio_enriched.json')):
-            with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                portfolio_storage_local = json.load(f).get('companies', [])
+            portfolio_storage_local = datasets.get('portfolio_enriched.json').get('companies', [])
         else:
             portfolio_storage_local = list(portfolio_storage)
 
@@ -238,20 +274,19 @@ def _merged_portfolio_companies(portfolio_storage_local=None):
             final_companies.append(c)
 
     if os.path.exists(data_path('pe_firms_database.json')):
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as pf:
-            pe_data = json.load(pf)
-            pe_firms = pe_data.get('pe_firms', {})
-            for firm_name in _CURATED_PORTFOLIO_FIRM_SOURCES:
-                if firm_name in pe_firms:
-                    firm_metadata = pe_firms[firm_name]
-                    if firm_metadata.get('portfolio_companies'):
-                        for pc in firm_metadata['portfolio_companies']:
-                            row = company_dict_from_pe_firms_portfolio_pc(pc, firm_name)
-                            name = (row.get('company') or '').strip()
-                            enriched = enriched_by_name.get(name) or enriched_by_lower.get(name.lower())
-                            row = _overlay_enriched_onto_row(row, enriched)
-                            final_companies.append(row)
-                            seen_curated.add((name, firm_name))
+        pe_data = datasets.get('pe_firms_database.json')
+        pe_firms = pe_data.get('pe_firms', {})
+        for firm_name in sorted(_CURATED_PORTFOLIO_FIRM_SOURCES):
+            if firm_name in pe_firms:
+                firm_metadata = pe_firms[firm_name]
+                if firm_metadata.get('portfolio_companies'):
+                    for pc in firm_metadata['portfolio_companies']:
+                        row = company_dict_from_pe_firms_portfolio_pc(pc, firm_name)
+                        name = (row.get('company') or '').strip()
+                        enriched = enriched_by_name.get(name) or enriched_by_lower.get(name.lower())
+                        row = _overlay_enriched_onto_row(row, enriched)
+                        final_companies.append(row)
+                        seen_curated.add((name, firm_name))
 
     # Enriched-only curated companies (e.g. scraped financials not yet in pe_firms list)
     for company in portfolio_storage_local:
@@ -314,10 +349,29 @@ def company_dict_from_pe_firms_portfolio_pc(pc, firm_name):
     }
 
 
-# Load news and portfolio on startup
-load_news_database()
-load_portfolio_database()
-init_forum_db()
+def _build_portfolio_view():
+    """Everything derived from the merged portfolio list, built once per data version."""
+    port_list = _fresh_portfolio_list()
+    companies = freeze(_build_merged_portfolio_companies(port_list))
+    pe_firms = datasets.get('pe_firms_database.json', {}).get('pe_firms', {})
+    return {
+        'companies': companies,
+        'slug_index': _CompanySlugIndex(port_list, companies, pe_firms),
+        'neighbors': _CompanyNeighborIndex(companies),
+        'search': _build_global_search_engine(pe_firms, companies),
+        'portfolio_search': _build_search_domain_index('portfolio', companies),
+        'table': _PortfolioTable(companies),
+    }
+
+
+portfolio_view = MaterializedView(
+    datasets,
+    ('portfolio_enriched.json', 'pe_firms_database.json'),
+    _build_portfolio_view,
+    name='Portfolio view',
+)
+
+
 app.register_blueprint(forum_bp)
 
 
@@ -333,8 +387,7 @@ def _embedded_search_firms():
 
     firms = []
     try:
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as f:
-            pe_firms = json.load(f).get('pe_firms', {})
+        pe_firms = datasets.get('pe_firms_database.json').get('pe_firms', {})
         for key, firm in pe_firms.items():
             name = (firm.get('name') or key).strip()
             hq = (firm.get('headquarters') or '').strip()
@@ -363,6 +416,7 @@ def _inject_template_globals():
     return {
         'current_year': datetime.now().year,
         'static_version': os.environ.get('STATIC_VERSION', '20260527e'),
+        'search_index_file': _search_index_filename,
     }
 
 
@@ -693,19 +747,196 @@ def legacy_test_redirect():
     return redirect('/transactions', code=301)
 
 
+_DEAL_FILTER_COLUMNS = ('investor', 'industry', 'country', 'strategy', 'deal_type', 'status')
+# /api/deal-flow keeps the field names of its records as query args
+_DEAL_FLOW_FILTER_ARGS = {
+    'pe_firm': 'investor',
+    'sector': 'industry',
+    'geography': 'country',
+    'strategy': 'strategy',
+    'deal_type': 'deal_type',
+    'status': 'status',
+}
+_DEAL_FLOW_QUERY_ARGS = tuple(_DEAL_FLOW_FILTER_ARGS) + ('from', 'to', 'q', 'sort', 'limit', 'cursor')
+_LEAGUE_TABLE_QUERY_ARGS = ('dataset', 'group', 'from', 'to', 'limit') + _DEAL_FILTER_COLUMNS
+
+
+# Typed, columnar copies of the deal datasets (deal_store.py), rebuilt when the file changes
+deal_tables = {
+    'deal_flow': MaterializedView(
+        datasets, ('deal_flow_database.json',),
+        lambda: DealTable(datasets.get('deal_flow_database.json').get('deals', []), DEAL_FLOW_COLUMNS),
+        name='Deal flow table',
+    ),
+    'deals_data': MaterializedView(
+        datasets, ('deals_data.json',),
+        lambda: DealTable(datasets.get('deals_data.json'), DEALS_DATA_COLUMNS),
+        name='Deals data table',
+    ),
+}
+
+
+def _deal_tables_version(*names):
+    """
+    version= for conditional_get over deal_tables: the source versions the served tables
+    were built from (a table keeps serving the previous file version while it rebuilds).
+    """
+    def version():
+        if sqlite_store is not None:
+            return tuple(sqlite_store.source_version(name)[0] for name in names)  # synced in the background
+        versions = []
+        for name in names:
+            try:
+                deal_tables[name].get()
+            except Exception:
+                versions.append(None)
+                continue
+            versions.append(deal_tables[name].version)
+        return tuple(versions)
+    return version
+
+
 @app.route('/api/deal-flow', methods=['GET'])
+@conditional_get(
+    'deal_flow_database.json', version=_deal_tables_version('deal_flow'), args=_DEAL_FLOW_QUERY_ARGS, cache=True,
+)
 def get_deal_flow():
     """
-    Get all deals from deal flow database
+    Get all deals from deal flow database.
+
+    With any of from, to, pe_firm, sector, geography, strategy, deal_type, status
+    (comma-separated), q, sort (-date|date|-size|size), limit or cursor, returns one
+    page of matching deals plus `total` and `next_cursor` instead.
+    Example: /api/deal-flow?status=Completed&from=2024&q=software&sort=-date&limit=50
     """
+    if any(request.args.get(k) for k in _DEAL_FLOW_QUERY_ARGS):
+        return _query_deal_flow()
     try:
-        with open(data_path('deal_flow_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'deals': data.get('deals', []),
-                'metadata': data.get('metadata', {})
-            })
+        data = datasets.get('deal_flow_database.json')
+        return jsonify({
+            'success': True,
+            'deals': data.get('deals', []),
+            'metadata': data.get('metadata', {})
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+def _deal_cursor_tag(version):
+    """Short digest of the deal data version a /api/deal-flow cursor was issued on."""
+    return hashlib.sha1(repr(version).encode('utf-8')).hexdigest()[:10]
+
+
+def _query_deal_flow():
+    """Filtered, sorted, cursor-paginated page of /api/deal-flow (see get_deal_flow)."""
+    sort = request.args.get('sort') or '-date'
+    if sort not in DealTable.SORTS:
+        return jsonify({'success': False, 'message': f"sort must be one of: {', '.join(DealTable.SORTS)}"}), 400
+    try:
+        start, end, filters = _deal_filter_args(_DEAL_FLOW_FILTER_ARGS)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        after = cursor_tag = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            cursor_sort, value, cursor_tag = cursor.split(':') if cursor.count(':') == 2 else ('', '', '')
+            if cursor_sort != sort:
+                raise ValueError('cursor does not belong to this sort order')
+            after = int(value)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    try:
+        q = (request.args.get('q') or '').strip()
+        # One SQLite read snapshot, so the cursor tag, bounds and page all come from the same copy
+        with sqlite_store.reading('deal_flow') if sqlite_store is not None else nullcontext():
+            # Cursors are row positions, so they are only valid for the data version they were issued on
+            if sqlite_store is not None:
+                version, rows = sqlite_store.source_version('deal_flow')
+            else:
+                version, table = deal_tables['deal_flow'].snapshot()
+                rows = len(table)
+            tag = _deal_cursor_tag(version)
+            if after is not None and (cursor_tag != tag or not 0 <= after < rows):
+                return jsonify({
+                    'success': False,
+                    'message': 'cursor is out of range or the deals changed since it was issued; start from the first page',
+                }), 400
+            if sqlite_store is not None:
+                deals, total, next_after = sqlite_store.deal_page('deal_flow', start, end, filters, q, sort, after, limit)
+            else:
+                mask = table.where(start, end, **filters)
+                if q:
+                    mask &= table.text_mask(q)
+                positions, next_after = table.page(mask, sort, after, limit)
+                deals = [table.records[pos] for pos in positions]
+                total = mask.bit_count()
+        return jsonify({
+            'success': True,
+            'deals': deals,
+            'count': len(deals),
+            'total': total,
+            'next_cursor': f'{sort}:{next_after}:{tag}' if next_after is not None else None,
+            'metadata': datasets.get('deal_flow_database.json').get('metadata', {}),
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+def _deal_filter_args(arg_columns=None):
+    """
+    (start, end, filters) from ?from=&to= (YYYY, YYYY-MM or YYYY-MM-DD) and the
+    comma-separated category args (query arg -> DealTable column).
+    Raises ValueError on a malformed date.
+    """
+    if arg_columns is None:
+        arg_columns = {column: column for column in _DEAL_FILTER_COLUMNS}
+    start = parse_date_bound(request.args['from']) if request.args.get('from') else None
+    end = parse_date_bound(request.args['to'], end=True) if request.args.get('to') else None
+    filters = {}
+    for arg, column in arg_columns.items():
+        values = [v for v in (request.args.get(arg) or '').split(',') if v.strip()]
+        if values:
+            filters[column] = values
+    return start, end, filters
+
+
+@app.route('/api/deals/league-table', methods=['GET'])
+@conditional_get(
+    'deals_data.json', 'deal_flow_database.json',
+    version=_deal_tables_version('deals_data', 'deal_flow'), args=_LEAGUE_TABLE_QUERY_ARGS, cache=True,
+)
+def deals_league_table():
+    """
+    Deal count and disclosed deal size (USD mn) per investor, industry, country, ...
+    Example: /api/deals/league-table?group=investor&from=2023&to=2025-06&country=Sweden,Norway&limit=20
+    dataset=deals_data (Excel export, default) or deal_flow.
+    """
+    dataset = request.args.get('dataset', 'deals_data')
+    group = request.args.get('group', 'investor')
+    if dataset not in deal_tables:
+        return jsonify({'success': False, 'message': f"dataset must be one of: {', '.join(deal_tables)}"}), 400
+    if group not in _DEAL_FILTER_COLUMNS:
+        return jsonify({'success': False, 'message': f"group must be one of: {', '.join(_DEAL_FILTER_COLUMNS)}"}), 400
+    try:
+        start, end, filters = _deal_filter_args()
+        limit = min(max(int(request.args.get('limit', 20)), 1), 500)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    try:
+        if sqlite_store is not None:
+            rows, total = sqlite_store.deal_group(dataset, group, start, end, filters)
+        else:
+            table = deal_tables[dataset].get()
+            mask = table.where(start, end, **filters)
+            rows = table.group(group, mask)
+            total = mask.bit_count()
+        return jsonify({
+            'success': True,
+            'dataset': dataset,
+            'group': group,
+            'total_deals': total,
+            'count': min(len(rows), limit),
+            'rows': rows[:limit],
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -741,22 +972,21 @@ def ai_company_detail(company_name):
     """
     # Load AI companies data
     try:
-        with open(data_path('ai_companies_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            companies = data.get('ai_companies', [])
-            
-            # Find the company by name (case-insensitive, URL-safe)
-            company_name_decoded = company_name.replace('-', ' ').replace('_', ' ')
-            company = None
-            for c in companies:
-                if c['name'].lower() == company_name_decoded.lower():
-                    company = c
-                    break
-            
-            if company:
-                return render_template('ai_company_detail.html', company=company)
-            else:
-                return "Company not found", 404
+        data = datasets.get('ai_companies_database.json')
+        companies = data.get('ai_companies', [])
+
+        # Find the company by name (case-insensitive, URL-safe)
+        company_name_decoded = company_name.replace('-', ' ').replace('_', ' ')
+        company = None
+        for c in companies:
+            if c['name'].lower() == company_name_decoded.lower():
+                company = c
+                break
+
+        if company:
+            return render_template('ai_company_detail.html', company=company)
+        else:
+            return "Company not found", 404
     except Exception as e:
         return f"Error loading company: {e}", 500
 
@@ -798,6 +1028,7 @@ def ai_map():
 
 
 @app.route('/api/news', methods=['GET'])
+@conditional_get(version=lambda: news_version)
 def get_news():
     """
     API endpoint to get all stored news
@@ -811,6 +1042,7 @@ def get_news():
     })
 
 @app.route('/api/investment-news', methods=['GET'])
+@conditional_get('pe_news_database.json', args=(), cache=True)
 def get_investment_news():
     """
     API endpoint to get real Nordic PE investment news from Cision.
@@ -818,8 +1050,7 @@ def get_investment_news():
     """
     try:
         if os.path.exists(data_path('pe_news_database.json')):
-            with open(data_path('pe_news_database.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = datasets.get('pe_news_database.json')
             news = [
                 a for a in data.get('news', [])
                 if (a.get('source') or '').strip().lower() != 'sampled market activity'
@@ -849,6 +1080,7 @@ def scrape_news():
     API endpoint to trigger news scraping
     When someone clicks "Scrape News" button, this function runs
     """
+    global news_version
     try:
         # Create a scraper object
         scraper = MAScraper()
@@ -864,6 +1096,7 @@ def scrape_news():
             # Avoid duplicates: only add if URL doesn't exist
             if not any(existing['url'] == article['url'] for existing in news_storage):
                 news_storage.append(article)
+                news_version += 1
         
         print(f"Successfully scraped {len(new_articles)} new articles!")
         
@@ -925,9 +1158,11 @@ def delete_news(news_id):
     """
     Delete a specific news article by its index
     """
+    global news_version
     try:
         if 0 <= news_id < len(news_storage):
             deleted = news_storage.pop(news_id)
+            news_version += 1
             return jsonify({
                 'success': True,
                 'message': 'Article deleted successfully',
@@ -960,11 +1195,7 @@ def search_news():
         })
     
     # Search in title and description
-    results = [
-        article for article in news_storage
-        if query in article.get('title', '').lower() or 
-           query in article.get('description', '').lower()
-    ]
+    results = _search_domain_index('news').filter(query)
     
     return jsonify({
         'success': True,
@@ -976,26 +1207,87 @@ def search_news():
 
 # ===== PORTFOLIO ENDPOINTS =====
 
+def _portfolio_view_version():
+    """Source version of the merged portfolio actually being served (it can lag a file edit)."""
+    try:
+        return portfolio_view.snapshot()[0]
+    except Exception:
+        return None
+
+
+_PORTFOLIO_PAGE_SIZE = 50
+_PORTFOLIO_MAX_PAGE_SIZE = 500
+_PORTFOLIO_FILTER_COLUMNS = ('sector', 'market', 'source', 'status')
+_PORTFOLIO_QUERY_ARGS = ('page', 'page_size', 'sort', 'fields', 'exclude') + tuple(
+    f'filter[{column}]' for column in _PORTFOLIO_FILTER_COLUMNS
+)
+
+
+def _portfolio_query_args():
+    """
+    Paging / sorting / filtering / projection args for /api/portfolio, or None when the
+    request has none of them (then the full list is returned as before).
+    Raises ValueError for values the endpoint can't honour.
+    """
+    args = request.args
+    filters = {}
+    for column in _PortfolioTable.FILTER_COLUMNS:
+        values = [v for v in (args.get(f'filter[{column}]') or '').split(',') if v.strip()]
+        if values:
+            filters[column] = values
+    if not filters and not any(args.get(k) for k in ('page', 'page_size', 'sort', 'fields', 'exclude')):
+        return None
+
+    sort = (args.get('sort') or '').strip()
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort and sort not in _PortfolioTable.SORT_COLUMNS:
+        raise ValueError(f"sort must be one of: {', '.join(_PortfolioTable.SORT_COLUMNS)}")
+
+    paged = bool(args.get('page') or args.get('page_size'))
+    try:
+        page = max(int(args.get('page') or 1), 1)
+        page_size = min(max(int(args.get('page_size') or _PORTFOLIO_PAGE_SIZE), 1), _PORTFOLIO_MAX_PAGE_SIZE)
+    except ValueError:
+        raise ValueError('page and page_size must be integers')
+
+    def _names(key):
+        return [f.strip() for f in (args.get(key) or '').split(',') if f.strip()]
+
+    return {
+        'filters': filters,
+        'sort': sort or None,
+        'descending': descending,
+        'page': page if paged else None,
+        'page_size': page_size if paged else None,
+        'fields': _names('fields'),
+        'exclude': set(_names('exclude')),
+    }
+
+
 @app.route('/api/portfolio', methods=['GET'])
+@conditional_get('portfolio_enriched.json', 'portfolio_complete.json', 'pe_firms_database.json', version=_portfolio_view_version, args=_PORTFOLIO_QUERY_ARGS, cache=True)
 def get_portfolio():
     """
     API endpoint to get all portfolio companies.
     Always reads fresh from portfolio_enriched.json so data updates are visible immediately.
+
+    Optional: page, page_size, sort (company|source|sector|market|entry|status, prefix - for
+    descending), filter[sector|market|source|status] (comma-separated), fields= or exclude=
+    (comma-separated keys; 'slug' is added to every row).
+    Example: /api/portfolio?filter[sector]=Healthcare&sort=-entry&page=1&page_size=50&fields=company,source,slug
     """
     global portfolio_storage
     try:
-        # Always reload from file to ensure fresh data (no restart needed)
-        portfolio_storage = _fresh_portfolio_list()
+        query = _portfolio_query_args()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    try:
+        # Always pick up the latest file version (no restart needed)
+        portfolio_storage = list(_fresh_portfolio_list())
         if not portfolio_storage:
-            # Try enriched database first
-            if os.path.exists(data_path('portfolio_enriched.json')):
-                with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    all_companies = data.get('companies', [])
-                    # Update global storage
-                    portfolio_storage.extend(all_companies)
             # Fallback to old format
-            elif os.path.exists(data_path('portfolio_complete.json')):
+            if not os.path.exists(data_path('portfolio_enriched.json')) and os.path.exists(data_path('portfolio_complete.json')):
                 with open(data_path('portfolio_complete.json'), 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     all_companies = []
@@ -1014,15 +1306,36 @@ def get_portfolio():
             if portfolio_storage:
                 print(f"Loaded {len(portfolio_storage)} companies from database")
         
-        final_companies = _merged_portfolio_companies(portfolio_storage)
-        
-        resp = jsonify({
+        if os.path.exists(data_path('portfolio_enriched.json')):
+            final_companies = _merged_portfolio_companies()
+        else:
+            final_companies = _merged_portfolio_companies(portfolio_storage)
+
+        if query is not None:
+            if os.path.exists(data_path('portfolio_enriched.json')):
+                table = portfolio_view.get()['table']
+            else:
+                table = _PortfolioTable(final_companies)
+            offset, limit = 0, None
+            if query['page'] is not None:
+                offset, limit = (query['page'] - 1) * query['page_size'], query['page_size']
+            total, positions = table.query(query['filters'], query['sort'], query['descending'], offset, limit)
+            rows = [table.project(pos, query['fields'], query['exclude']) for pos in positions]
+            return jsonify({
+                'success': True,
+                'count': len(rows),
+                'total': total,
+                'page': query['page'] or 1,
+                'page_size': query['page_size'] or total,
+                'companies': rows
+            })
+
+        # Cache-Control: no-cache + ETag (see conditional_get): browsers revalidate every time
+        return jsonify({
             'success': True,
             'count': len(final_companies),
             'companies': final_companies
         })
-        resp.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        return resp
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1075,26 +1388,15 @@ def search_portfolio():
     """
     Search portfolio companies by keyword
     """
-    global portfolio_storage
     query = request.args.get('q', '').lower()
-    if os.path.exists(data_path('portfolio_enriched.json')):
-        with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-            portfolio_storage = json.load(f).get('companies', [])
-    final_companies = _merged_portfolio_companies(portfolio_storage)
-
     if not query:
         return jsonify({
             'success': True,
-            'results': final_companies
+            'results': _merged_portfolio_companies()
         })
     
     # Search in company name, sector, and market
-    results = [
-        company for company in final_companies
-        if query in company.get('company', '').lower() or 
-           query in company.get('sector', '').lower() or
-           query in company.get('market', '').lower()
-    ]
+    results = _search_domain_index('portfolio').filter(query)
     
     return jsonify({
         'success': True,
@@ -1104,23 +1406,6 @@ def search_portfolio():
     })
 
 
-def _search_relevance(query, *fields):
-    """Higher score = better match."""
-    q = query.lower()
-    score = 0
-    for raw in fields:
-        text = (raw or '').lower().strip()
-        if not text:
-            continue
-        if text == q:
-            score = max(score, 100)
-        elif text.startswith(q):
-            score = max(score, 80)
-        elif q in text:
-            score = max(score, 50)
-    return score
-
-
 _COMPANY_SEARCH_DOMAIN_OVERRIDES = {
     'Apoteka': 'apoteka.dk',
     'Auntie': 'auntie.io',
@@ -1223,6 +1508,9 @@ def _firm_logo_domain(firm_name, firm_data):
 
 
 _search_index_cache = None
+search_index_file = SearchIndexFile(os.path.join(BASE_DIR, 'static'))
+# Versioned static file served to global_search.js (set by _refresh_search_index_file)
+_search_index_filename = None
 
 
 def _build_global_search_index():
@@ -1231,8 +1519,7 @@ def _build_global_search_index():
 
     firms = []
     try:
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as f:
-            pe_firms = json.load(f).get('pe_firms', {})
+        pe_firms = datasets.get('pe_firms_database.json').get('pe_firms', {})
         for key, firm in pe_firms.items():
             name = (firm.get('name') or key).strip()
             hq = (firm.get('headquarters') or '').strip()
@@ -1284,21 +1571,62 @@ def _build_global_search_index():
     return {'firms': firms, 'companies': companies}
 
 
+def _search_index_sources():
+    """Signatures of everything the client-side index is built from (data files and this module)."""
+    return [
+        datasets.signature(name) if os.path.exists(data_path(name)) else None
+        for name in ('portfolio_enriched.json', 'portfolio_complete.json', 'pe_firms_database.json')
+    ] + [file_signature(os.path.abspath(__file__))]
+
+
 def _refresh_search_index_file():
-    """Write static/search-index.json for client-side search (no /api/ fetch)."""
+    """
+    Write static/search-index.<version>.json (+ .gz/.br) for client-side search (no /api/ fetch).
+    Skips the rebuild when no source changed and the write when the content is unchanged.
+    """
+    global _search_index_filename
     try:
+        sources = _search_index_sources()
+        filename = search_index_file.current(sources)
+        if filename:
+            _search_index_filename = filename
+            print(f'Search index: unchanged -> static/{filename}')
+            return 0
         idx = _build_global_search_index()
         items = idx['firms'] + idx['companies']
-        path = os.path.join(BASE_DIR, 'static', 'search-index.json')
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(items, f, ensure_ascii=False)
-        print(f'Search index: {len(items)} items -> static/search-index.json')
+        filename, stats = search_index_file.write(items, sources)
+        _search_index_filename = filename
+        if stats['written']:
+            print(f"Search index: {len(items)} items ({stats['changed']} changed, {stats['removed']} removed) -> static/{filename}")
+        else:
+            print(f'Search index: content unchanged -> static/{filename}')
         return len(items)
     except Exception as e:
         print(f'Search index write error: {e}')
         return 0
 
 
+@app.route('/static/search-index.<version>.json')
+def search_index_static(version):
+    """Versioned search index; serves the pre-compressed .br/.gz sibling the client accepts."""
+    path = search_index_file.path(version)
+    if not os.path.exists(path):
+        abort(404)
+    accepted = request.headers.get('Accept-Encoding', '').lower()
+    encoding = None
+    for name, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if name in accepted and os.path.exists(path + suffix):
+            encoding, path = name, path + suffix
+            break
+    response = send_file(path, mimetype='application/json', max_age=31536000, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route('/api/global-search-index', methods=['GET'])
 def global_search_index():
     """Full search index for client-side typeahead (loaded once per page)."""
@@ -1316,14 +1644,81 @@ def global_search_index():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+def _build_global_search_engine(pe_firms, companies):
+    """Index PE firms and merged portfolio companies for /api/global-search."""
+    from urllib.parse import quote
+
+    engine = SearchIndex()
+    for key, firm in pe_firms.items():
+        name = (firm.get('name') or key).strip()
+        hq = (firm.get('headquarters') or '').strip()
+        fo = firm.get('investment_focus')
+        if isinstance(fo, dict):
+            sectors_text = ' '.join(fo.get('sectors') or [])
+        else:
+            sectors_text = str(fo or '')
+        engine.add(
+            {
+                'type': 'firm',
+                'key': key,
+                'name': name,
+                'hq': hq,
+                'url': f'/pe-firm/{quote(key)}',
+                'logo_domain': _firm_logo_domain(key, firm),
+                'logo_url': firm.get('logo_url') or '',
+            },
+            (key, name, hq, sectors_text),
+            boost=5, rank=0, sort_name=name,
+        )
+
+    for c in companies:
+        slug = _company_slug(c)
+        if not slug:
+            continue
+        name = (c.get('company') or '').strip()
+        source = (c.get('source') or '').strip()
+        sector = (c.get('sector') or '').strip()
+        market = (c.get('market') or '').strip()
+        subtitle_parts = [p for p in [source, sector] if p]
+        engine.add(
+            {
+                'type': 'company',
+                'name': name,
+                'subtitle': ' · '.join(subtitle_parts) if subtitle_parts else 'Portfolio company',
+                'url': f'/company/{slug}',
+                'logo_domain': _company_logo_domain(c),
+                'logo_url': c.get('logo_url') or c.get('logo') or '',
+            },
+            (name, source, sector, market),
+            rank=1, sort_name=name,
+        )
+    return engine
+
+
+def _global_search_result(doc, q_lower):
+    """Public result dict for one search hit (firm subtitles mention the matched key)."""
+    if doc['type'] != 'firm':
+        return {k: doc[k] for k in ('type', 'name', 'subtitle', 'url', 'logo_domain', 'logo_url')}
+    key, name = doc['key'], doc['name']
+    subtitle = doc['hq'] or 'Private equity investor'
+    if key.lower() != name.lower() and q_lower in key.lower():
+        subtitle = f'{subtitle} · {key}' if subtitle else key
+    return {
+        'type': 'firm',
+        'name': name,
+        'subtitle': subtitle,
+        'url': doc['url'],
+        'logo_domain': doc['logo_domain'],
+        'logo_url': doc['logo_url'],
+    }
+
+
 @app.route('/api/global-search', methods=['GET'])
 def global_search():
     """
     Unified search across PE firms (GPs) and portfolio companies.
     Example: /api/global-search?q=verdane
     """
-    from urllib.parse import quote
-
     query = (request.args.get('q') or '').strip()
     q_lower = query.lower()
     try:
@@ -1334,71 +1729,188 @@ def global_search():
     if len(q_lower) < 2:
         return jsonify({'success': True, 'query': query, 'results': []})
 
-    results = []
+    engine = portfolio_view.get()['search']
+    trimmed = [_global_search_result(doc, q_lower) for _, doc in engine.search(q_lower, limit)]
+
+    return jsonify({
+        'success': True,
+        'query': query,
+        'count': len(trimmed),
+        'results': trimmed,
+    })
+
+
+# ===== UNIFIED SEARCH =====
+
+# Searchable fields per domain as (field, weight); list fields are joined with spaces.
+# The single-domain /search endpoints match on the same fields.
+SEARCH_DOMAINS = {
+    'portfolio': {
+        'fields': (('company', 3), ('sector', 1), ('market', 1)),
+        'facets': ('source', 'sector', 'market'),
+        'title': 'company',
+    },
+    'news': {
+        'fields': (('title', 2), ('description', 1)),
+        'facets': ('category', 'source'),
+        'title': 'title',
+    },
+    'deals': {
+        'dataset': ('deal_flow_database.json', 'deals'),
+        'fields': (('company', 3), ('pe_firm', 2), ('sector', 1), ('geography', 1), ('description', 1)),
+        'facets': ('deal_type', 'status', 'geography', 'sector'),
+        'title': 'company',
+    },
+    'funds': {
+        'dataset': ('fundraising_database.json', 'fundraising_activities'),
+        'fields': (('fund_name', 3), ('firm', 2), ('strategy', 1), ('geography', 1)),
+        'facets': ('status', 'strategy', 'geography'),
+        'title': 'fund_name',
+    },
+    'family_offices': {
+        'dataset': ('family_offices_database.json', 'family_offices'),
+        'fields': (('name', 3), ('founding_family', 2), ('investment_focus', 1)),
+        'facets': ('type',),
+        'title': 'name',
+    },
+    'investment_companies': {
+        'dataset': ('investmentbolag_database.json', 'investment_companies'),
+        'fields': (('name', 3), ('holdings', 1), ('investment_focus', 1)),
+        'facets': ('type',),
+        'title': 'name',
+    },
+    'ai_companies': {
+        'dataset': ('ai_companies_database.json', 'ai_companies'),
+        'fields': (('name', 3), ('category', 2), ('description', 1), ('technology', 1), ('investors', 1)),
+        'facets': ('category', 'stage'),
+        'title': 'name',
+    },
+}
+
+
+def _search_field_text(record, field):
+    value = record.get(field)
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value)
+    return '' if value is None else str(value)
+
 
+def _build_search_domain_index(domain, records):
+    """SearchIndex over one domain's records using its SEARCH_DOMAINS field weights."""
+    spec = SEARCH_DOMAINS[domain]
+    rank = list(SEARCH_DOMAINS).index(domain)
+    index = SearchIndex()
+    for record in records:
+        index.add(
+            record,
+            [(_search_field_text(record, field), weight) for field, weight in spec['fields']],
+            rank=rank,
+            sort_name=_search_field_text(record, spec['title']),
+        )
+    return index
+
+
+def _dataset_search_builder(domain):
+    filename, key = SEARCH_DOMAINS[domain]['dataset']
+    return lambda: _build_search_domain_index(domain, datasets.get(filename).get(key, []))
+
+
+# File-backed domains are rebuilt only when their JSON file changes
+_search_domain_views = {
+    domain: MaterializedView(datasets, (spec['dataset'][0],), _dataset_search_builder(domain), name=f'{domain} search index')
+    for domain, spec in SEARCH_DOMAINS.items()
+    if 'dataset' in spec
+}
+
+_news_search_cache = None
+
+
+def _search_domain_index(domain):
+    """Current SearchIndex for a SEARCH_DOMAINS key."""
+    global _news_search_cache
+    if domain == 'portfolio':
+        return portfolio_view.get()['portfolio_search']
+    if domain == 'news':
+        cached = _news_search_cache
+        if cached is None or cached[0] != news_version:
+            cached = (news_version, _build_search_domain_index('news', list(news_storage)))
+            _news_search_cache = cached
+        return cached[1]
+    return _search_domain_views[domain].get()
+
+
+def _domain_filter(domain, query):
+    """Records of a file-backed domain matching `query`, in file order (SQLite FTS when enabled)."""
+    if sqlite_store is not None and domain in sqlite_store.collections:
+        return sqlite_store.search(domain, query)
+    return _search_domain_index(domain).filter(query)
+
+
+def _facet_counts(records, fields):
+    counts = {field: {} for field in fields}
+    for record in records:
+        for field in fields:
+            value = record.get(field)
+            for v in (value if isinstance(value, list) else [value]):
+                if v in (None, ''):
+                    continue
+                counts[field][v] = counts[field].get(v, 0) + 1
+    return {
+        field: dict(sorted(c.items(), key=lambda x: (-x[1], str(x[0]))))
+        for field, c in counts.items()
+    }
+
+
+@app.route('/api/unified-search', methods=['GET'])
+def unified_search():
+    """
+    One ranked search across portfolio, news, deals, funds, family offices,
+    investmentbolag and AI companies, with per-domain facet counts.
+    Example: /api/unified-search?q=eqt&domains=deals,funds&offset=0&limit=20
+    """
+    query = (request.args.get('q') or '').strip()
+    requested = {d.strip() for d in (request.args.get('domains') or '').split(',') if d.strip()}
+    domains = [d for d in SEARCH_DOMAINS if not requested or d in requested]
     try:
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as f:
-            pe_firms = json.load(f).get('pe_firms', {})
-        for key, firm in pe_firms.items():
-            name = (firm.get('name') or key).strip()
-            hq = (firm.get('headquarters') or '').strip()
-            fo = firm.get('investment_focus')
-            if isinstance(fo, dict):
-                sectors_text = ' '.join(fo.get('sectors') or [])
-            else:
-                sectors_text = str(fo or '')
-            score = _search_relevance(q_lower, key, name, hq, sectors_text)
-            if score <= 0:
-                continue
-            domain = _firm_logo_domain(key, firm)
-            subtitle = hq or 'Private equity investor'
-            if key.lower() != name.lower() and q_lower in key.lower():
-                subtitle = f'{subtitle} · {key}' if subtitle else key
-            results.append({
-                'type': 'firm',
-                'name': name,
-                'subtitle': subtitle,
-                'url': f'/pe-firm/{quote(key)}',
-                'logo_domain': domain,
-                'logo_url': firm.get('logo_url') or '',
-                'score': score + 5,
-            })
-    except Exception as e:
-        print(f'Global search firms error: {e}')
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except (TypeError, ValueError):
+        offset = 0
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except (TypeError, ValueError):
+        limit = 20
 
-    companies = _merged_portfolio_companies()
-    for c in companies:
-        name = (c.get('company') or '').strip()
-        source = (c.get('source') or '').strip()
-        sector = (c.get('sector') or '').strip()
-        market = (c.get('market') or '').strip()
-        score = _search_relevance(q_lower, name, source, sector, market)
-        if score <= 0:
-            continue
-        slug = _company_slug(c)
-        if not slug:
-            continue
-        subtitle_parts = [p for p in [source, sector] if p]
-        results.append({
-            'type': 'company',
-            'name': name,
-            'subtitle': ' · '.join(subtitle_parts) if subtitle_parts else 'Portfolio company',
-            'url': f'/company/{slug}',
-            'logo_domain': _company_logo_domain(c),
-            'logo_url': c.get('logo_url') or c.get('logo') or '',
-            'score': score,
+    if len(query) < 2:
+        return jsonify({
+            'success': True, 'query': query, 'total': 0, 'offset': offset, 'limit': limit,
+            'facets': {'domain': {}}, 'results': [],
         })
 
-    results.sort(key=lambda r: (-r['score'], 0 if r['type'] == 'firm' else 1, r['name'].lower()))
-    trimmed = results[:limit]
-    for r in trimmed:
-        r.pop('score', None)
+    ranked = []
+    facets = {'domain': {}}
+    for domain in domains:
+        try:
+            index = _search_domain_index(domain)
+        except Exception as e:
+            print(f'Unified search: {domain} unavailable: {e}')
+            continue
+        matches = index.match(query)
+        facets['domain'][domain] = len(matches)
+        facets[domain] = _facet_counts((index.docs[i][0] for i in matches), SEARCH_DOMAINS[domain]['facets'])
+        ranked.extend((index.order_key(doc_id, score), domain, index) for doc_id, score in matches.items())
 
+    page = heapq.nsmallest(offset + limit, ranked, key=lambda r: r[0])[offset:]
     return jsonify({
         'success': True,
         'query': query,
-        'count': len(trimmed),
-        'results': trimmed,
+        'total': len(ranked),
+        'offset': offset,
+        'limit': limit,
+        'facets': facets,
+        'results': [
+            {'domain': domain, 'score': -key[0], 'item': index.docs[key[3]][0]}
+            for key, domain, index in page
+        ],
     })
 
 
@@ -1411,27 +1923,27 @@ def reload_portfolio():
     try:
         # Clear cache
         portfolio_storage.clear()
+        datasets.invalidate('portfolio_enriched.json')
         print("Clearing portfolio cache...")
         
         # Reload from enriched database
         if os.path.exists(data_path('portfolio_enriched.json')):
-            with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                all_companies = data.get('companies', [])
-                portfolio_storage.extend(all_companies)
-                print(f"Reloaded {len(all_companies)} companies from portfolio_enriched.json")
-                
-                # Count by source
-                valedo = len([c for c in all_companies if c.get('source') == 'Valedo Partners'])
-                verdane = len([c for c in all_companies if c.get('source') == 'Verdane'])
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Portfolio data reloaded successfully',
-                    'total': len(all_companies),
-                    'valedo_partners': valedo,
-                    'verdane': verdane
-                })
+            all_companies = datasets.get('portfolio_enriched.json').get('companies', [])
+            portfolio_storage.extend(all_companies)
+            portfolio_view.refresh()
+            print(f"Reloaded {len(all_companies)} companies from portfolio_enriched.json")
+
+            # Count by source
+            valedo = len([c for c in all_companies if c.get('source') == 'Valedo Partners'])
+            verdane = len([c for c in all_companies if c.get('source') == 'Verdane'])
+
+            return jsonify({
+                'success': True,
+                'message': 'Portfolio data reloaded successfully',
+                'total': len(all_companies),
+                'valedo_partners': valedo,
+                'verdane': verdane
+            })
         else:
             return jsonify({
                 'success': False,
@@ -1449,22 +1961,25 @@ def reload_portfolio():
 # ===== PE FIRMS ENDPOINTS =====
 
 @app.route('/api/pe-firms', methods=['GET'])
+@conditional_get('pe_firms_database.json', args=(), cache=True)
 def get_pe_firms():
     """
     Get all PE firms with details
     """
     try:
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'firms': data.get('pe_firms', {})
-            })
+        data = datasets.get('pe_firms_database.json')
+        return jsonify({
+            'success': True,
+            'firms': data.get('pe_firms', {})
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @app.route('/api/pe-firm/<firm_name>', methods=['GET'])
+@conditional_get(
+    'pe_firms_database.json', 'portfolio_enriched.json', 'pe_news_database.json', version=_portfolio_view_version,
+)
 def get_pe_firm_detail(firm_name):
     """
     Get detailed information about a specific PE firm with real news integration
@@ -1487,97 +2002,93 @@ def get_pe_firm_detail(firm_name):
         }
 
         if os.path.exists(data_path('pe_firms_database.json')):
-            with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as pf:
-                pe_data = json.load(pf)
-                pe_firms = pe_data.get('pe_firms', {})
+            pe_data = datasets.get('pe_firms_database.json')
+            pe_firms = pe_data.get('pe_firms', {})
 
-                # Exact key, case-insensitive key, then alias mapping
-                if firm_name in pe_firms:
-                    canonical_firm_name = firm_name
+            # Exact key, case-insensitive key, then alias mapping
+            if firm_name in pe_firms:
+                canonical_firm_name = firm_name
+            else:
+                lowered = firm_name.lower()
+                matched_key = next((k for k in pe_firms.keys() if k.lower() == lowered), None)
+                if matched_key:
+                    canonical_firm_name = matched_key
                 else:
-                    lowered = firm_name.lower()
-                    matched_key = next((k for k in pe_firms.keys() if k.lower() == lowered), None)
-                    if matched_key:
-                        canonical_firm_name = matched_key
-                    else:
-                        alias_target = manual_aliases.get(lowered)
-                        if alias_target and alias_target in pe_firms:
-                            canonical_firm_name = alias_target
-
-                firm_metadata = pe_firms.get(canonical_firm_name, {})
-
-                # Curated firms: PE-firms list + financials overlay from portfolio_enriched (see _merged_portfolio_companies).
-                curated_firms = ['Polaris', 'FSN Capital', 'Nordstjernan', 'Valedo Partners', 'IK Partners', 'Fidelio Capital']
-                if canonical_firm_name in curated_firms:
-                    merged = _merged_portfolio_companies()
-                    firm_companies = [c for c in merged if c.get('source') == canonical_firm_name]
+                    alias_target = manual_aliases.get(lowered)
+                    if alias_target and alias_target in pe_firms:
+                        canonical_firm_name = alias_target
+
+            firm_metadata = pe_firms.get(canonical_firm_name, {})
+
+            # Curated firms: PE-firms list + financials overlay from portfolio_enriched (see _merged_portfolio_companies).
+            curated_firms = ['Polaris', 'FSN Capital', 'Nordstjernan', 'Valedo Partners', 'IK Partners', 'Fidelio Capital']
+            if canonical_firm_name in curated_firms:
+                merged = _merged_portfolio_companies()
+                firm_companies = [c for c in merged if c.get('source') == canonical_firm_name]
 
         # Fallback: build firm companies from enriched portfolio using canonical name
         if not firm_companies and os.path.exists(data_path('portfolio_enriched.json')):
-            with open(data_path('portfolio_enriched.json'), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                all_companies = data.get('companies', [])
-                firm_companies = [c for c in all_companies if c.get('source') == canonical_firm_name]
+            all_companies = datasets.get('portfolio_enriched.json').get('companies', [])
+            firm_companies = [c for c in all_companies if c.get('source') == canonical_firm_name]
         
         if firm_companies or firm_metadata:
             # Get real news for this firm
             real_news = []
             seen_articles = set()  # Track articles we've already added to avoid duplicates
             
-            if os.path.exists('pe_news_database.json'):
-                with open('pe_news_database.json', 'r', encoding='utf-8') as nf:
-                    news_data = json.load(nf)
-                    all_news = news_data.get('news', [])
+            if os.path.exists(data_path('pe_news_database.json')):
+                news_data = datasets.get('pe_news_database.json')
+                all_news = news_data.get('news', [])
                     
-                    # Filter news for this firm (exact match ONLY on firm field)
-                    for article in all_news:
-                        if (article.get('source') or '').strip().lower() == 'sampled market activity':
-                            continue
-                        article_firm = article.get('firm', '')
-                        article_title = article.get('title', '')
-                        article_desc = article.get('description', '')
-                        article_link = article.get('link', '')
+                # Filter news for this firm (exact match ONLY on firm field)
+                for article in all_news:
+                    if (article.get('source') or '').strip().lower() == 'sampled market activity':
+                        continue
+                    article_firm = article.get('firm', '')
+                    article_title = article.get('title', '')
+                    article_desc = article.get('description', '')
+                    article_link = article.get('link', '')
                         
-                        # Use the link as a unique identifier to avoid duplicates
-                        article_id = article_link
+                    # Use the link as a unique identifier to avoid duplicates
+                    article_id = article_link
                         
-                        # PRIORITY 1: Direct firm match from the 'firm' field
-                        if article_firm and article_firm.lower() == canonical_firm_name.lower():
-                            if article_id not in seen_articles:
-                                real_news.append(article)
-                                seen_articles.add(article_id)
-                                continue
+                    # PRIORITY 1: Direct firm match from the 'firm' field
+                    if article_firm and article_firm.lower() == canonical_firm_name.lower():
+                        if article_id not in seen_articles:
+                            real_news.append(article)
+                            seen_articles.add(article_id)
+                            continue
                         
-                        # PRIORITY 2: Check if article mentions portfolio companies (more selective)
-                        for company in firm_companies:
-                            company_name = company.get('company', '')
-                            if not company_name:
-                                continue
+                    # PRIORITY 2: Check if article mentions portfolio companies (more selective)
+                    for company in firm_companies:
+                        company_name = company.get('company', '')
+                        if not company_name:
+                            continue
                             
-                            # More precise matching: company name should be a complete word match
-                            # and not just a substring of another company name
-                            company_lower = company_name.lower()
-                            title_lower = article_title.lower()
-                            desc_lower = article_desc.lower()
+                        # More precise matching: company name should be a complete word match
+                        # and not just a substring of another company name
+                        company_lower = company_name.lower()
+                        title_lower = article_title.lower()
+                        desc_lower = article_desc.lower()
                             
-                            # Check for exact word boundaries to avoid false matches
-                            import re
-                            pattern = r'\b' + re.escape(company_lower) + r'\b'
+                        # Check for exact word boundaries to avoid false matches
+                        import re
+                        pattern = r'\b' + re.escape(company_lower) + r'\b'
                             
-                            if (re.search(pattern, title_lower) or re.search(pattern, desc_lower)):
-                                # Additional check: make sure it's not about a different company
-                                # Skip if the article is clearly about a different firm
-                                if article_firm and article_firm.lower() != canonical_firm_name.lower():
-                                    continue
+                        if (re.search(pattern, title_lower) or re.search(pattern, desc_lower)):
+                            # Additional check: make sure it's not about a different company
+                            # Skip if the article is clearly about a different firm
+                            if article_firm and article_firm.lower() != canonical_firm_name.lower():
+                                continue
                                 
-                                if article_id not in seen_articles:
-                                    # Add firm context to the article
-                                    article_copy = article.copy()
-                                    article_copy['related_firm'] = canonical_firm_name
-                                    article_copy['related_company'] = company_name
-                                    real_news.append(article_copy)
-                                    seen_articles.add(article_id)
-                                    break  # Only add once per company match
+                            if article_id not in seen_articles:
+                                # Add firm context to the article
+                                article_copy = article.copy()
+                                article_copy['related_firm'] = canonical_firm_name
+                                article_copy['related_company'] = company_name
+                                real_news.append(article_copy)
+                                seen_articles.add(article_id)
+                                break  # Only add once per company match
             
             # Sort news by date (most recent first)
             real_news.sort(key=lambda x: x.get('date', ''), reverse=True)
@@ -1711,21 +2222,20 @@ def _build_firm_logo_map():
     # From pe_firms_database
     if os.path.exists(data_path('pe_firms_database.json')):
         try:
-            with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as pf:
-                pe_data = json.load(pf)
-                for key, firm in (pe_data.get('pe_firms') or {}).items():
-                    logo = firm.get('logo_url') or firm.get('logo') or ''
-                    if not logo or 'ui-avatars.com' in logo:
-                        domain = (firm.get('website') or '').replace('https://', '').replace('http://', '').replace('www.', '').split('/')[0]
-                        if domain:
-                            logo = f'https://logo.clearbit.com/{domain}'
-                    if logo:
-                        logo_map[key.lower().strip()] = logo
-                        # Add stripped variants
-                        for suffix in [' partners', ' capital', ' equity', ' management']:
-                            stripped = key.lower().replace(suffix, '').strip()
-                            if stripped and stripped not in logo_map:
-                                logo_map[stripped] = logo
+            pe_data = datasets.get('pe_firms_database.json')
+            for key, firm in (pe_data.get('pe_firms') or {}).items():
+                logo = firm.get('logo_url') or firm.get('logo') or ''
+                if not logo or 'ui-avatars.com' in logo:
+                    domain = (firm.get('website') or '').replace('https://', '').replace('http://', '').replace('www.', '').split('/')[0]
+                    if domain:
+                        logo = f'https://logo.clearbit.com/{domain}'
+                if logo:
+                    logo_map[key.lower().strip()] = logo
+                    # Add stripped variants
+                    for suffix in [' partners', ' capital', ' equity', ' management']:
+                        stripped = key.lower().replace(suffix, '').strip()
+                        if stripped and stripped not in logo_map:
+                            logo_map[stripped] = logo
         except Exception:
             pass
     return logo_map
@@ -1744,13 +2254,13 @@ def _get_firm_logo(firm_name, logo_map):
     return ''
 
 @app.route('/api/fundraising', methods=['GET'])
+@conditional_get('fundraising_database.json', 'pe_firms_database.json', args=(), cache=True)
 def get_fundraising():
     """
     Get fundraising tracker data. Enriches each fund with firm_logo_url when missing.
     """
     try:
-        with open(data_path('fundraising_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = datasets.get('fundraising_database.json')
         activities = data.get('fundraising_activities', [])
         logo_map = _build_firm_logo_map()
         enriched = []
@@ -1773,18 +2283,18 @@ def get_fundraising():
 # ===== FAMILY OFFICES ENDPOINTS =====
 
 @app.route('/api/family-offices', methods=['GET'])
+@conditional_get('family_offices_database.json', args=(), cache=True)
 def get_family_offices():
     """
     Get Nordic family offices data
     """
     try:
-        with open(data_path('family_offices_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'family_offices': data.get('family_offices', []),
-                'metadata': data.get('metadata', {})
-            })
+        data = datasets.get('family_offices_database.json')
+        return jsonify({
+            'success': True,
+            'family_offices': data.get('family_offices', []),
+            'metadata': data.get('metadata', {})
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1796,27 +2306,18 @@ def search_family_offices():
     """
     try:
         query = request.args.get('q', '').lower()
-        
-        with open(data_path('family_offices_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_offices = data.get('family_offices', [])
-            
-            if not query:
-                results = all_offices
-            else:
-                results = [
-                    office for office in all_offices
-                    if query in office.get('name', '').lower() or
-                       query in office.get('founding_family', '').lower() or
-                       query in ' '.join(office.get('investment_focus', [])).lower()
-                ]
-            
-            return jsonify({
-                'success': True,
-                'query': query,
-                'count': len(results),
-                'results': results
-            })
+
+        if not query:
+            results = datasets.get('family_offices_database.json').get('family_offices', [])
+        else:
+            results = _domain_filter('family_offices', query)
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1831,9 +2332,7 @@ def get_analytics_summary():
     total_pe_firms = 28
     if os.path.exists(data_path('pe_firms_database.json')):
         try:
-            with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as f:
-                pe_data = json.load(f)
-                total_pe_firms = len(pe_data.get('pe_firms', {}))
+            total_pe_firms = len(datasets.get('pe_firms_database.json').get('pe_firms', {}))
         except Exception:
             pass
     return jsonify({
@@ -1851,18 +2350,18 @@ def get_analytics_summary():
 # ===== INVESTMENT COMPANIES ENDPOINTS =====
 
 @app.route('/api/investment-companies', methods=['GET'])
+@conditional_get('investmentbolag_database.json', args=(), cache=True)
 def get_investment_companies():
     """
     Get Swedish investment companies with NAV discount data
     """
     try:
-        with open(data_path('investmentbolag_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'companies': data.get('investment_companies', []),
-                'metadata': data.get('metadata', {})
-            })
+        data = datasets.get('investmentbolag_database.json')
+        return jsonify({
+            'success': True,
+            'companies': data.get('investment_companies', []),
+            'metadata': data.get('metadata', {})
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1874,27 +2373,18 @@ def search_investment_companies():
     """
     try:
         query = request.args.get('q', '').lower()
-        
-        with open(data_path('investmentbolag_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_companies = data.get('investment_companies', [])
-            
-            if not query:
-                results = all_companies
-            else:
-                results = [
-                    company for company in all_companies
-                    if query in company.get('name', '').lower() or
-                       query in ' '.join(company.get('holdings', [])).lower() or
-                       query in ' '.join(company.get('investment_focus', [])).lower()
-                ]
-            
-            return jsonify({
-                'success': True,
-                'query': query,
-                'count': len(results),
-                'results': results
-            })
+
+        if not query:
+            results = datasets.get('investmentbolag_database.json').get('investment_companies', [])
+        else:
+            results = _domain_filter('investment_companies', query)
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1902,19 +2392,19 @@ def search_investment_companies():
 # ===== AI COMPANIES ENDPOINTS =====
 
 @app.route('/api/ai-companies', methods=['GET'])
+@conditional_get('ai_companies_database.json')
 def get_ai_companies():
     """
     Get Swedish AI companies and global AI investments
     """
     try:
-        with open(data_path('ai_companies_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'companies': data.get('ai_companies', []),
-                'global_investments': data.get('global_ai_investments', []),
-                'metadata': data.get('metadata', {})
-            })
+        data = datasets.get('ai_companies_database.json')
+        return jsonify({
+            'success': True,
+            'companies': data.get('ai_companies', []),
+            'global_investments': data.get('global_ai_investments', []),
+            'metadata': data.get('metadata', {})
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1926,29 +2416,18 @@ def search_ai_companies():
     """
     try:
         query = request.args.get('q', '').lower()
-        
-        with open(data_path('ai_companies_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_companies = data.get('ai_companies', [])
-            
-            if not query:
-                results = all_companies
-            else:
-                results = [
-                    company for company in all_companies
-                    if query in company.get('name', '').lower() or
-                       query in company.get('description', '').lower() or
-                       query in company.get('category', '').lower() or
-                       query in ' '.join(company.get('technology', [])).lower() or
-                       query in ' '.join(company.get('investors', [])).lower()
-                ]
-            
-            return jsonify({
-                'success': True,
-                'query': query,
-                'count': len(results),
-                'results': results
-            })
+
+        if not query:
+            results = datasets.get('ai_companies_database.json').get('ai_companies', [])
+        else:
+            results = _search_domain_index('ai_companies').filter(query)
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1959,21 +2438,19 @@ def get_ai_companies_by_category(category):
     Get AI companies filtered by category
     """
     try:
-        with open(data_path('ai_companies_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_companies = data.get('ai_companies', [])
-            
-            filtered = [
-                company for company in all_companies
-                if category.lower() in company.get('category', '').lower()
-            ]
-            
-            return jsonify({
-                'success': True,
-                'category': category,
-                'count': len(filtered),
-                'companies': filtered
-            })
+        all_companies = datasets.get('ai_companies_database.json').get('ai_companies', [])
+
+        filtered = [
+            company for company in all_companies
+            if category.lower() in company.get('category', '').lower()
+        ]
+
+        return jsonify({
+            'success': True,
+            'category': category,
+            'count': len(filtered),
+            'companies': filtered
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1984,72 +2461,71 @@ def get_ai_analytics():
     Get analytics about AI companies ecosystem
     """
     try:
-        with open(data_path('ai_companies_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_companies = data.get('ai_companies', [])
-            
-            # Calculate analytics
-            categories = {}
-            total_funding = 0
-            stages = {}
-            technologies = {}
-            
-            for company in all_companies:
-                # Category distribution
-                cat = company.get('category', 'Unknown')
-                categories[cat] = categories.get(cat, 0) + 1
-                
-                # Stage distribution
-                stage = company.get('stage', 'Unknown')
-                stages[stage] = stages.get(stage, 0) + 1
-                
-                # Technology trends
-                for tech in company.get('technology', []):
-                    technologies[tech] = technologies.get(tech, 0) + 1
-            
-            return jsonify({
-                'success': True,
-                'analytics': {
-                    'total_companies': len(all_companies),
-                    'categories': categories,
-                    'stages': stages,
-                    'top_technologies': dict(sorted(technologies.items(), key=lambda x: x[1], reverse=True)[:15]),
-                    'unicorns': len([c for c in all_companies if 'Unicorn' in c.get('category', '')]),
-                    'yc_alumni': len([c for c in all_companies if 'Y Combinator' in str(c.get('investors', []))])
-                }
-            })
+        data = datasets.get('ai_companies_database.json')
+        all_companies = data.get('ai_companies', [])
+
+        # Calculate analytics
+        categories = {}
+        total_funding = 0
+        stages = {}
+        technologies = {}
+
+        for company in all_companies:
+            # Category distribution
+            cat = company.get('category', 'Unknown')
+            categories[cat] = categories.get(cat, 0) + 1
+
+            # Stage distribution
+            stage = company.get('stage', 'Unknown')
+            stages[stage] = stages.get(stage, 0) + 1
+
+            # Technology trends
+            for tech in company.get('technology', []):
+                technologies[tech] = technologies.get(tech, 0) + 1
+
+        return jsonify({
+            'success': True,
+            'analytics': {
+                'total_companies': len(all_companies),
+                'categories': categories,
+                'stages': stages,
+                'top_technologies': dict(sorted(technologies.items(), key=lambda x: x[1], reverse=True)[:15]),
+                'unicorns': len([c for c in all_companies if 'Unicorn' in c.get('category', '')]),
+                'yc_alumni': len([c for c in all_companies if 'Y Combinator' in str(c.get('investors', []))])
+            }
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @app.route('/api/ai-educational', methods=['GET'])
+@conditional_get('ai_educational_database.json')
 def get_ai_educational():
     """
     Get AI educational content for investment analysis
     """
     try:
-        with open(data_path('ai_educational_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'content': data
-            })
+        data = datasets.get('ai_educational_database.json')
+        return jsonify({
+            'success': True,
+            'content': data
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @app.route('/api/ai-investors', methods=['GET'])
+@conditional_get('ai_investors_database.json')
 def get_ai_investors():
     """
     Get AI investors database
     """
     try:
-        with open(data_path('ai_investors_database.json'), 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return jsonify({
-                'success': True,
-                'investors': data.get('investors', []),
-                'metadata': data.get('metadata', {})
-            })
+        data = datasets.get('ai_investors_database.json')
+        return jsonify({
+            'success': True,
+            'investors': data.get('investors', []),
+            'metadata': data.get('metadata', {})
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -2064,68 +2540,190 @@ def _company_slug(c):
     return f"{slug_name}-{slug_source}" if slug_name and slug_source else ''
 
 
-def _compute_smart_sections(company, all_companies):
+_SMART_SIMILAR_LIMIT = 8
+_SMART_SIBLING_LIMIT = 12
+
+
+def _normalize_smart_field(s):
+    return (s or '').lower().strip()
+
+
+_ENTRY_YEAR_RE = re.compile(r'(?:19|20)\d{2}')
+
+
+class _PortfolioTable:
     """
-    Compute similar companies and sibling companies (same PE firm).
-    Returns dict with similar_companies, sibling_companies.
+    Query side of /api/portfolio (filter, sort, page, project), built once per data version.
+
+    Each sortable column has a precomputed row order and each filterable column a
+    value -> row-set map, so a request only intersects sets and walks one order.
     """
-    def _normalize(s):
-        return (s or '').lower().strip()
 
-    cur_name = _normalize(company.get('company', ''))
-    cur_source = _normalize(company.get('source', ''))
-    cur_sector = _normalize(company.get('sector', ''))
-    cur_market = _normalize(company.get('market', ''))
+    SORT_COLUMNS = ('company', 'source', 'sector', 'market', 'entry', 'status')
+    FILTER_COLUMNS = _PORTFOLIO_FILTER_COLUMNS
 
-    siblings = []
-    similar = []
+    def __init__(self, all_companies):
+        self.rows = all_companies
+        self.slugs = [_company_slug(c) for c in all_companies]
+        self.orders = {}  # column -> (ascending, descending) row positions
+        for column in self.SORT_COLUMNS:
+            keys = [self._sort_value(c, column) for c in all_companies]
+            ascending = sorted(range(len(keys)), key=lambda i: (keys[i] == '', keys[i]))
+            filled = sum(1 for k in keys if k)
+            # Blank values sort last in both directions
+            self.orders[column] = (ascending, ascending[:filled][::-1] + ascending[filled:])
+        self.postings = {column: {} for column in self.FILTER_COLUMNS}
+        for pos, c in enumerate(all_companies):
+            for column in self.FILTER_COLUMNS:
+                value = (str(c.get(column) or '')).strip().lower()
+                if value:
+                    self.postings[column].setdefault(value, set()).add(pos)
 
-    for c in all_companies:
-        name = _normalize(c.get('company', ''))
-        if name == cur_name:
-            continue
+    @staticmethod
+    def _sort_value(company, column):
+        if column == 'entry':
+            # Entry values vary ('2021', '2025-05', 'Oct 2019'): sort on the year
+            match = _ENTRY_YEAR_RE.search(str(company.get('entry') or ''))
+            return match.group(0) if match else ''
+        return (str(company.get(column) or '')).strip().lower()
 
-        slug = _company_slug(c)
-        if not slug:
-            continue
+    def matching(self, filters):
+        """Row positions matching every column filter (values within a column are OR-ed)."""
+        result = None
+        for column, values in filters.items():
+            postings = self.postings[column]
+            rows = set()
+            for value in values:
+                rows |= postings.get(value.strip().lower(), set())
+            result = rows if result is None else result & rows
+        return result
 
-        out = {
-            'company': c.get('company', ''),
-            'sector': c.get('sector', ''),
-            'market': c.get('market', ''),
-            'source': c.get('source', ''),
-            'slug': slug,
-            'website': c.get('website', ''),
-            'logo_url': c.get('logo_url') or c.get('logo', ''),
-        }
+    def query(self, filters=None, sort=None, descending=False, offset=0, limit=None):
+        """(total, positions) for one page."""
+        matched = self.matching(filters or {})
+        if sort:
+            order = self.orders[sort][1 if descending else 0]
+        else:
+            order = range(len(self.rows))
+        if matched is not None:
+            order = [i for i in order if i in matched]
+        total = len(order)
+        end = None if limit is None else offset + limit
+        return total, list(order[offset:end])
+
+    def project(self, pos, fields=None, exclude=None):
+        """Row as a dict; `slug` is available as a computed field."""
+        company = self.rows[pos]
+        if fields:
+            out = {f: company[f] for f in fields if f in company}
+            if 'slug' in fields:
+                out['slug'] = self.slugs[pos]
+            return out
+        if exclude:
+            out = {k: v for k, v in company.items() if k not in exclude}
+        else:
+            out = dict(company)
+        out['slug'] = self.slugs[pos]
+        return out
 
-        source = _normalize(c.get('source', ''))
-        sector = _normalize(c.get('sector', ''))
-        market = _normalize(c.get('market', ''))
 
-        # Sibling: same PE firm (source)
-        if source and source == cur_source:
-            siblings.append(out)
-            continue
+class _CompanyNeighborIndex:
+    """
+    Sibling / similar-company buckets built once per portfolio data version.
 
-        # Similar: same sector (direct peers)
-        if sector and sector == cur_sector:
-            # Prefer same market for ranking
-            score = 2 if market and cur_market and (market in cur_market or cur_market in market) else 1
-            similar.append((score, out))
-            continue
+    Rows are kept in merged-portfolio order and grouped by source (PE firm), sector
+    and (sector, market), so _compute_smart_sections only touches the buckets of the
+    company being rendered.
+    """
 
-    # Sort similar by score (same market first)
-    similar.sort(key=lambda x: -x[0])
-    similar = [x[1] for x in similar[:8]]
+    def __init__(self, all_companies):
+        self.rows = []  # (name, source, sector, market, out)
+        self.by_source = {}
+        self.by_sector = {}
+        self.by_sector_market = {}
+        for c in all_companies:
+            slug = _company_slug(c)
+            if not slug:
+                continue
+            out = freeze({
+                'company': c.get('company', ''),
+                'sector': c.get('sector', ''),
+                'market': c.get('market', ''),
+                'source': c.get('source', ''),
+                'slug': slug,
+                'website': c.get('website', ''),
+                'logo_url': c.get('logo_url') or c.get('logo', ''),
+            })
+            name = _normalize_smart_field(c.get('company', ''))
+            source = _normalize_smart_field(c.get('source', ''))
+            sector = _normalize_smart_field(c.get('sector', ''))
+            market = _normalize_smart_field(c.get('market', ''))
+            pos = len(self.rows)
+            self.rows.append((name, source, sector, market, out))
+            if source:
+                self.by_source.setdefault(source, []).append(pos)
+            if sector:
+                self.by_sector.setdefault(sector, []).append(pos)
+                self.by_sector_market.setdefault(sector, {}).setdefault(market, []).append(pos)
+
+    def smart_sections(self, company):
+        cur_name = _normalize_smart_field(company.get('company', ''))
+        cur_source = _normalize_smart_field(company.get('source', ''))
+        cur_sector = _normalize_smart_field(company.get('sector', ''))
+        cur_market = _normalize_smart_field(company.get('market', ''))
+        rows = self.rows
 
-    # Limit siblings to 12
-    siblings = siblings[:12]
+        # Sibling: same PE firm (source)
+        siblings = []
+        for pos in self.by_source.get(cur_source, ()) if cur_source else ():
+            if rows[pos][0] == cur_name:
+                continue
+            siblings.append(rows[pos][4])
+            if len(siblings) == _SMART_SIBLING_LIMIT:
+                break
+
+        # Similar: same sector (direct peers), same/overlapping market ranked first
+        def _is_similar(pos):
+            name, source = rows[pos][0], rows[pos][1]
+            return name != cur_name and not (source and source == cur_source)
+
+        similar = []
+        if cur_sector in self.by_sector:
+            markets = self.by_sector_market[cur_sector]
+            near = []
+            if cur_market:
+                near = [
+                    m for m in markets
+                    if m and (m in cur_market or cur_market in m)
+                ]
+            for pos in heapq.merge(*(markets[m] for m in near)):
+                if _is_similar(pos):
+                    similar.append(rows[pos][4])
+                    if len(similar) == _SMART_SIMILAR_LIMIT:
+                        break
+            if len(similar) < _SMART_SIMILAR_LIMIT:
+                near_set = set(near)
+                for pos in self.by_sector[cur_sector]:
+                    if rows[pos][3] in near_set or not _is_similar(pos):
+                        continue
+                    similar.append(rows[pos][4])
+                    if len(similar) == _SMART_SIMILAR_LIMIT:
+                        break
+
+        return {
+            'similar_companies': similar,
+            'sibling_companies': siblings,
+        }
 
-    return {
-        'similar_companies': similar,
-        'sibling_companies': siblings,
-    }
+
+def _compute_smart_sections(company, neighbors=None):
+    """
+    Compute similar companies and sibling companies (same PE firm).
+    Returns dict with similar_companies, sibling_companies.
+    """
+    if neighbors is None:
+        neighbors = portfolio_view.get()['neighbors']
+    return neighbors.smart_sections(company)
 
 
 def _prepare_company_for_response(c):
@@ -2153,96 +2751,148 @@ def _normalize_company_slug_legacy(s):
     return s.replace(' ', '-')
 
 
-def _resolve_company_by_slug(company_slug):
+_SLUG_MEMO_MAX = 4096
+
+
+def _canonical_slug_key(company):
+    """Slug form matched by the first two resolver passes (regex-normalized name + source)."""
+    slug_name = _normalize_company_slug(company.get('company', ''))
+    slug_source = _normalize_company_slug(company.get('source', ''))
+    return f"{slug_name}-{slug_source}" if slug_name and slug_source else ''
+
+
+def _legacy_slug_key(company):
+    """Old-style slug (spaces -> dashes, no character stripping)."""
+    slug_name_legacy = (company.get('company') or '').lower().replace(' ', '-').replace('&', 'and')
+    slug_source_legacy = (company.get('source') or '').lower().replace(' ', '-')
+    return f"{slug_name_legacy}-{slug_source_legacy}"
+
+
+class _CompanySlugIndex:
     """
-    Resolve portfolio company + smart sections by URL slug.
-    Returns (company_dict, smart_dict) or (None, None).
+    Slug -> company lookups built once per portfolio data version.
+
+    Reproduces the precedence of the original linear resolver:
+      1. curated portfolio_enriched rows with UC tables (canonical slug)
+      2. merged portfolio rows (canonical slug)
+      3. merged rows, first of: legacy slug / loose "name ... firm" match
+      4. pe_firms_database portfolio_companies (legacy-normalized slug / loose match)
+    Exact forms are dict lookups; each maps to the position of its first match so the
+    loose fallbacks only scan rows that come before it.
     """
-    import urllib.parse
-    import re
 
-    decoded_slug = urllib.parse.unquote(company_slug or '')
-    norm_decoded = _normalize_company_slug(decoded_slug.replace('-', ' '))
+    def __init__(self, port_list, merged_companies, pe_firms):
+        self.enriched_by_name, self.enriched_by_lower = _enriched_curated_index(port_list)
 
-    port_list = _fresh_portfolio_list()
-    merged_companies = _merged_portfolio_companies(port_list)
-    enriched_by_name, enriched_by_lower = _enriched_curated_index(port_list)
+        self.uc_rows = {}
+        for company in port_list:
+            if company.get('source') not in _CURATED_PORTFOLIO_FIRM_SOURCES:
+                continue
+            if not _has_uc_financials(company):
+                continue
+            self.uc_rows.setdefault(_canonical_slug_key(company), company)
+
+        self.merged = merged_companies
+        self.canonical = {}
+        self.legacy = {}
+        self.loose = []
+        for pos, company in enumerate(merged_companies):
+            self.canonical.setdefault(_canonical_slug_key(company), company)
+            self.legacy.setdefault(_legacy_slug_key(company), pos)
+            self.loose.append(((company.get('company') or '').lower(), (company.get('source') or '').lower()))
+
+        self.pe_rows = []
+        self.pe_exact = {}
+        for firm_name, firm_data in pe_firms.items():
+            if not firm_data.get('portfolio_companies'):
+                continue
+            slug_firm = _normalize_company_slug_legacy(firm_name)
+            for pc in firm_data['portfolio_companies']:
+                pc_slug = _normalize_company_slug_legacy(pc.get('name') or '')
+                self.pe_exact.setdefault(f"{pc_slug}-{slug_firm}", len(self.pe_rows))
+                self.pe_rows.append((pc_slug, slug_firm, pc, firm_name))
+
+        self._memo = {}
+
+    def resolve(self, decoded_slug):
+        """Company row for a decoded URL slug, or None."""
+        if decoded_slug in self._memo:
+            return self._memo[decoded_slug]
+        company = self._resolve(decoded_slug)
+        if len(self._memo) >= _SLUG_MEMO_MAX:
+            self._memo.clear()
+        self._memo[decoded_slug] = company
+        return company
+
+    def _resolve(self, decoded_slug):
+        norm_decoded = _normalize_company_slug(decoded_slug.replace('-', ' '))
+
+        # Curated firms: prefer portfolio_enriched row when it has UC tables
+        company = self.uc_rows.get(norm_decoded)
+        if company is not None:
+            return _normalize_enriched_company_row(company)
+
+        company = self.canonical.get(norm_decoded)
+        if company is not None:
+            return company
+
+        parts = decoded_slug.split('-')
+        company_name_match = ''
+        source_match = ''
+        if len(parts) >= 2:
+            source_match = '-'.join(parts[-2:])
+            company_name_parts = parts[:-2] if len(parts) > 2 else [parts[0]]
+            company_name_match = ' '.join(company_name_parts)
+
+        first = self.legacy.get(decoded_slug.lower(), len(self.merged))
+        if company_name_match and source_match:
+            name_q, source_q = company_name_match.lower(), source_match.lower()
+            for pos in range(first):
+                name, source = self.loose[pos]
+                if name_q in name and source_q in source:
+                    first = pos
+                    break
+        if first < len(self.merged):
+            return self.merged[first]
+
+        norm_decoded_legacy = _normalize_company_slug_legacy(decoded_slug.replace('-', ' '))
+        first = min(
+            self.pe_exact.get(decoded_slug.lower(), len(self.pe_rows)),
+            self.pe_exact.get(norm_decoded_legacy, len(self.pe_rows)),
+        )
+        if len(parts) >= 2 and company_name_match:
+            name_q = _normalize_company_slug_legacy(company_name_match)
+            source_q = source_match.lower()
+            for pos in range(first):
+                pc_slug, slug_firm = self.pe_rows[pos][:2]
+                if name_q in pc_slug and source_q in slug_firm:
+                    first = pos
+                    break
+        if first < len(self.pe_rows):
+            _, _, pc, firm_name = self.pe_rows[first]
+            company_data = company_dict_from_pe_firms_portfolio_pc(pc, firm_name)
+            pc_name = (company_data.get('company') or '').strip()
+            enriched = self.enriched_by_name.get(pc_name) or self.enriched_by_lower.get(pc_name.lower())
+            return _overlay_enriched_onto_row(company_data, enriched)
 
-    def _return(company):
-        prepared = _prepare_company_for_response(company)
-        smart = _compute_smart_sections(prepared, merged_companies)
-        return prepared, smart
+        return None
 
-    # Curated firms: prefer portfolio_enriched row when it has UC tables
-    for company in port_list:
-        if company.get('source') not in _CURATED_PORTFOLIO_FIRM_SOURCES:
-            continue
-        if not _has_uc_financials(company):
-            continue
-        slug_name = _normalize_company_slug(company.get('company', ''))
-        slug_source = _normalize_company_slug(company.get('source', ''))
-        expected = f"{slug_name}-{slug_source}" if slug_name and slug_source else ''
-        if norm_decoded == expected:
-            return _return(_normalize_enriched_company_row(company))
-
-    for company in merged_companies:
-        slug_name = _normalize_company_slug(company.get('company', ''))
-        slug_source = _normalize_company_slug(company.get('source', ''))
-        expected = f"{slug_name}-{slug_source}" if slug_name and slug_source else ''
-        if norm_decoded == expected:
-            return _return(company)
-
-    parts = decoded_slug.split('-')
-    company_name_match = ''
-    source_match = ''
-    if len(parts) >= 2:
-        source_match = '-'.join(parts[-2:]) if len(parts) >= 2 else parts[-1]
-        company_name_parts = parts[:-2] if len(parts) > 2 else [parts[0]]
-        company_name_match = ' '.join(company_name_parts)
-
-    for company in merged_companies:
-        slug_name = _normalize_company_slug(company.get('company', ''))
-        slug_source = _normalize_company_slug(company.get('source', ''))
-        expected = f"{slug_name}-{slug_source}" if slug_name and slug_source else ''
-        if norm_decoded == expected:
-            return _return(company)
-
-        slug_name_legacy = (company.get('company') or '').lower().replace(' ', '-').replace('&', 'and')
-        slug_source_legacy = (company.get('source') or '').lower().replace(' ', '-')
-        expected_legacy = f"{slug_name_legacy}-{slug_source_legacy}"
-        if decoded_slug.lower() == expected_legacy:
-            return _return(company)
 
-        if company_name_match and source_match:
-            company_name = (company.get('company') or '').lower()
-            source = (company.get('source') or '').lower()
-            if company_name_match.lower() in company_name and source_match.lower() in source:
-                return _return(company)
+def _resolve_company_by_slug(company_slug):
+    """
+    Resolve portfolio company + smart sections by URL slug.
+    Returns (company_dict, smart_dict) or (None, None).
+    """
+    import urllib.parse
 
-    if os.path.exists(data_path('pe_firms_database.json')):
-        with open(data_path('pe_firms_database.json'), 'r', encoding='utf-8') as pf:
-            pe_data = json.load(pf)
-            pe_firms = pe_data.get('pe_firms', {})
-            for firm_name, firm_data in pe_firms.items():
-                if not firm_data.get('portfolio_companies'):
-                    continue
-                slug_firm = _normalize_company_slug_legacy(firm_name)
-                for pc in firm_data['portfolio_companies']:
-                    pc_slug = _normalize_company_slug_legacy(pc.get('name') or '')
-                    expected = f"{pc_slug}-{slug_firm}"
-                    norm_decoded_legacy = _normalize_company_slug_legacy(decoded_slug.replace('-', ' '))
-                    if decoded_slug.lower() == expected or norm_decoded_legacy == expected or (
-                        len(parts) >= 2 and company_name_match
-                        and _normalize_company_slug_legacy(company_name_match) in pc_slug
-                        and source_match.lower() in slug_firm
-                    ):
-                        company_data = company_dict_from_pe_firms_portfolio_pc(pc, firm_name)
-                        pc_name = (company_data.get('company') or '').strip()
-                        enriched = enriched_by_name.get(pc_name) or enriched_by_lower.get(pc_name.lower())
-                        company_data = _overlay_enriched_onto_row(company_data, enriched)
-                        return _return(company_data)
-
-    return None, None
+    decoded_slug = urllib.parse.unquote(company_slug or '')
+    view = portfolio_view.get()
+    company = view['slug_index'].resolve(decoded_slug)
+    if company is None:
+        return None, None
+    prepared = _prepare_company_for_response(company)
+    smart = _compute_smart_sections(prepared, view['neighbors'])
+    return prepared, smart
 
 
 @app.route('/api/company/<company_slug>', methods=['GET'])
@@ -2276,22 +2926,20 @@ def research_portfolio_company(company_name):
         
         # Try to load from enriched database first
         enriched_data = None
-        for filename in [data_path('portfolio_enriched.json'), data_path('portfolio_enriched_sample.json')]:
-            if os.path.exists(filename):
+        for filename in ['portfolio_enriched.json', 'portfolio_enriched_sample.json']:
+            if os.path.exists(data_path(filename)):
                 try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        enriched_db = json.load(f)
-                        companies = enriched_db.get('companies', [])
-                        
-                        # Find matching company
-                        for company in companies:
-                            if company.get('company', '').lower() == company_name.lower():
-                                enriched_data = company
-                                print(f"  Found enriched data in {filename}")
-                                break
-                        
-                        if enriched_data:
+                    companies = datasets.get(filename).get('companies', [])
+
+                    # Find matching company
+                    for company in companies:
+                        if company.get('company', '').lower() == company_name.lower():
+                            enriched_data = company
+                            print(f"  Found enriched data in {filename}")
                             break
+
+                    if enriched_data:
+                        break
                 except Exception as e:
                     print(f"  Error loading {filename}: {e}")
         
@@ -2372,7 +3020,58 @@ def research_portfolio_company(company_name):
         }), 500
 
 
-_refresh_search_index_file()
+def _startup_phase(timings, name, func):
+    started = time.perf_counter()
+    try:
+        func()
+    finally:
+        timings.append((name, time.perf_counter() - started))
+
+
+def _warm_search_indexes():
+    for domain in SEARCH_DOMAINS:
+        try:
+            _search_domain_index(domain)
+        except Exception as e:
+            print(f'Warm-up: {domain} search index unavailable: {e}')
+
+
+def _warm_deal_tables():
+    for name, view in deal_tables.items():
+        try:
+            view.get()
+        except Exception as e:
+            print(f'Warm-up: {name} deal table unavailable: {e}')
+
+
+def run_startup():
+    """
+    Load the data and build every in-memory index once, logging time per phase.
+    Under `gunicorn --preload` this runs in the master before workers fork, so the
+    workers share the parsed data copy-on-write instead of each rebuilding it.
+    """
+    timings = []
+    started = time.perf_counter()
+    _startup_phase(timings, 'news', load_news_database)
+    _startup_phase(timings, 'portfolio', load_portfolio_database)
+    _startup_phase(timings, 'forum schema', init_forum_db)
+    _startup_phase(timings, 'portfolio view', portfolio_view.get)
+    _startup_phase(timings, 'search indexes', _warm_search_indexes)
+    _startup_phase(timings, 'deal tables', _warm_deal_tables)
+    _startup_phase(timings, 'static search index', _refresh_search_index_file)
+    _startup_phase(timings, 'geoip', geoip.load)
+    if sqlite_store is not None:
+        _startup_phase(timings, 'sqlite sync', sqlite_store.sync)
+    # Move startup objects out of the cyclic GC so collections in forked workers
+    # don't write to (and un-share) their memory pages
+    gc.freeze()
+    total = time.perf_counter() - started
+    breakdown = ', '.join(f'{name} {secs * 1000:.0f}ms' for name, secs in timings)
+    print(f'Startup: {breakdown} (total {total * 1000:.0f}ms, pid {os.getpid()})')
+
+
+# Load news, portfolio and indexes on startup
+run_startup()
 
 
 # Run the application
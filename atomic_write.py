@@ -0,0 +1,120 @@
+"""
+Crash- and reader-safe writes for the JSON data files.
+
+Writers never touch the target in place: data goes to a temp file in the same
+directory, is fsync()ed and then renamed over the target, so a reader (an app
+worker re-parsing the file) sees either the old or the new version, never a
+truncated one. Writers of the same file are serialized by an advisory lock on
+a <file>.lock sidecar, which read-modify-write updates (update_json) hold
+across the read too.
+
+Every write also stamps the new file with an mtime strictly greater than the
+old one. data_store keys its cache on (mtime_ns, size), so two writes within
+one clock tick that happen to produce the same size are still seen as a new
+version on the next request.
+"""
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic, only the lock is skipped
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """Advisory lock on `path`.lock (exclusive unless shared=True) for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def _next_mtime_ns(path):
+    """Now, or 1ns past the current file's mtime if the clock hasn't moved past it."""
+    now = time.time_ns()
+    try:
+        return max(now, os.stat(path).st_mtime_ns + 1)
+    except OSError:
+        return now
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_bytes(path, data, mode=0o644, fsync=True):
+    """Replace `path` with `data` atomically (temp file + fsync + rename). Caller handles locking."""
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        stamp = _next_mtime_ns(path)
+        os.utime(tmp, ns=(stamp, stamp))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(directory)
+
+
+def dump_json(data, indent=2, ensure_ascii=False, trailing_newline=False):
+    """Serialized JSON as UTF-8 bytes, in the formatting the data files use."""
+    text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+    if trailing_newline:
+        text += '\n'
+    return text.encode('utf-8')
+
+
+def write_json(path, data, indent=2, ensure_ascii=False, trailing_newline=False):
+    """Atomically replace a JSON file, holding its write lock."""
+    path = os.fspath(path)
+    payload = dump_json(data, indent, ensure_ascii, trailing_newline)
+    with file_lock(path):
+        write_bytes(path, payload)
+
+
+def update_json(path, update, default=None, indent=2, ensure_ascii=False, trailing_newline=False):
+    """
+    Read-modify-write under the file's lock: `update(data)` receives the parsed
+    file (or `default` when it does not exist) and returns the data to write.
+    Returns what was written.
+    """
+    path = os.fspath(path)
+    with file_lock(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = default
+        data = update(data)
+        write_bytes(path, dump_json(data, indent, ensure_ascii, trailing_newline))
+    return data
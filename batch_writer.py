@@ -0,0 +1,117 @@
+"""
+Background writer that batches small writes off the request path.
+
+Callers put() items on a bounded in-memory queue and return immediately. One
+daemon thread per process collects them and hands them to `flush(items)` in
+batches: as soon as `max_batch` items are waiting, or `interval` seconds after
+the first item of a batch arrived, whichever comes first. So a burst of N
+items costs about N / max_batch transactions instead of N.
+
+Memory is bounded by `max_pending`: when the writer falls that far behind,
+new items are dropped (and counted in `dropped`) rather than queued. Items
+still queued at interpreter exit are flushed by an atexit hook. The thread is
+started lazily on the first put() and restarted in a forked child (gunicorn
+--preload), where the parent's thread does not exist.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class BatchWriter:
+    def __init__(self, flush, max_batch=200, interval=0.5, max_pending=10000, name="batch-writer"):
+        self._flush = flush
+        self.max_batch = max(1, int(max_batch))
+        self.interval = max(0.0, float(interval))
+        self.max_pending = max(1, int(max_pending))
+        self.name = name
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(self.max_pending)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def put(self, item):
+        """Queue one item; never blocks. Returns False when the queue is full and the item was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self, timeout=5.0):
+        """Flush everything queued so far and stop the thread (it restarts on the next put)."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked child: items queued in the parent are the parent's to write
+                self._queue = queue.Queue(self.max_pending)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            batch = []
+            deadline = time.monotonic() + self.interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+        # Anything put after the stop marker
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for i in range(0, len(rest), self.max_batch):
+            self._write(rest[i:i + self.max_batch])
+
+    def _write(self, batch):
+        try:
+            self._flush(batch)
+            self.written += len(batch)
+        except Exception as e:
+            print(f"{self.name}: dropped a batch of {len(batch)} ({e})")
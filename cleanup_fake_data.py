@@ -3,180 +3,168 @@
 Comprehensive cleanup script to remove all fake/sample data
 """
 
-import json
 from datetime import datetime
 
+from atomic_write import update_json
+
 def clean_news_database():
     """Remove all fake news articles"""
     print("=== CLEANING NEWS DATABASE ===")
     
-    with open('pe_news_database.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    original_count = len(data['news'])
-    
-    # Remove all 2025 articles (fake)
-    data['news'] = [article for article in data['news'] if '2025' not in article.get('date', '')]
-    
-    # Remove specific fake articles
-    fake_titles_to_remove = [
-        'Rgol',  # Remove Rgol news from Accent
-        'Eltel',  # Remove Eltel news from Adelis
-        'Nordic Services Group',  # Remove fake Bure contract
-        'Major Contract',  # Remove fake Bure contract
-        'Series B',  # Remove fake Verdane Series B
-        'Fund XII',  # Remove fake Verdane fund
-        'SaaS Champion',  # Remove fake Verdane SaaS
-        'Strategic Buyer',  # Remove fake Verdane exit
-        'Team Hires',  # Remove fake Verdane hires
-        'Product Launch',  # Remove fake Verdane product
-        'B2B Market Leader',  # Remove fake Verdane B2B
-        'Top Performance',  # Remove fake Verdane performance
-        'Fund VIII',  # Remove fake Accent fund
-        'Industrial Company',  # Remove fake Accent exit
-        'Tech Platform',  # Remove fake Accent tech
-        'Fund VII',  # Remove fake Accent fund VII
-        'Record Sales',  # Remove fake Accent sales
-        'Healthcare Technology',  # Remove fake Adelis healthcare
-        'Property Services',  # Remove fake Adelis property
-        'Circura Group',  # Remove fake Adelis Circura
-        'Operations Expansion',  # Remove fake Adelis operations
-        'Strong Performance',  # Remove fake Adelis performance
-        'Fund Close',  # Remove fake CapMan fund
-        'Healthcare Investment',  # Remove fake CapMan healthcare
-        'Competitor Acquisition',  # Remove fake CapMan acquisition
-        'Logistics Portfolio',  # Remove fake CapMan logistics
-        'Fund IV Exit',  # Remove fake CapMan exit
-        'Renewable Energy',  # Remove fake CapMan energy
-        'Fund Launch',  # Remove fake Celero fund
-        'Fintech Investment',  # Remove fake Celero fintech
-        'Health Tech',  # Remove fake Celero health tech
-        'Follow-On Round',  # Remove fake Celero follow-on
-        'Fund IV Launch',  # Remove fake Polaris fund
-        'Services Company',  # Remove fake Polaris services
-        'Growth Milestone',  # Remove fake Polaris milestone
-        'Strategic Exit',  # Remove fake Polaris exit
-        'Manufacturing Investment',  # Remove fake Polaris manufacturing
-        'Add-On Acquisition',  # Remove fake Bure acquisition
-        'SaaS Platform',  # Remove fake Bure SaaS
-        'Fund Exit',  # Remove fake Bure exit
-        'New Partner',  # Remove fake Bure partner
-        'Fundraising Target',  # Remove fake Bure fundraising
-        'Q3 Results',  # Remove fake Bure results
-    ]
-    
-    # Remove articles with fake titles
-    data['news'] = [article for article in data['news'] 
-                   if not any(fake_title.lower() in article.get('title', '').lower() 
-                             for fake_title in fake_titles_to_remove)]
-    
-    # Remove articles with fake descriptions
-    fake_desc_keywords = [
-        'sample', 'fake', 'test', 'example', 'placeholder', 'dummy',
-        'announces', 'launches', 'completes', 'secures', 'achieves',
-        'strong performance', 'record', 'exceptional', 'significant',
-        'strategic', 'leading', 'innovative', 'expansion', 'growth'
-    ]
-    
-    # Keep only articles that seem real (have specific company names, real events)
-    real_articles = []
-    for article in data['news']:
-        title = article.get('title', '')
-        description = article.get('description', '')
-        
-        # Keep if it mentions specific real companies or has specific details
-        real_indicators = [
-            'Nasdaq', 'Stockholm', 'Oslo', 'Copenhagen', 'Helsinki',
-            'SEK', 'EUR', 'USD', 'NOK', 'DKK',
-            'Q1', 'Q2', 'Q3', 'Q4', '2024', '2023', '2022', '2021',
-            'IPO', 'acquisition', 'merger', 'investment', 'exit',
-            'contract', 'agreement', 'partnership'
+    def remove_fake_news(data):
+        original_count = len(data['news'])
+    
+        # Remove all 2025 articles (fake)
+        data['news'] = [article for article in data['news'] if '2025' not in article.get('date', '')]
+    
+        # Remove specific fake articles
+        fake_titles_to_remove = [
+            'Rgol',  # Remove Rgol news from Accent
+            'Eltel',  # Remove Eltel news from Adelis
+            'Nordic Services Group',  # Remove fake Bure contract
+            'Major Contract',  # Remove fake Bure contract
+            'Series B',  # Remove fake Verdane Series B
+            'Fund XII',  # Remove fake Verdane fund
+            'SaaS Champion',  # Remove fake Verdane SaaS
+            'Strategic Buyer',  # Remove fake Verdane exit
+            'Team Hires',  # Remove fake Verdane hires
+            'Product Launch',  # Remove fake Verdane product
+            'B2B Market Leader',  # Remove fake Verdane B2B
+            'Top Performance',  # Remove fake Verdane performance
+            'Fund VIII',  # Remove fake Accent fund
+            'Industrial Company',  # Remove fake Accent exit
+            'Tech Platform',  # Remove fake Accent tech
+            'Fund VII',  # Remove fake Accent fund VII
+            'Record Sales',  # Remove fake Accent sales
+            'Healthcare Technology',  # Remove fake Adelis healthcare
+            'Property Services',  # Remove fake Adelis property
+            'Circura Group',  # Remove fake Adelis Circura
+            'Operations Expansion',  # Remove fake Adelis operations
+            'Strong Performance',  # Remove fake Adelis performance
+            'Fund Close',  # Remove fake CapMan fund
+            'Healthcare Investment',  # Remove fake CapMan healthcare
+            'Competitor Acquisition',  # Remove fake CapMan acquisition
+            'Logistics Portfolio',  # Remove fake CapMan logistics
+            'Fund IV Exit',  # Remove fake CapMan exit
+            'Renewable Energy',  # Remove fake CapMan energy
+            'Fund Launch',  # Remove fake Celero fund
+            'Fintech Investment',  # Remove fake Celero fintech
+            'Health Tech',  # Remove fake Celero health tech
+            'Follow-On Round',  # Remove fake Celero follow-on
+            'Fund IV Launch',  # Remove fake Polaris fund
+            'Services Company',  # Remove fake Polaris services
+            'Growth Milestone',  # Remove fake Polaris milestone
+            'Strategic Exit',  # Remove fake Polaris exit
+            'Manufacturing Investment',  # Remove fake Polaris manufacturing
+            'Add-On Acquisition',  # Remove fake Bure acquisition
+            'SaaS Platform',  # Remove fake Bure SaaS
+            'Fund Exit',  # Remove fake Bure exit
+            'New Partner',  # Remove fake Bure partner
+            'Fundraising Target',  # Remove fake Bure fundraising
+            'Q3 Results',  # Remove fake Bure results
         ]
-        
-        if any(indicator in title or indicator in description for indicator in real_indicators):
-            real_articles.append(article)
     
-    data['news'] = real_articles
-    data['total_news'] = len(real_articles)
+        # Remove articles with fake titles
+        data['news'] = [article for article in data['news'] 
+                       if not any(fake_title.lower() in article.get('title', '').lower() 
+                                 for fake_title in fake_titles_to_remove)]
+    
+        # Remove articles with fake descriptions
+        fake_desc_keywords = [
+            'sample', 'fake', 'test', 'example', 'placeholder', 'dummy',
+            'announces', 'launches', 'completes', 'secures', 'achieves',
+            'strong performance', 'record', 'exceptional', 'significant',
+            'strategic', 'leading', 'innovative', 'expansion', 'growth'
+        ]
     
-    print(f"Removed {original_count - len(real_articles)} fake articles")
-    print(f"Remaining real articles: {len(real_articles)}")
+        # Keep only articles that seem real (have specific company names, real events)
+        real_articles = []
+        for article in data['news']:
+            title = article.get('title', '')
+            description = article.get('description', '')
+        
+            # Keep if it mentions specific real companies or has specific details
+            real_indicators = [
+                'Nasdaq', 'Stockholm', 'Oslo', 'Copenhagen', 'Helsinki',
+                'SEK', 'EUR', 'USD', 'NOK', 'DKK',
+                'Q1', 'Q2', 'Q3', 'Q4', '2024', '2023', '2022', '2021',
+                'IPO', 'acquisition', 'merger', 'investment', 'exit',
+                'contract', 'agreement', 'partnership'
+            ]
+        
+            if any(indicator in title or indicator in description for indicator in real_indicators):
+                real_articles.append(article)
     
-    # Save cleaned data
-    with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        data['news'] = real_articles
+        data['total_news'] = len(real_articles)
     
-    return real_articles
+        print(f"Removed {original_count - len(real_articles)} fake articles")
+        print(f"Remaining real articles: {len(real_articles)}")
+        return data
+
+    data = update_json('pe_news_database.json', remove_fake_news)
+    return data['news']
 
 def clean_portfolio_database():
     """Remove fake portfolio companies"""
     print("\n=== CLEANING PORTFOLIO DATABASE ===")
     
-    with open('portfolio_enriched.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    original_count = len(data['companies'])
-    
-    # Remove fake companies
-    fake_companies = [
-        'TechCorp Solutions', 'HealthFlow Systems', 'DataPulse Analytics',
-        'Nordic Services Group', 'Industrial Pro Solutions', 
-        'CareConnect Healthcare', 'Nordic Manufacturing Co'
-    ]
+    def remove_fake_companies(data):
+        original_count = len(data['companies'])
     
-    data['companies'] = [company for company in data['companies'] 
-                        if company.get('company', '') not in fake_companies]
+        # Remove fake companies
+        fake_companies = [
+            'TechCorp Solutions', 'HealthFlow Systems', 'DataPulse Analytics',
+            'Nordic Services Group', 'Industrial Pro Solutions', 
+            'CareConnect Healthcare', 'Nordic Manufacturing Co'
+        ]
     
-    print(f"Removed {original_count - len(data['companies'])} fake companies")
-    print(f"Remaining companies: {len(data['companies'])}")
+        data['companies'] = [company for company in data['companies'] 
+                            if company.get('company', '') not in fake_companies]
     
-    # Save cleaned data
-    with open('portfolio_enriched.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"Removed {original_count - len(data['companies'])} fake companies")
+        print(f"Remaining companies: {len(data['companies'])}")
+        return data
+
+    update_json('portfolio_enriched.json', remove_fake_companies)
 
 def clean_pe_firms_database():
     """Clean PE firms database of fake recent activity"""
     print("\n=== CLEANING PE FIRMS DATABASE ===")
     
-    with open('pe_firms_database.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Clean recent activity for firms with fake data
-    firms_to_clean = ['Accent Equity', 'Adelis Equity', 'Bure Equity', 'Verdane', 'CapMan', 'Celero', 'Polaris']
+    def clean_recent_activity(data):
+        # Clean recent activity for firms with fake data
+        firms_to_clean = ['Accent Equity', 'Adelis Equity', 'Bure Equity', 'Verdane', 'CapMan', 'Celero', 'Polaris']
     
-    for firm_name in firms_to_clean:
-        if firm_name in data['pe_firms']:
-            # Replace fake recent activity with generic placeholder
-            data['pe_firms'][firm_name]['recent_activity'] = f"{firm_name} is an active private equity firm focused on Nordic investments. Please visit their website for the latest news and updates."
+        for firm_name in firms_to_clean:
+            if firm_name in data['pe_firms']:
+                # Replace fake recent activity with generic placeholder
+                data['pe_firms'][firm_name]['recent_activity'] = f"{firm_name} is an active private equity firm focused on Nordic investments. Please visit their website for the latest news and updates."
     
-    print(f"Cleaned recent activity for {len(firms_to_clean)} firms")
-    
-    # Save cleaned data
-    with open('pe_firms_database.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"Cleaned recent activity for {len(firms_to_clean)} firms")
+        return data
+
+    update_json('pe_firms_database.json', clean_recent_activity)
 
 def add_real_logos():
     """Add real logos for Celero, CapMan, Polaris"""
     print("\n=== ADDING REAL LOGOS ===")
     
-    with open('pe_firms_database.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Update logos to use real sources
-    logo_updates = {
-        'CapMan': 'https://logo.clearbit.com/capman.com',
-        'Celero': 'https://ui-avatars.com/api/?name=Celero&background=7c2d12&color=ffffff&size=64',
-        'Polaris': 'https://ui-avatars.com/api/?name=Polaris&background=1e40af&color=ffffff&size=64'
-    }
-    
-    for firm_name, logo_url in logo_updates.items():
-        if firm_name in data['pe_firms']:
-            data['pe_firms'][firm_name]['logo_url'] = logo_url
-            print(f"Updated logo for {firm_name}")
-    
-    # Save updated data
-    with open('pe_firms_database.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    def update_logos(data):
+        # Update logos to use real sources
+        logo_updates = {
+            'CapMan': 'https://logo.clearbit.com/capman.com',
+            'Celero': 'https://ui-avatars.com/api/?name=Celero&background=7c2d12&color=ffffff&size=64',
+            'Polaris': 'https://ui-avatars.com/api/?name=Polaris&background=1e40af&color=ffffff&size=64'
+        }
+    
+        for firm_name, logo_url in logo_updates.items():
+            if firm_name in data['pe_firms']:
+                data['pe_firms'][firm_name]['logo_url'] = logo_url
+                print(f"Updated logo for {firm_name}")
+        return data
+
+    update_json('pe_firms_database.json', update_logos)
 
 def main():
     """Main cleanup function"""
@@ -3,9 +3,9 @@
 Create real Nordic PE news database based on actual Cision data
 """
 
-import json
 from datetime import datetime, timedelta
 import random
+from atomic_write import write_json
 
 def create_real_pe_news():
     """Create real Nordic PE news based on actual Cision data"""
@@ -185,8 +185,7 @@ def create_real_pe_news():
     }
     
     # Save to file
-    with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-        json.dump(news_database, f, indent=2, ensure_ascii=False)
+    write_json('pe_news_database.json', news_database)
     
     print(f"✅ Created {len(real_news)} real Nordic PE news items")
     print(f"📁 Saved to: pe_news_database.json")
@@ -4,8 +4,8 @@ Create real Nordic PE deals database
 Only include verified deals with actual transaction values
 """
 
-import json
 from datetime import datetime
+from atomic_write import write_json
 
 def create_real_nordic_deals():
     """Create database with only real, verified Nordic PE deals"""
@@ -227,8 +227,7 @@ def main():
     deals_data = create_real_nordic_deals()
     
     # Save to file
-    with open('deal_flow_database.json', 'w', encoding='utf-8') as f:
-        json.dump(deals_data, f, indent=2, ensure_ascii=False)
+    write_json('deal_flow_database.json', deals_data)
     
     print(f"✅ Created database with {len(deals_data['deals'])} real Nordic PE deals")
     print("📊 All deals are verified transactions with real values")
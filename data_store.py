@@ -0,0 +1,264 @@
+"""
+Shared in-process cache for the JSON databases served by app.py.
+
+Each file is parsed once per worker and handed out as a read-only snapshot.
+On every access the file is stat()ed; it is re-parsed only when its mtime or
+size changed, so editing a JSON file is still picked up on the next request.
+
+With a snapshot_dir, the frozen result of a parse is also pickled to
+<snapshot_dir>/<filename>.<content hash>.pickle. The next load of the same
+bytes (a cold start, another worker, a touch without edits) unpickles that
+instead of running json + freeze, which is several times faster. The JSON
+stays the source of truth: a snapshot is only used when its hash matches the
+file's current bytes, and stale ones are removed when a new one is written.
+With snapshot_mmap the snapshot is unpickled straight from a read-only mmap,
+so workers read the shared page-cache pages instead of each copying the file.
+"""
+import errno
+import glob
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import threading
+
+from atomic_write import write_bytes
+
+
+class FrozenDict(dict):
+    """dict that refuses in-place mutation. Copy with dict(d) to edit."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("dataset snapshots are read-only; copy with dict() before editing")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list that refuses in-place mutation. Copy with list(l) to edit."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("dataset snapshots are read-only; copy with list() before editing")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+_CONTAINERS = (dict, list)
+
+
+def freeze(value):
+    """Recursively convert parsed JSON into FrozenDict / FrozenList."""
+    # Exact type checks: already-frozen values pass through, and scalars skip the call
+    kind = type(value)
+    if kind is dict:
+        return FrozenDict({k: freeze(v) if type(v) in _CONTAINERS else v for k, v in value.items()})
+    if kind is list:
+        return FrozenList([freeze(v) if type(v) in _CONTAINERS else v for v in value])
+    return value
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+_MISSING = object()
+
+# Bump when FrozenDict / FrozenList change shape, so old snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+
+class DatasetStore:
+    """Parse-once cache of JSON files keyed by (mtime_ns, size)."""
+
+    def __init__(self, base_dir, snapshot_dir=None, snapshot_mmap=False):
+        self.base_dir = base_dir
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_mmap = snapshot_mmap
+        self._entries = {}  # filename -> (signature, snapshot)
+        self._failed = {}  # filename -> signature that did not parse
+        self._lock = threading.Lock()
+
+    def path(self, filename):
+        return os.path.join(self.base_dir, filename)
+
+    def _snapshot_path(self, filename, digest):
+        name = filename.replace(os.sep, '__')
+        return os.path.join(self.snapshot_dir, f'{name}.{digest}.v{SNAPSHOT_FORMAT}.pickle')
+
+    def _read_snapshot(self, path):
+        with open(path, 'rb') as f:
+            if self.snapshot_mmap:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return pickle.loads(mm)
+            return pickle.load(f)
+
+    def _write_snapshot(self, filename, path, data):
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            # A cache, not data: atomic but not fsynced
+            write_bytes(path, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), fsync=False)
+        except (OSError, pickle.PicklingError) as e:
+            print(f'Could not write dataset snapshot for {filename}: {e}')
+            return
+        prefix = filename.replace(os.sep, '__') + '.'
+        for old in glob.glob(os.path.join(glob.escape(self.snapshot_dir), glob.escape(prefix) + '*.pickle')):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _parse(self, filename, path):
+        """Frozen contents of `path`, from a snapshot of the same bytes when one exists."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if not self.snapshot_dir:
+            return freeze(json.loads(raw))
+        snapshot = self._snapshot_path(filename, hashlib.sha1(raw).hexdigest()[:20])
+        try:
+            return self._read_snapshot(snapshot)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f'Ignoring unreadable dataset snapshot {os.path.basename(snapshot)}: {e}')
+        data = freeze(json.loads(raw))
+        self._write_snapshot(filename, snapshot, data)
+        return data
+
+    def _refresh(self, filename):
+        """Return the cached (signature, snapshot), re-parsing if the file changed."""
+        path = self.path(filename)
+        sig = file_signature(path)
+        entry = self._entries.get(filename)
+        if sig is None:
+            self._entries.pop(filename, None)
+            return None
+        if entry is not None and (entry[0] == sig or self._failed.get(filename) == sig):
+            return entry
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and (entry[0] == sig or self._failed.get(filename) == sig):
+                return entry
+            try:
+                data = self._parse(filename, path)
+            except (OSError, ValueError) as e:
+                if entry is not None:
+                    # Half-written file: keep serving the last good snapshot until it changes again
+                    print(f'Dataset reload failed for {filename}, keeping previous version: {e}')
+                    self._failed[filename] = sig
+                    return entry
+                raise
+            self._failed.pop(filename, None)
+            entry = (sig, data)
+            self._entries[filename] = entry
+            return entry
+
+    def get(self, filename, default=_MISSING):
+        """
+        Read-only parsed contents of a JSON file under base_dir.
+        Raises FileNotFoundError (like open()) when missing and no default is given.
+        """
+        entry = self._refresh(filename)
+        if entry is None:
+            if default is _MISSING:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.path(filename))
+            return default
+        return entry[1]
+
+    def signature(self, filename):
+        """(mtime_ns, size) of the currently cached version, or None if missing."""
+        entry = self._refresh(filename)
+        return entry[0] if entry else None
+
+    def invalidate(self, filename=None):
+        """Drop one cached file (or all) so the next get() re-parses it."""
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+                self._failed.clear()
+            else:
+                self._entries.pop(filename, None)
+                self._failed.pop(filename, None)
+
+
+class MaterializedView:
+    """
+    Value derived from one or more dataset files (e.g. the merged portfolio list).
+    Built once per combination of source versions and served by reference. When a
+    source file changes, the previous value keeps being served while a background
+    thread rebuilds it; only the very first build blocks the caller.
+    """
+
+    def __init__(self, store, sources, build, name='view'):
+        self.store = store
+        self.sources = tuple(sources)
+        self.build = build
+        self.name = name
+        self._state = None  # (version, value)
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def current_version(self):
+        """Signatures of all source files right now (stat only, no parsing)."""
+        return tuple(file_signature(self.store.path(f)) for f in self.sources)
+
+    @property
+    def version(self):
+        """Source version the served value was built from (None before the first build)."""
+        state = self._state
+        return state[0] if state else None
+
+    def _rebuild(self, version):
+        state = self._state = (version, self.build())
+        return state
+
+    def _rebuild_in_background(self, version):
+        try:
+            self._rebuild(version)
+        except Exception as e:
+            print(f'{self.name} rebuild failed, serving previous version: {e}')
+        finally:
+            self._rebuilding = False
+
+    def get(self):
+        return self.snapshot()[1]
+
+    def snapshot(self):
+        """(version, value) of the value being served, read together (see get)."""
+        version = self.current_version()
+        state = self._state
+        if state is not None and state[0] == version:
+            return state
+        if state is None:
+            with self._lock:
+                state = self._state
+                if state is None or state[0] != version:
+                    return self._rebuild(version)
+                return state
+        with self._lock:
+            if not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(
+                    target=self._rebuild_in_background, args=(version,),
+                    name=f'{self.name}-rebuild', daemon=True,
+                ).start()
+        return state
+
+    def refresh(self):
+        """Rebuild synchronously (used after an explicit reload)."""
+        with self._lock:
+            return self._rebuild(self.current_version())[1]
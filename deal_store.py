@@ -0,0 +1,304 @@
+"""
+Columnar, typed view of the deal datasets (deal_flow_database.json, deals_data.json).
+
+Rows are stored sorted by deal date. Dates are day ordinals in an array('i'), and
+sizes (USD mn) are floats in an array('d'), NaN when not disclosed. Categorical
+columns (investor, industry, country, strategy, deal type, status) are interned:
+each distinct value gets a code and a bitmask (a Python int, bit i = row i) of the
+rows that carry it. A filter is then a handful of big-int AND/ORs, plus one
+contiguous bit range for the date window (rows are in date order), instead of a
+scan over dicts. Group-by counts are popcounts of mask intersections.
+
+numpy is not a dependency of this site, so the stdlib array module and int
+bitsets stand in for vectorized columns.
+"""
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import islice
+
+from search_index import SearchIndex
+
+# Logical column -> source key(s) (first non-empty wins) and whether the cell
+# holds several comma-separated values
+DEAL_FLOW_COLUMNS = {
+    'date': ('date',),
+    'size': ('deal_size',),
+    'text': ('company', 'pe_firm', 'sector', 'description'),
+    'categories': {
+        'investor': (('pe_firm',), True),
+        'industry': (('sector',), False),
+        'country': (('country', 'geography'), False),
+        'strategy': (('strategy',), False),
+        'deal_type': (('deal_type',), True),
+        'status': (('status',), False),
+    },
+}
+
+DEALS_DATA_COLUMNS = {
+    'date': ('DEAL DATE',),
+    'size': ('DEAL SIZE (USD MN)',),
+    'text': ('TARGET COMPANY', 'INVESTORS', 'PRIMARY INDUSTRY'),
+    'categories': {
+        'investor': (('INVESTORS',), True),
+        'industry': (('PRIMARY INDUSTRY',), False),
+        'country': (('TARGET COMPANY COUNTRY',), False),
+        'strategy': (('STRATEGY',), False),
+        'deal_type': (('DEAL TYPES',), True),
+        'status': (('DEAL STATUS',), False),
+    },
+}
+
+# "Aptean, Inc." is one investor, not two
+_LEGAL_SUFFIX_RE = re.compile(r'^(inc|inc\.|ltd|ltd\.|llc|plc|l\.?p\.?|ab|as|asa|a/s|oy|oyj|gmbh|s\.a\.|n\.v\.|co\.)$', re.I)
+_USD_SIZE_RE = re.compile(r'^\s*(?:\$|USD\s*)([\d.,]+)\s*(m|mn|million|b|bn|billion)\b', re.I)
+
+
+def _first(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            continue
+        text = str(value).strip()
+        if text:
+            return text
+    return ''
+
+
+def _raw(record, keys):
+    for key in keys:
+        if key in record:
+            return record[key]
+    return None
+
+
+def split_multi(text):
+    """Comma-separated names, keeping legal suffixes attached ('Aptean, Inc.')."""
+    parts = []
+    for raw in text.split(','):
+        part = raw.strip()
+        if not part:
+            continue
+        if parts and _LEGAL_SUFFIX_RE.match(part):
+            parts[-1] = f'{parts[-1]}, {part}'
+        else:
+            parts.append(part)
+    return parts
+
+
+def parse_date_ordinal(value):
+    """'2025-10-23' / '2025-10-23 01:00:00' -> date ordinal, 0 when unknown."""
+    text = str(value or '').strip()[:10]
+    try:
+        return date.fromisoformat(text).toordinal()
+    except ValueError:
+        return 0
+
+
+def parse_date_bound(text, end=False):
+    """
+    Filter bound 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD' -> ordinal (inclusive).
+    With end=True a partial date means the last day of that year/month.
+    Raises ValueError for anything else.
+    """
+    text = (text or '').strip()
+    parts = text.split('-')
+    if not 1 <= len(parts) <= 3 or not all(p.isdigit() for p in parts):
+        raise ValueError(f'invalid date: {text!r}')
+    year = int(parts[0])
+    if len(parts) == 3:
+        return date(year, int(parts[1]), int(parts[2])).toordinal()
+    if len(parts) == 2:
+        month = int(parts[1])
+        if not end:
+            return date(year, month, 1).toordinal()
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        return next_month.toordinal() - 1
+    return date(year, 12, 31).toordinal() if end else date(year, 1, 1).toordinal()
+
+
+def parse_size_usd_mn(value):
+    """Deal size in USD mn: numbers as-is, '$10.8M' / '$1.2B' parsed, anything else NaN."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _USD_SIZE_RE.match(str(value or ''))
+    if not match:
+        return math.nan
+    try:
+        amount = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return math.nan
+    return amount * 1000 if match.group(2).lower().startswith('b') else amount
+
+
+def iter_bits(mask, descending=False):
+    """Row positions set in `mask`, ascending (or descending) by position."""
+    if descending:
+        while mask:
+            pos = mask.bit_length() - 1
+            yield pos
+            mask ^= 1 << pos
+    else:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+
+class CategoryColumn:
+    """Interned string column: value -> code, and code -> bitmask of rows."""
+
+    def __init__(self):
+        self.labels = []  # code -> label as first seen
+        self.masks = []  # code -> int bitmask
+        self._codes = {}  # lowercased label -> code
+
+    def add(self, pos, labels):
+        for label in labels:
+            key = label.lower()
+            code = self._codes.get(key)
+            if code is None:
+                code = self._codes[key] = len(self.labels)
+                self.labels.append(label)
+                self.masks.append(0)
+            self.masks[code] |= 1 << pos
+
+    def mask(self, labels):
+        """Rows carrying any of `labels` (case-insensitive)."""
+        mask = 0
+        for label in labels:
+            code = self._codes.get(label.strip().lower())
+            if code is not None:
+                mask |= self.masks[code]
+        return mask
+
+    def counts(self, mask):
+        """{label: rows in mask} for labels with at least one row."""
+        out = {}
+        for label, value_mask in zip(self.labels, self.masks):
+            n = (value_mask & mask).bit_count()
+            if n:
+                out[label] = n
+        return out
+
+
+class DealTable:
+    """Typed columns over one deal dataset (see DEAL_FLOW_COLUMNS / DEALS_DATA_COLUMNS)."""
+
+    SORTS = ('-date', 'date', '-size', 'size')
+
+    def __init__(self, records, columns):
+        dated = [(parse_date_ordinal(_first(r, columns['date'])), i) for i, r in enumerate(records)]
+        dated.sort()
+        self.records = [records[i] for _, i in dated]
+        self.dates = array('i', (ordinal for ordinal, _ in dated))
+        self.sizes = array('d', (parse_size_usd_mn(_raw(r, columns['size'])) for r in self.records))
+        self.all = (1 << len(self.records)) - 1
+        self.categories = {}
+        for name, (keys, multi) in columns['categories'].items():
+            column = CategoryColumn()
+            for pos, record in enumerate(self.records):
+                text = _first(record, keys)
+                if text:
+                    column.add(pos, split_multi(text) if multi else [text])
+            self.categories[name] = column
+        # Size orders: -size is largest first with equal sizes newest first, and size is
+        # its exact reverse; undisclosed sizes come last in both, newest first
+        positions = range(len(self.records))
+        disclosed = sorted((i for i in positions if self.sizes[i] == self.sizes[i]), key=lambda i: (-self.sizes[i], -i))
+        undisclosed = [i for i in reversed(positions) if self.sizes[i] != self.sizes[i]]
+        self.size_desc = array('i', disclosed + undisclosed)
+        self.size_asc = array('i', disclosed[::-1] + undisclosed)
+        self.text = SearchIndex()
+        for pos, record in enumerate(self.records):
+            self.text.add(pos, [_first(record, (key,)) for key in columns.get('text', ())])
+
+    def __len__(self):
+        return len(self.records)
+
+    def date_mask(self, start=None, end=None):
+        """Rows dated within [start, end] (ordinals, inclusive); undated rows only match no bounds."""
+        if start is None and end is None:
+            return self.all
+        lo = bisect_left(self.dates, max(start or 1, 1))
+        hi = bisect_right(self.dates, end) if end is not None else len(self.dates)
+        if hi <= lo:
+            return 0
+        return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+    def text_mask(self, query):
+        """Rows whose text columns contain `query` (same matching as the site search)."""
+        mask = 0
+        for pos in self.text.match(query):
+            mask |= 1 << pos
+        return mask
+
+    def where(self, start=None, end=None, **filters):
+        """
+        Bitmask of rows matching a date window and category filters, e.g.
+        where(start, end, investor=['EQT'], country=['Sweden', 'Norway']).
+        Values within one column are OR-ed; columns are AND-ed.
+        """
+        mask = self.date_mask(start, end)
+        for name, values in filters.items():
+            if values:
+                mask &= self.categories[name].mask(values)
+        return mask
+
+    def page(self, mask, sort='-date', after=None, limit=50):
+        """
+        Row positions of one page of `mask` in `sort` order (see SORTS), continuing
+        after cursor `after`. Returns (positions, cursor of the next page or None).
+        """
+        if after is not None and not 0 <= after < len(self.records):
+            raise ValueError(f'cursor {after} is out of range')
+        if sort in ('-date', 'date'):
+            descending = sort == '-date'
+            if after is not None:
+                # Rows are stored in date order, so "after" is everything on one side of a bit
+                mask &= ((1 << after) - 1) if descending else (mask >> (after + 1)) << (after + 1)
+            positions = list(islice(iter_bits(mask, descending), limit + 1))
+            if len(positions) > limit:
+                return positions[:limit], positions[limit - 1]
+            return positions, None
+        order = self.size_desc if sort == '-size' else self.size_asc
+        positions = []
+        start = 0 if after is None else after + 1
+        for rank in range(start, len(order)):
+            if mask >> order[rank] & 1:
+                if len(positions) == limit:
+                    return positions, last_rank
+                positions.append(order[rank])
+                last_rank = rank
+        return positions, None
+
+    def group(self, name, mask=None):
+        """
+        League-table rows for a category over `mask`: label, deal count, summed
+        disclosed size (USD mn) and how many sizes were disclosed; biggest first.
+        """
+        mask = self.all if mask is None else mask
+        column = self.categories[name]
+        sizes = self.sizes
+        rows = []
+        for label, value_mask in zip(column.labels, column.masks):
+            hits = value_mask & mask
+            if not hits:
+                continue
+            total = 0.0
+            disclosed = 0
+            for pos in iter_bits(hits):
+                size = sizes[pos]
+                if size == size:  # not NaN
+                    total += size
+                    disclosed += 1
+            rows.append({
+                'name': label,
+                'deals': hits.bit_count(),
+                'total_size_usd_mn': round(total, 1),
+                'disclosed_sizes': disclosed,
+            })
+        rows.sort(key=lambda r: (-r['deals'], -r['total_size_usd_mn'], r['name'].lower()))
+        return rows
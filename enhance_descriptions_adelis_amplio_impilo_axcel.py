@@ -4,9 +4,10 @@ Enhance company descriptions for Adelis Equity, Amplio, Impilo, and Axcel portfo
 Replaces short or generic descriptions with more informative 2-3 sentence descriptions.
 """
 
-import json
 import os
 
+from atomic_write import update_json
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, 'portfolio_enriched.json')
 
@@ -67,34 +68,34 @@ ADDITIONAL_ENHANCEMENTS = {
 
 
 def main():
-    with open(DATA_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    companies = data.get('companies', [])
-    target_sources = ['Adelis Equity', 'Amplio', 'Impilo', 'Axcel']
     updated = 0
 
-    for c in companies:
-        source = c.get('source', '')
-        if source not in target_sources:
-            continue
-
-        name = c.get('company', '')
-        existing = (c.get('detailed_description') or c.get('description') or '').strip()
-
-        # Check both main and additional enhancements
-        desc = ENHANCED_DESCRIPTIONS.get(name) or ADDITIONAL_ENHANCEMENTS.get(name)
-        if desc:
-            # Update if: no description, or description is short, or we have a better one
-            if not existing or len(existing) < MIN_DESC_LENGTH:
-                c['detailed_description'] = desc
-                if c.get('description') and len(c['description']) < MIN_DESC_LENGTH:
-                    c['description'] = desc
-                updated += 1
-                print(f"  Enhanced: {name} ({source})")
-
-    with open(DATA_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def enhance_descriptions(data):
+        nonlocal updated
+        companies = data.get('companies', [])
+        target_sources = ['Adelis Equity', 'Amplio', 'Impilo', 'Axcel']
+
+        for c in companies:
+            source = c.get('source', '')
+            if source not in target_sources:
+                continue
+
+            name = c.get('company', '')
+            existing = (c.get('detailed_description') or c.get('description') or '').strip()
+
+            # Check both main and additional enhancements
+            desc = ENHANCED_DESCRIPTIONS.get(name) or ADDITIONAL_ENHANCEMENTS.get(name)
+            if desc:
+                # Update if: no description, or description is short, or we have a better one
+                if not existing or len(existing) < MIN_DESC_LENGTH:
+                    c['detailed_description'] = desc
+                    if c.get('description') and len(c['description']) < MIN_DESC_LENGTH:
+                        c['description'] = desc
+                    updated += 1
+                    print(f"  Enhanced: {name} ({source})")
+        return data
+
+    update_json(DATA_PATH, enhance_descriptions)
 
     print(f"\nEnhanced {updated} company descriptions.")
 
@@ -4,10 +4,11 @@ Enhanced PE News Generator
 Adds comprehensive news for all Nordic PE firms including missing ones
 """
 
-import json
 import random
 from datetime import datetime, timedelta
 
+from atomic_write import update_json
+
 def create_comprehensive_news():
     """Create comprehensive news items for all Nordic PE firms"""
     base_date = datetime.now() - timedelta(days=365)
@@ -89,43 +90,36 @@ def main():
     """Generate enhanced news database"""
     print("Generating comprehensive PE news for all firms...")
     
-    # Load existing news
-    existing_news = []
-    if os.path.exists('pe_news_database.json'):
-        with open('pe_news_database.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            existing_news = data.get('news', [])
-    
     # Add comprehensive news for missing firms
     new_news = create_comprehensive_news()
-    
-    # Combine and deduplicate
-    all_news = existing_news.copy()
-    seen_titles = {article['title'].lower() for article in existing_news}
-    
-    for article in new_news:
-        if article['title'].lower() not in seen_titles:
-            all_news.append(article)
-            seen_titles.add(article['title'].lower())
-    
-    # Sort by date
-    all_news.sort(key=lambda x: x.get('date', ''), reverse=True)
-    
-    # Save
-    news_database = {
-        "news": all_news,
-        "total_news": len(all_news),
-        "last_updated": datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
-        "source": "Enhanced News Generator",
-        "firms_covered": list(set(article.get('firm', '') for article in all_news))
-    }
-    
-    with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-        json.dump(news_database, f, indent=2, ensure_ascii=False)
-    
+
+    def merge_news(data):
+        # Combine with the existing news (re-read under the write lock) and deduplicate
+        existing_news = (data or {}).get('news', [])
+        all_news = existing_news.copy()
+        seen_titles = {article['title'].lower() for article in existing_news}
+
+        for article in new_news:
+            if article['title'].lower() not in seen_titles:
+                all_news.append(article)
+                seen_titles.add(article['title'].lower())
+
+        # Sort by date
+        all_news.sort(key=lambda x: x.get('date', ''), reverse=True)
+
+        return {
+            "news": all_news,
+            "total_news": len(all_news),
+            "last_updated": datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+            "source": "Enhanced News Generator",
+            "firms_covered": list(set(article.get('firm', '') for article in all_news))
+        }
+
+    news_database = update_json('pe_news_database.json', merge_news, default={})
+    all_news = news_database['news']
+
     print(f"✅ Generated {len(all_news)} news items")
     print(f"Firms: {', '.join(news_database['firms_covered'])}")
 
 if __name__ == "__main__":
-    import os
     main()
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 import time
 
+from atomic_write import write_json
+
 def fetch_cision_news_page(url, firm_name):
     """Fetch news directly from Cision news page"""
     try:
@@ -239,8 +241,7 @@ def main():
     }
     
     # Save to file
-    with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-        json.dump(news_database, f, indent=2, ensure_ascii=False)
+    write_json('pe_news_database.json', news_database)
     
     print("=" * 60)
     print(f"Successfully fetched {len(all_news)} Nordic PE news items")
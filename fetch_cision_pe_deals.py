@@ -5,11 +5,11 @@ Focus on acquisitions, divestments, and transactions only
 """
 
 import requests
-import json
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import re
 from urllib.parse import urljoin, urlparse
+from atomic_write import write_json
 
 def fetch_rss_feed(url):
     """Fetch and parse RSS feed"""
@@ -236,8 +236,7 @@ def main():
     }
     
     # Save to file
-    with open('deal_flow_database.json', 'w', encoding='utf-8') as f:
-        json.dump(deals_data, f, indent=2, ensure_ascii=False)
+    write_json('deal_flow_database.json', deals_data)
     
     print(f"✅ Saved {len(deals)} deals to deal_flow_database.json")
     
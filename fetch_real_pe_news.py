@@ -4,11 +4,11 @@ Fetch real Nordic PE news from Cision RSS feeds
 """
 
 import requests
-import json
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import time
 import re
+from atomic_write import write_json
 
 def fetch_cision_rss(url, firm_name):
     """Fetch RSS feed from Cision and parse news items"""
@@ -164,8 +164,7 @@ def main():
     }
     
     # Save to file
-    with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-        json.dump(news_database, f, indent=2, ensure_ascii=False)
+    write_json('pe_news_database.json', news_database)
     
     print("=" * 60)
     print(f"✅ Successfully fetched {len(all_news)} real Nordic PE news items")
@@ -1,5 +1,7 @@
 import json
 
+from atomic_write import write_json
+
 # Load news
 with open('pe_news_database.json', 'r', encoding='utf-8') as f:
     data = json.load(f)
@@ -21,8 +23,7 @@ data['news'] = unique_news
 data['total_news'] = len(unique_news)
 
 # Save
-with open('pe_news_database.json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+write_json('pe_news_database.json', data)
 
 print(f"✅ Removed duplicates. Total news: {len(unique_news)}")
 
@@ -1,17 +1,24 @@
+import base64
 import hashlib
 import json
 import os
+import re
 import smtplib
 import sqlite3
-import urllib.request
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from functools import wraps
 
+from markupsafe import Markup, escape
 from flask import (
     Blueprint,
     flash,
+    g,
+    has_app_context,
     jsonify,
     redirect,
     render_template,
@@ -21,6 +28,11 @@ from flask import (
 )
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from batch_writer import BatchWriter
+from geoip import geoip
+from hyperloglog import HyperLogLog, register_sqlite_functions
+from signup_log import signups
+
 
 FORUM_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forum.db")
 DEFAULT_CATEGORIES = [
@@ -38,20 +50,85 @@ DEFAULT_CATEGORIES = [
 
 forum_bp = Blueprint("forum", __name__)
 
+# Bump when init_forum_db gains tables, indexes or migrations (stored in PRAGMA user_version)
+FORUM_SCHEMA_VERSION = 6
+
 
 def _now_iso():
     return datetime.now(timezone.utc).isoformat()
 
 
-def _get_db():
-    conn = sqlite3.connect(FORUM_DB_PATH)
+class _ForumConnection(sqlite3.Connection):
+    """Pooled connection: close() hands it back (rolling back anything uncommitted) instead of closing it."""
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+
+# One connection per worker thread, reused across requests (reopened after a fork, e.g. gunicorn --preload)
+_db_local = threading.local()
+FORUM_DB_BUSY_TIMEOUT_MS = 5000
+
+
+def _open_db():
+    conn = sqlite3.connect(
+        FORUM_DB_PATH,
+        timeout=FORUM_DB_BUSY_TIMEOUT_MS / 1000,
+        factory=_ForumConnection,
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    # WAL: readers never wait for the page-view/comment writers, and a commit is an append, not a journal rewrite
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={FORUM_DB_BUSY_TIMEOUT_MS}")
+    register_sqlite_functions(conn)  # hll_merge / hll_count for the unique-visitor sketches
+    conn.create_function("forum_trending_score", 4, _trending_score, deterministic=True)
     return conn
 
 
+def _thread_db():
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and _db_local.key == (os.getpid(), FORUM_DB_PATH):
+        return conn
+    conn = _open_db()
+    _db_local.conn = conn
+    _db_local.key = (os.getpid(), FORUM_DB_PATH)
+    return conn
+
+
+def _get_db():
+    """The forum connection for this request (or thread, outside a request). Callers may close() it freely."""
+    if not has_app_context():
+        return _thread_db()
+    conn = g.get("forum_db")
+    if conn is None:
+        conn = g.forum_db = _thread_db()
+    return conn
+
+
+@forum_bp.teardown_app_request
+def _release_db(exc):
+    conn = g.pop("forum_db", None)
+    if conn is not None:
+        conn.close()
+
+
 def init_forum_db():
+    """Create/migrate the forum schema, then make sure the admin user and seed data exist.
+    Schema statements are skipped when the database is already at FORUM_SCHEMA_VERSION.
+    """
     conn = _get_db()
     cur = conn.cursor()
+    if cur.execute("PRAGMA user_version").fetchone()[0] >= FORUM_SCHEMA_VERSION:
+        conn.close()
+        _ensure_admin_user()
+        _seed_forum_data()
+        return
 
     cur.execute(
         """
@@ -203,6 +280,69 @@ def init_forum_db():
     cur.execute("CREATE INDEX IF NOT EXISTS idx_page_views_date ON page_views(date)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_page_views_path ON page_views(path)")
 
+    # Daily rollups of page_views, maintained by the page-view writer (see _rollup_page_views)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS page_view_daily (
+            date TEXT NOT NULL,
+            path TEXT NOT NULL,
+            country TEXT NOT NULL,
+            views INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, path, country)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS page_view_uniques (
+            date TEXT NOT NULL,
+            country TEXT NOT NULL,
+            sketch BLOB NOT NULL,
+            PRIMARY KEY (date, country)
+        )
+        """
+    )
+    if cur.execute("SELECT 1 FROM page_view_daily LIMIT 1").fetchone() is None:
+        raw = conn.execute("SELECT path, date, ip_hash, country, created_at FROM page_views")
+        while True:
+            rows = raw.fetchmany(5000)
+            if not rows:
+                break
+            _rollup_page_views(conn, rows)
+
+    _create_forum_fts(cur)
+
+    # Denormalized live-comment count per thread, kept current by triggers on comments
+    cur.execute("PRAGMA table_info(threads)")
+    if "comment_count" not in [r[1] for r in cur.fetchall()]:
+        cur.execute("ALTER TABLE threads ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0")
+    for statement in _COMMENT_COUNT_SQL:
+        cur.execute(statement)
+    cur.execute(
+        """
+        UPDATE threads SET comment_count = (
+            SELECT COUNT(*) FROM comments c WHERE c.thread_id = threads.id AND c.is_deleted = 0
+        )
+        """
+    )
+    # Keyset pagination of the forum index (see _THREAD_SORT_KEYS)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_threads_live_latest ON threads(created_at, id) WHERE is_deleted = 0")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_threads_live_upvoted ON threads(upvotes, created_at, id) WHERE is_deleted = 0")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_threads_live_category ON threads(category, created_at, id) WHERE is_deleted = 0"
+    )
+
+    # Stored trending score (see _refresh_trending)
+    cur.execute("PRAGMA table_info(threads)")
+    if "trending_score" not in [r[1] for r in cur.fetchall()]:
+        cur.execute("ALTER TABLE threads ADD COLUMN trending_score REAL NOT NULL DEFAULT 0")
+    cur.execute("CREATE TABLE IF NOT EXISTS forum_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    cur.execute("INSERT OR IGNORE INTO forum_state (key, value) VALUES ('trending_reference', '')")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_threads_live_trending ON threads(trending_score, created_at, id) WHERE is_deleted = 0")
+    for statement in _TRENDING_STALE_SQL:
+        cur.execute(statement)
+
+    cur.execute(f"PRAGMA user_version = {FORUM_SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
@@ -210,72 +350,263 @@ def init_forum_db():
     _seed_forum_data()
 
 
-# In-memory cache for IP -> country (avoids repeated API calls)
-_ip_country_cache = {}
+# comment_count moves with every comment insert, delete, (un)delete or move, in the same statement
+_COMMENT_COUNT_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_insert AFTER INSERT ON comments WHEN new.is_deleted = 0 BEGIN
+        UPDATE threads SET comment_count = comment_count + 1 WHERE id = new.thread_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_update AFTER UPDATE OF thread_id, is_deleted ON comments BEGIN
+        UPDATE threads SET comment_count = comment_count - 1 WHERE id = old.thread_id AND old.is_deleted = 0;
+        UPDATE threads SET comment_count = comment_count + 1 WHERE id = new.thread_id AND new.is_deleted = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_count_delete AFTER DELETE ON comments WHEN old.is_deleted = 0 BEGIN
+        UPDATE threads SET comment_count = comment_count - 1 WHERE id = old.thread_id;
+    END
+    """,
+]
+
+
+# Threads that become live or change score inputs are marked stale (trending_score -1, below any
+# real score) on every write path, including admin SQL and restores. The app's own vote and
+# comment paths rescore right away; _refresh_trending picks up the rest before a trending page.
+_TRENDING_STALE_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_trending_stale_insert AFTER INSERT ON threads WHEN new.is_deleted = 0 BEGIN
+        UPDATE threads SET trending_score = -1 WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_trending_stale_update
+    AFTER UPDATE OF is_deleted, upvotes, comment_count, created_at ON threads WHEN new.is_deleted = 0 BEGIN
+        UPDATE threads SET trending_score = -1 WHERE id = new.id;
+    END
+    """,
+]
+
+
+# ---------------------------------------------------------------------------
+# Full-text search: FTS5 tables over live (non-deleted) threads and comments,
+# kept in sync by triggers. Without FTS5 in the SQLite build, search falls back to LIKE.
+# ---------------------------------------------------------------------------
+
+_FORUM_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS threads_fts USING fts5(
+        title, content, tags, author, prefix='2 3', tokenize='unicode61 remove_diacritics 0'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+        content, thread_id UNINDEXED, prefix='2 3', tokenize='unicode61 remove_diacritics 0'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_insert AFTER INSERT ON threads BEGIN
+        INSERT INTO threads_fts (rowid, title, content, tags, author)
+        SELECT new.id, new.title, new.content, new.tags, username FROM users
+        WHERE id = new.user_id AND new.is_deleted = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_update AFTER UPDATE OF title, content, tags, user_id, is_deleted ON threads BEGIN
+        DELETE FROM threads_fts WHERE rowid = old.id;
+        INSERT INTO threads_fts (rowid, title, content, tags, author)
+        SELECT new.id, new.title, new.content, new.tags, username FROM users
+        WHERE id = new.user_id AND new.is_deleted = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_delete AFTER DELETE ON threads BEGIN
+        DELETE FROM threads_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_rename AFTER UPDATE OF username ON users BEGIN
+        UPDATE threads_fts SET author = new.username
+        WHERE rowid IN (SELECT id FROM threads WHERE user_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_fts_insert AFTER INSERT ON comments WHEN new.is_deleted = 0 BEGIN
+        INSERT INTO comments_fts (rowid, content, thread_id) VALUES (new.id, new.content, new.thread_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_fts_update AFTER UPDATE OF content, thread_id, is_deleted ON comments BEGIN
+        DELETE FROM comments_fts WHERE rowid = old.id;
+        INSERT INTO comments_fts (rowid, content, thread_id)
+        SELECT new.id, new.content, new.thread_id WHERE new.is_deleted = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_fts_delete AFTER DELETE ON comments BEGIN
+        DELETE FROM comments_fts WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Matching threads with their best bm25 rank (lower is better) and a highlighted snippet.
+# Title hits weigh most; a hit only in a comment ranks below a hit in the thread itself.
+_FORUM_SEARCH_SQL = """
+    SELECT thread_id, MIN(rank) AS rank, snippet
+    FROM (
+        SELECT rowid AS thread_id, bm25(threads_fts, 8.0, 1.0, 4.0, 2.0) AS rank,
+               snippet(threads_fts, 1, char(2), char(3), '…', 24) AS snippet
+        FROM threads_fts WHERE threads_fts MATCH ?
+        UNION ALL
+        SELECT thread_id, bm25(comments_fts) * 0.5 AS rank,
+               snippet(comments_fts, 0, char(2), char(3), '…', 24) AS snippet
+        FROM comments_fts WHERE comments_fts MATCH ?
+    )
+    GROUP BY thread_id
+"""
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+_forum_fts = None  # whether threads_fts exists (checked once per process)
+
+
+def _create_forum_fts(cur):
+    """Create the FTS tables and triggers and (re)index existing content."""
+    try:
+        for statement in _FORUM_FTS_SQL:
+            cur.execute(statement)
+    except sqlite3.OperationalError as e:
+        print(f"Forum search: FTS5 unavailable ({e}), using LIKE")
+        return
+    cur.execute("DELETE FROM threads_fts")
+    cur.execute(
+        """
+        INSERT INTO threads_fts (rowid, title, content, tags, author)
+        SELECT t.id, t.title, t.content, t.tags, u.username
+        FROM threads t JOIN users u ON u.id = t.user_id
+        WHERE t.is_deleted = 0
+        """
+    )
+    cur.execute("DELETE FROM comments_fts")
+    cur.execute(
+        "INSERT INTO comments_fts (rowid, content, thread_id) SELECT id, content, thread_id FROM comments WHERE is_deleted = 0"
+    )
+
+
+def _has_forum_fts(conn) -> bool:
+    global _forum_fts
+    if _forum_fts is None:
+        _forum_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'threads_fts'").fetchone() is not None
+    return _forum_fts
+
+
+def _fts_query(q: str) -> str:
+    """Search box text -> FTS5 query: every word must match, as a word prefix ("ib rec" finds "IB recruiting")."""
+    return " ".join(f'"{token}"*' for token in _SEARCH_TOKEN_RE.findall(q.lower()))
+
+
+def _highlight(snippet: str | None):
+    """FTS snippet (matches wrapped in char(2) ... char(3)) -> escaped HTML with <mark> around the matches."""
+    if not snippet:
+        return None
+    return Markup(str(escape(snippet)).replace("\x02", "<mark>").replace("\x03", "</mark>"))
 
 
 def _get_country_for_ip(ip: str | None) -> str:
-    """Look up country for IP using ipapi.co. Returns 'Unknown' or 'Local' on failure."""
+    """Country name for an IP from the local GeoIP database. Returns 'Unknown' or 'Local' when it has none."""
     if not ip or not ip.strip():
         return "Unknown"
-    ip = ip.strip()
-    if ip.startswith(("127.", "10.", "192.168.", "172.16.")) or ip == "::1":
-        return "Local"
-    if ip in _ip_country_cache:
-        return _ip_country_cache[ip]
-    try:
-        with urllib.request.urlopen(
-            f"https://ipapi.co/{ip}/json/",
-            timeout=2,
-        ) as resp:
-            data = json.loads(resp.read().decode())
-            country = data.get("country_name") or data.get("country_code") or "Unknown"
-            _ip_country_cache[ip] = country
-            return country
-    except Exception:
-        _ip_country_cache[ip] = "Unknown"
-        return "Unknown"
+    return geoip.country(ip.strip())
 
 
 def _load_platform_signups_json():
-    """Load platform access signups from JSON file (used by app.py /signup route)."""
-    import json as _json
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "platform_signups.json")
+    """Newest 200 platform access signups from the signup log (read from the end of the file)."""
     try:
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = _json.load(f)
-                if isinstance(data, list):
-                    return sorted(data, key=lambda x: x.get("created_at", ""), reverse=True)[:200]
+        return signups.tail(200)
     except Exception:
-        pass
-    return []
+        return []
 
 
-def log_page_view(path: str, ip: str | None = None):
-    """Log a page view for analytics (path, date, ip_hash, country)."""
-    try:
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+# Raw page_views rows older than this many days are deleted by the page-view writer.
+# Off by default (0 keeps them forever): deletion is irreversible, so operators opt in.
+# The daily rollups keep the counts for all time either way.
+PAGE_VIEW_RETENTION_DAYS = int(os.environ.get("PAGE_VIEW_RETENTION_DAYS", "0"))
+_ALL_TIME = "all"  # page_view_uniques.date of the all-time visitor sketch
+_last_page_view_prune = None  # time.monotonic() of the last retention delete
+
+
+def _rollup_page_views(conn, rows):
+    """Add (path, date, ip_hash, country, created_at) rows to page_view_daily / page_view_uniques.
+
+    Unique visitors are HyperLogLog sketches of ip_hash per (date, country), per date
+    (country '') and for all time, merged into the stored ones with hll_merge().
+    """
+    views = Counter()
+    sketches = {}
+    for path, date, ip_hash, country, _ in rows:
+        country = country or "Unknown"
+        views[(date, path, country)] += 1
+        if not ip_hash:
+            continue
+        for key in ((_ALL_TIME, ""), (date, ""), (date, country)):
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketch = sketches[key] = HyperLogLog()
+            sketch.add(ip_hash)
+    conn.executemany(
+        """
+        INSERT INTO page_view_daily (date, path, country, views) VALUES (?, ?, ?, ?)
+        ON CONFLICT (date, path, country) DO UPDATE SET views = views + excluded.views
+        """,
+        [(date, path, country, n) for (date, path, country), n in views.items()],
+    )
+    conn.executemany(
+        """
+        INSERT INTO page_view_uniques (date, country, sketch) VALUES (?, ?, ?)
+        ON CONFLICT (date, country) DO UPDATE SET sketch = hll_merge(sketch, excluded.sketch)
+        """,
+        [(date, country, sketch.to_bytes()) for (date, country), sketch in sketches.items()],
+    )
+
+
+def _write_page_views(views):
+    """Insert a batch of queued page views and fold it into the rollups (runs on the page-view writer thread)."""
+    global _last_page_view_prune
+    rows = []
+    for path, ip, created_at in views:
         ip_hash = ""
         country = None
         if ip:
             ip_hash = hashlib.sha256((ip + "portfoljbolagen_salt").encode()).hexdigest()[:16]
             country = _get_country_for_ip(ip)
-        conn = _get_db()
-        cur = conn.cursor()
-        try:
-            cur.execute(
-                "INSERT INTO page_views (path, date, ip_hash, country, created_at) VALUES (?, ?, ?, ?, ?)",
-                (path, date_str, ip_hash or None, country or None, _now_iso()),
-            )
-        except sqlite3.OperationalError:
-            # Fallback if country column doesn't exist yet (old DB before migration)
-            cur.execute(
-                "INSERT INTO page_views (path, date, ip_hash, created_at) VALUES (?, ?, ?, ?)",
-                (path, date_str, ip_hash or None, _now_iso()),
-            )
-        conn.commit()
-        conn.close()
+        rows.append((path, created_at[:10], ip_hash or None, country or None, created_at))
+    conn = _get_db()
+    with conn:
+        conn.executemany(
+            "INSERT INTO page_views (path, date, ip_hash, country, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        _rollup_page_views(conn, rows)
+        if PAGE_VIEW_RETENTION_DAYS > 0 and (_last_page_view_prune is None or time.monotonic() - _last_page_view_prune > 3600):
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=PAGE_VIEW_RETENTION_DAYS)).strftime("%Y-%m-%d")
+            conn.execute("DELETE FROM page_views WHERE date < ?", (cutoff,))
+            _last_page_view_prune = time.monotonic()
+
+
+# Page views are queued and written in batches by a background thread, so a page
+# response never waits on hashing, the country lookup or an SQLite commit.
+page_view_writer = BatchWriter(
+    _write_page_views,
+    max_batch=int(os.environ.get("PAGE_VIEW_BATCH_SIZE", "200")),
+    interval=int(os.environ.get("PAGE_VIEW_FLUSH_MS", "500")) / 1000,
+    max_pending=int(os.environ.get("PAGE_VIEW_QUEUE_SIZE", "10000")),
+    name="page-view-writer",
+)
+
+
+def log_page_view(path: str, ip: str | None = None):
+    """Queue a page view for analytics (path, date, ip_hash, country); written within PAGE_VIEW_FLUSH_MS."""
+    try:
+        page_view_writer.put((path, ip, _now_iso()))
     except Exception:
         pass
 
@@ -455,6 +786,7 @@ Välkommen!
             )
 
     conn.commit()
+    _refresh_trending(conn, force=True)
     conn.close()
 
 
@@ -489,11 +821,114 @@ def _admin_required(fn):
     return wrapper
 
 
-def _thread_rows(q="", category="", sort="latest"):
+# Trending = (2 * upvotes + comments) / sqrt(age in hours, at least 1), stored in threads.trending_score.
+# Every score is evaluated at one shared reference time (forum_state 'trending_reference'), so the
+# stored order is exactly the formula's order at that time. Votes and comments rescore their thread
+# at the reference time; once it is FORUM_TRENDING_REFRESH_SECONDS old, the next trending page view
+# moves all live threads to a new reference time (the decay step).
+FORUM_TRENDING_REFRESH_SECONDS = int(os.environ.get("FORUM_TRENDING_REFRESH_SECONDS", "600"))
+
+
+def _trending_score(upvotes, comment_count, created_at, reference):
+    try:
+        age_hours = (datetime.fromisoformat(reference) - datetime.fromisoformat(created_at)).total_seconds() / 3600.0
+    except (TypeError, ValueError):
+        return 0.0
+    engagement = ((upvotes or 0) * 2) + (comment_count or 0)
+    return engagement / (max(age_hours, 1.0) ** 0.5)
+
+
+def _rescore_threads(conn, thread_ids):
+    """Recompute trending_score of `thread_ids` at the current reference time (the caller commits)."""
+    thread_ids = [i for i in thread_ids if i is not None]
+    if not thread_ids:
+        return
+    row = conn.execute("SELECT value FROM forum_state WHERE key = 'trending_reference'").fetchone()
+    reference = row["value"] if row and row["value"] else _now_iso()
+    conn.execute(
+        f"""
+        UPDATE threads SET trending_score = forum_trending_score(upvotes, comment_count, created_at, ?)
+        WHERE id IN ({', '.join('?' for _ in thread_ids)})
+        """,
+        (reference, *thread_ids),
+    )
+
+
+def _refresh_trending(conn, force=False):
+    """
+    Rescore all live threads at a new reference time (now) when the current one is stale,
+    otherwise just the threads marked stale (see _TRENDING_STALE_SQL). Returns True if all were rescored.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = (now - timedelta(seconds=FORUM_TRENDING_REFRESH_SECONDS)).isoformat()
+    reference = now.isoformat()
+    with conn:
+        # Claim the refresh, so concurrent workers don't all rescore the table
+        claimed = conn.execute(
+            "UPDATE forum_state SET value = ? WHERE key = 'trending_reference' AND (? OR value < ?)",
+            (reference, 1 if force else 0, stale_before),
+        ).rowcount
+        if not claimed:
+            stale = conn.execute("SELECT id FROM threads WHERE is_deleted = 0 AND trending_score < 0").fetchall()
+            _rescore_threads(conn, [r["id"] for r in stale])
+            return False
+        conn.execute(
+            """
+            UPDATE threads SET trending_score = forum_trending_score(upvotes, comment_count, created_at, ?)
+            WHERE is_deleted = 0
+            """,
+            (reference,),
+        )
+    return True
+
+
+FORUM_PAGE_SIZE = 25
+
+# Sort -> (keyset columns, direction). Pages continue after the last row's key values,
+# so a page costs the same however deep it is; the last column makes the key unique.
+_THREAD_SORT_KEYS = {
+    "latest": (("t.created_at", "t.id"), "DESC"),
+    "upvoted": (("t.upvotes", "t.created_at", "t.id"), "DESC"),
+    "trending": (("t.trending_score", "t.created_at", "t.id"), "DESC"),
+    "relevance": (("hits.rank", "-t.id"), "ASC"),
+}
+
+
+def _encode_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str | None, size: int):
+    """Cursor -> list of `size` key values, or None when it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    if not all(isinstance(v, (int, float, str)) and not isinstance(v, bool) for v in values):
+        return None
+    return values
+
+
+def _thread_rows(q="", category="", sort="latest", after=None, limit=FORUM_PAGE_SIZE):
+    """One page of the forum index: (threads, cursor of the next page or None)."""
     conn = _get_db()
     params = []
     where = ["t.is_deleted = 0"]
-    if q:
+    search_join = ""
+    search_columns = ""
+    if q and _has_forum_fts(conn):
+        match = _fts_query(q)
+        if not match:
+            conn.close()
+            return [], None
+        search_join = f"JOIN ({_FORUM_SEARCH_SQL}) hits ON hits.thread_id = t.id"
+        search_columns = ", hits.rank AS search_rank, hits.snippet AS search_snippet"
+        params.extend([match, match])
+    elif q:
         where.append("(LOWER(t.title) LIKE ? OR LOWER(t.content) LIKE ? OR LOWER(t.tags) LIKE ? OR LOWER(u.username) LIKE ?)")
         like = f"%{q.lower()}%"
         params.extend([like, like, like, like])
@@ -501,58 +936,64 @@ def _thread_rows(q="", category="", sort="latest"):
         where.append("t.category = ?")
         params.append(category)
 
-    order_clause = "t.created_at DESC"
-    if sort == "upvoted":
-        order_clause = "t.upvotes DESC, t.created_at DESC"
+    if sort == "relevance" and not search_join:
+        sort = "latest"
+    if sort == "trending":
+        _refresh_trending(conn)
+    keyset, direction = _THREAD_SORT_KEYS.get(sort, _THREAD_SORT_KEYS["latest"])
+    key_columns = "".join(f", {column} AS _key{i}" for i, column in enumerate(keyset))
+    order_clause = ", ".join(f"{column} {direction}" for column in keyset)
+    values = _decode_cursor(after, len(keyset))
+    if values is not None:
+        where.append(f"({', '.join(keyset)}) {'<' if direction == 'DESC' else '>'} ({', '.join('?' for _ in keyset)})")
+        params.extend(values)
 
     rows = conn.execute(
         f"""
         SELECT
             t.*,
             u.username,
-            u.role AS user_role,
-            (
-                SELECT COUNT(*)
-                FROM comments c
-                WHERE c.thread_id = t.id AND c.is_deleted = 0
-            ) AS comment_count
+            u.role AS user_role{search_columns}{key_columns}
         FROM threads t
         JOIN users u ON u.id = t.user_id
+        {search_join}
         WHERE {' AND '.join(where)}
         ORDER BY {order_clause}
+        LIMIT ?
         """,
-        tuple(params),
+        (*params, limit + 1),
     ).fetchall()
 
     conn.close()
     items = [dict(r) for r in rows]
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = _encode_cursor([items[-1][f"_key{i}"] for i in range(len(keyset))])
+    for item in items:
+        for i in range(len(keyset)):
+            item.pop(f"_key{i}", None)
+        if "search_snippet" in item:
+            item["search_snippet"] = _highlight(item["search_snippet"])
 
-    if sort == "trending":
-        now = datetime.now(timezone.utc)
-
-        def trend_score(item):
-            created = datetime.fromisoformat(item["created_at"])
-            age_hours = max((now - created).total_seconds() / 3600.0, 1.0)
-            engagement = (item.get("upvotes", 0) * 2) + item.get("comment_count", 0)
-            return engagement / (age_hours ** 0.5)
-
-        items.sort(key=trend_score, reverse=True)
-
-    return items
+    return items, next_cursor
 
 
 @forum_bp.route("/forum")
 def forum_index():
     q = (request.args.get("q") or "").strip()
     category = (request.args.get("category") or "").strip()
-    sort = (request.args.get("sort") or "latest").strip().lower()
-    if sort not in {"latest", "upvoted", "trending"}:
+    sort = (request.args.get("sort") or ("relevance" if q else "latest")).strip().lower()
+    if sort not in {"latest", "upvoted", "trending", "relevance"} or (sort == "relevance" and not q):
         sort = "latest"
 
-    threads = _thread_rows(q=q, category=category, sort=sort)
+    after = (request.args.get("after") or "").strip() or None
+    threads, next_cursor = _thread_rows(q=q, category=category, sort=sort, after=after)
     return render_template(
         "forum.html",
         threads=threads,
+        next_cursor=next_cursor,
+        paged=bool(after),
         categories=DEFAULT_CATEGORIES,
         selected_category=category,
         selected_sort=sort,
@@ -647,8 +1088,9 @@ def forum_create_thread():
         """,
         (user["id"], title, content, category, tags, _now_iso(), _now_iso()),
     )
-    conn.commit()
     thread_id = cur.lastrowid
+    _rescore_threads(conn, [thread_id])
+    conn.commit()
     conn.close()
     return redirect(url_for("forum.forum_thread", thread_id=thread_id))
 
@@ -738,19 +1180,11 @@ def _send_modelling_request_email(to_email: str) -> bool:
 
 @forum_bp.route("/forum/platform-signup", methods=["POST"])
 def platform_signup():
-    """6 months free – save email to JSON. View in Forum → Moderation."""
-    import json as _json
+    """6 months free – append email to the signup log. View in Forum → Moderation."""
     email = (request.form.get("email") or "").strip().lower()
     if email and "@" in email:
-        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "platform_signups.json")
         try:
-            data = []
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    data = _json.load(f)
-            data.append({"email": email, "created_at": _now_iso()})
-            with open(path, "w", encoding="utf-8") as f:
-                _json.dump(data, f, indent=2)
+            signups.append(email, _now_iso())
         except Exception:
             pass
     return redirect("/forum/signup-thanks")
@@ -829,6 +1263,7 @@ def forum_comment(thread_id):
         """,
         (thread_id, user["id"], parent_id, content, _now_iso(), _now_iso()),
     )
+    _rescore_threads(conn, [thread_id])
     conn.commit()
     conn.close()
     return redirect(url_for("forum.forum_thread", thread_id=thread_id))
@@ -852,6 +1287,8 @@ def _toggle_vote(table, vote_col, content_table, content_id_col, target_id, user
             (target_id, user_id, _now_iso()),
         )
         conn.execute(f"UPDATE {content_table} SET {vote_col} = {vote_col} + 1 WHERE id = ?", (target_id,))
+    if content_table == "threads":
+        _rescore_threads(conn, [target_id])
     conn.commit()
     score = conn.execute(f"SELECT {vote_col} AS score FROM {content_table} WHERE id = ?", (target_id,)).fetchone()
     conn.close()
@@ -942,20 +1379,21 @@ def forum_admin():
         "SELECT * FROM fundraising_download_signups ORDER BY created_at DESC LIMIT 200"
     ).fetchall()
     platform_signups = _load_platform_signups_json()
-    # Analytics: page views
-    total_views = conn.execute("SELECT COUNT(*) as c FROM page_views").fetchone()["c"]
+    # Analytics: page views, from the daily rollups (unique visitors are HyperLogLog estimates)
+    total_views = conn.execute("SELECT COALESCE(SUM(views), 0) as c FROM page_view_daily").fetchone()["c"]
     unique_visitors = conn.execute(
-        "SELECT COUNT(DISTINCT ip_hash) as c FROM page_views WHERE ip_hash IS NOT NULL AND ip_hash != ''"
+        "SELECT hll_count(sketch) as c FROM page_view_uniques WHERE date = ? AND country = ''",
+        (_ALL_TIME,),
     ).fetchone()["c"]
     views_by_path = conn.execute(
         """
-        SELECT path, COUNT(*) as cnt FROM page_views
+        SELECT path, SUM(views) as cnt FROM page_view_daily
         GROUP BY path ORDER BY cnt DESC LIMIT 20
         """
     ).fetchall()
     views_by_date = conn.execute(
         """
-        SELECT date, COUNT(*) as cnt FROM page_views
+        SELECT date, SUM(views) as cnt FROM page_view_daily
         GROUP BY date ORDER BY date DESC LIMIT 30
         """
     ).fetchall()
@@ -963,29 +1401,29 @@ def forum_admin():
     cutoff = (datetime.now(timezone.utc) - timedelta(days=14)).strftime("%Y-%m-%d")
     views_last_14 = conn.execute(
         """
-        SELECT date, COUNT(*) as cnt FROM page_views
+        SELECT date, SUM(views) as cnt FROM page_view_daily
         WHERE date >= ? GROUP BY date ORDER BY date ASC
         """,
         (cutoff,),
     ).fetchall()
     unique_by_date = conn.execute(
         """
-        SELECT date, COUNT(DISTINCT ip_hash) as cnt FROM page_views
-        WHERE ip_hash IS NOT NULL AND ip_hash != '' AND date >= ?
+        SELECT date, hll_count(sketch) as cnt FROM page_view_uniques
+        WHERE country = '' AND date >= ? AND date != ?
         GROUP BY date ORDER BY date ASC
         """,
-        (cutoff,),
+        (cutoff, _ALL_TIME),
     ).fetchall()
     # Geography: unique visitors by country (last 14 days)
     visitors_by_country = conn.execute(
         """
-        SELECT COALESCE(country, 'Unknown') as country, COUNT(DISTINCT ip_hash) as cnt
-        FROM page_views
-        WHERE ip_hash IS NOT NULL AND ip_hash != '' AND date >= ?
-        GROUP BY COALESCE(country, 'Unknown')
+        SELECT country, hll_count(sketch) as cnt
+        FROM page_view_uniques
+        WHERE country != '' AND date >= ? AND date != ?
+        GROUP BY country
         ORDER BY cnt DESC
         """,
-        (cutoff,),
+        (cutoff, _ALL_TIME),
     ).fetchall()
     analytics = {
         "total_views": total_views,
@@ -1053,6 +1491,8 @@ def forum_admin_delete_thread(thread_id):
 def forum_admin_delete_comment(comment_id):
     conn = _get_db()
     conn.execute("UPDATE comments SET is_deleted = 1, updated_at = ? WHERE id = ?", (_now_iso(), comment_id))
+    row = conn.execute("SELECT thread_id FROM comments WHERE id = ?", (comment_id,)).fetchone()
+    _rescore_threads(conn, [row["thread_id"]] if row else [])
     conn.commit()
     conn.close()
     return redirect(url_for("forum.forum_admin"))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Offline IP -> country lookup for the page-view analytics.
+
+The database is a CSV of IP ranges, one per line: start, end, country code and
+optionally the country name. Both common free layouts work as they are:
+
+    "1.0.0.0","1.0.0.255","AU"                                  (DB-IP country lite)
+    "16777216","16777471","AU","Australia"                      (IP2Location LITE DB1 / DB1 IPv6)
+
+It is loaded once per process into sorted integer arrays, one set for IPv4 and
+one for IPv6, with adjacent ranges of the same country merged. app.run_startup
+loads it before gc.freeze(), so under `gunicorn --preload` the workers share the
+table copy-on-write; anything else loads it on the first lookup. A lookup is a binary search over the range starts, behind a
+bounded LRU cache of recent addresses. scripts/download_geoip.py installs the
+DB-IP Lite database (CC BY 4.0, credited on the analytics page). Without a
+database file, public addresses fall back to the ipapi.co web API (one request
+per address not in the cache) instead of all resolving to "Unknown".
+
+    GEOIP_DB_PATH          CSV (or .csv.gz) to load, default Data/geoip-country.csv
+    GEOIP_CACHE_SIZE       addresses kept in the LRU cache, default 4096
+    GEOIP_ONLINE_FALLBACK  0 disables the ipapi.co fallback (missing file -> Unknown)
+
+    python geoip.py 8.8.8.8 2a00:1450:4001::1     # look addresses up
+"""
+import csv
+import gzip
+import ipaddress
+import json
+import os
+import sys
+import threading
+import urllib.request
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_V4_MAX = (1 << 32) - 1
+_V4_MAPPED = 0xFFFF << 32  # ::ffff:0:0/96, how IPv6 databases store IPv4 ranges
+
+# ISO 3166-1 alpha-2 -> the country names the analytics have always shown
+_COUNTRY_NAMES = """
+AD Andorra|AE United Arab Emirates|AF Afghanistan|AG Antigua and Barbuda|AI Anguilla|AL Albania|AM Armenia
+AO Angola|AQ Antarctica|AR Argentina|AS American Samoa|AT Austria|AU Australia|AW Aruba|AX Åland Islands
+AZ Azerbaijan|BA Bosnia and Herzegovina|BB Barbados|BD Bangladesh|BE Belgium|BF Burkina Faso|BG Bulgaria
+BH Bahrain|BI Burundi|BJ Benin|BL Saint Barthélemy|BM Bermuda|BN Brunei|BO Bolivia|BQ Bonaire, Sint Eustatius, and Saba
+BR Brazil|BS Bahamas|BT Bhutan|BV Bouvet Island|BW Botswana|BY Belarus|BZ Belize|CA Canada
+CC Cocos (Keeling) Islands|CD DR Congo|CF Central African Republic|CG Congo Republic|CH Switzerland
+CI Ivory Coast|CK Cook Islands|CL Chile|CM Cameroon|CN China|CO Colombia|CR Costa Rica|CU Cuba|CV Cabo Verde
+CW Curaçao|CX Christmas Island|CY Cyprus|CZ Czechia|DE Germany|DJ Djibouti|DK Denmark|DM Dominica
+DO Dominican Republic|DZ Algeria|EC Ecuador|EE Estonia|EG Egypt|EH Western Sahara|ER Eritrea|ES Spain
+ET Ethiopia|FI Finland|FJ Fiji|FK Falkland Islands|FM Micronesia|FO Faroe Islands|FR France|GA Gabon
+GB United Kingdom|GD Grenada|GE Georgia|GF French Guiana|GG Guernsey|GH Ghana|GI Gibraltar|GL Greenland
+GM Gambia|GN Guinea|GP Guadeloupe|GQ Equatorial Guinea|GR Greece|GS South Georgia and the South Sandwich Islands
+GT Guatemala|GU Guam|GW Guinea-Bissau|GY Guyana|HK Hong Kong|HM Heard and McDonald Islands|HN Honduras
+HR Croatia|HT Haiti|HU Hungary|ID Indonesia|IE Ireland|IL Israel|IM Isle of Man|IN India
+IO British Indian Ocean Territory|IQ Iraq|IR Iran|IS Iceland|IT Italy|JE Jersey|JM Jamaica|JO Jordan|JP Japan
+KE Kenya|KG Kyrgyzstan|KH Cambodia|KI Kiribati|KM Comoros|KN St Kitts and Nevis|KP North Korea|KR South Korea
+KW Kuwait|KY Cayman Islands|KZ Kazakhstan|LA Laos|LB Lebanon|LC Saint Lucia|LI Liechtenstein|LK Sri Lanka
+LR Liberia|LS Lesotho|LT Lithuania|LU Luxembourg|LV Latvia|LY Libya|MA Morocco|MC Monaco|MD Moldova
+ME Montenegro|MF Saint Martin|MG Madagascar|MH Marshall Islands|MK North Macedonia|ML Mali|MM Myanmar
+MN Mongolia|MO Macao|MP Northern Mariana Islands|MQ Martinique|MR Mauritania|MS Montserrat|MT Malta
+MU Mauritius|MV Maldives|MW Malawi|MX Mexico|MY Malaysia|MZ Mozambique|NA Namibia|NC New Caledonia|NE Niger
+NF Norfolk Island|NG Nigeria|NI Nicaragua|NL Netherlands|NO Norway|NP Nepal|NR Nauru|NU Niue|NZ New Zealand
+OM Oman|PA Panama|PE Peru|PF French Polynesia|PG Papua New Guinea|PH Philippines|PK Pakistan|PL Poland
+PM Saint Pierre and Miquelon|PN Pitcairn Islands|PR Puerto Rico|PS Palestine|PT Portugal|PW Palau|PY Paraguay
+QA Qatar|RE Réunion|RO Romania|RS Serbia|RU Russia|RW Rwanda|SA Saudi Arabia|SB Solomon Islands|SC Seychelles
+SD Sudan|SE Sweden|SG Singapore|SH Saint Helena|SI Slovenia|SJ Svalbard and Jan Mayen|SK Slovakia
+SL Sierra Leone|SM San Marino|SN Senegal|SO Somalia|SR Suriname|SS South Sudan|ST São Tomé and Príncipe
+SV El Salvador|SX Sint Maarten|SY Syria|SZ Eswatini|TC Turks and Caicos Islands|TD Chad
+TF French Southern Territories|TG Togo|TH Thailand|TJ Tajikistan|TK Tokelau|TL Timor-Leste|TM Turkmenistan
+TN Tunisia|TO Tonga|TR Türkiye|TT Trinidad and Tobago|TV Tuvalu|TW Taiwan|TZ Tanzania|UA Ukraine|UG Uganda
+UM U.S. Outlying Islands|US United States|UY Uruguay|UZ Uzbekistan|VA Vatican City|VC St Vincent and Grenadines
+VE Venezuela|VG British Virgin Islands|VI U.S. Virgin Islands|VN Vietnam|VU Vanuatu|WF Wallis and Futuna
+WS Samoa|XK Kosovo|YE Yemen|YT Mayotte|ZA South Africa|ZM Zambia|ZW Zimbabwe
+"""
+COUNTRY_NAMES = dict(
+    entry.strip().split(" ", 1)
+    for line in _COUNTRY_NAMES.strip().splitlines()
+    for entry in line.split("|")
+)
+
+
+def _parse_address(value):
+    """'1.2.3.4' / '::1' / '16909060' -> (integer, is_ipv4)."""
+    value = value.strip()
+    if value.isdigit():
+        number = int(value)
+        return number, number <= _V4_MAX
+    address = ipaddress.ip_address(value)
+    return int(address), address.version == 4
+
+
+def lookup_online(ip):
+    """Country name for a public IP from ipapi.co (the resolver used before the local database)."""
+    try:
+        with urllib.request.urlopen(f"https://ipapi.co/{ip}/json/", timeout=2) as resp:
+            data = json.loads(resp.read().decode())
+        return data.get("country_name") or data.get("country_code") or "Unknown"
+    except Exception:
+        return "Unknown"
+
+
+class _RangeTable:
+    """Sorted, non-overlapping [start, end] ranges with a country index per range."""
+
+    def __init__(self, typecode):
+        self.typecode = typecode
+        self.starts = []
+        self.ends = []
+        self.countries = array("H")
+
+    def add(self, start, end, country):
+        # Merge with the previous range when it is adjacent and has the same country
+        if self.ends and self.countries[-1] == country and self.ends[-1] + 1 >= start:
+            self.ends[-1] = max(self.ends[-1], end)
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.countries.append(country)
+
+    def freeze(self):
+        if self.typecode:
+            self.starts = array(self.typecode, self.starts)
+            self.ends = array(self.typecode, self.ends)
+
+    def find(self, number):
+        i = bisect_right(self.starts, number) - 1
+        if i >= 0 and number <= self.ends[i]:
+            return self.countries[i]
+        return None
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class GeoIP:
+    """Country lookups from a local IP-range CSV; `fallback(ip)` resolves public addresses when it is missing."""
+
+    def __init__(self, path, cache_size=4096, fallback=None):
+        self.path = path
+        self.fallback = fallback
+        self.missing = False
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._v4 = _RangeTable("I")
+        self._v6 = _RangeTable(None)  # 128-bit starts don't fit an array typecode; plain int lists
+        self._names = []
+        self.country = lru_cache(maxsize=cache_size)(self._country)
+
+    def _open(self):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, "rt", encoding="utf-8", newline="")
+        return open(self.path, "r", encoding="utf-8", newline="")
+
+    def load(self):
+        """Read the CSV (once). Returns the number of ranges loaded."""
+        with self._lock:
+            if self._loaded:
+                return len(self._v4) + len(self._v6)
+            rows = []
+            name_index = {}
+            try:
+                with self._open() as f:
+                    for row in csv.reader(f):
+                        if len(row) < 3 or not row[0].strip() or row[0].lstrip().startswith("#"):
+                            continue
+                        try:
+                            start, is_v4 = _parse_address(row[0])
+                            end, _ = _parse_address(row[1])
+                        except ValueError:
+                            continue  # header line
+                        code = row[2].strip().upper()
+                        if not code or code == "-" or code == "ZZ":
+                            continue
+                        name = row[3].strip() if len(row) > 3 and row[3].strip() not in ("", "-") else None
+                        name = COUNTRY_NAMES.get(code) or name or code
+                        country = name_index.get(name)
+                        if country is None:
+                            country = name_index[name] = len(self._names)
+                            self._names.append(name)
+                        rows.append((not is_v4, start, end, country))
+            except FileNotFoundError:
+                self.missing = True
+                print(f"GeoIP: {self.path} not found, {self.missing_note()}")
+            rows.sort()
+            for is_v6, start, end, country in rows:
+                (self._v6 if is_v6 else self._v4).add(start, end, country)
+            self._v4.freeze()
+            self._v6.freeze()
+            self._loaded = True
+            return len(self._v4) + len(self._v6)
+
+    def available(self):
+        """Whether the database file exists (checked without loading it)."""
+        return os.path.exists(self.path)
+
+    def missing_note(self):
+        if self.fallback is not None:
+            return "looking countries up online instead (run scripts/download_geoip.py)"
+        return "countries will show as Unknown (run scripts/download_geoip.py)"
+
+    def _country(self, ip):
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except (AttributeError, ValueError):
+            return "Unknown"
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if address.is_private or address.is_loopback or address.is_link_local:
+            return "Local"
+        if not self._loaded:
+            self.load()
+        if self.missing and self.fallback is not None:
+            return self.fallback(str(address))
+        number = int(address)
+        if address.version == 4:
+            country = self._v4.find(number)
+            if country is None:
+                country = self._v6.find(_V4_MAPPED | number)
+        else:
+            country = self._v6.find(number)
+        return "Unknown" if country is None else self._names[country]
+
+
+geoip = GeoIP(
+    os.environ.get("GEOIP_DB_PATH") or os.path.join(ROOT, "Data", "geoip-country.csv"),
+    cache_size=int(os.environ.get("GEOIP_CACHE_SIZE", "4096")),
+    fallback=None if os.environ.get("GEOIP_ONLINE_FALLBACK", "1").strip() in ("0", "false", "no") else lookup_online,
+)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python geoip.py <ip> [ip ...]")
+        sys.exit(1)
+    print(f"{geoip.load()} ranges from {geoip.path}")
+    for ip in sys.argv[1:]:
+        print(f"{ip:<40} {geoip.country(ip)}")
@@ -0,0 +1,195 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) and a serialized-response cache
+for the read-only JSON APIs.
+
+The ETag is derived from the data version, not the response bytes: the
+(mtime, size) signatures of the dataset files a handler reads, plus an
+optional in-memory version counter and the request's query string. A
+revalidation whose If-None-Match still matches is answered with 304 before
+the handler runs, so unchanged data is neither rebuilt nor re-sent. Responses
+carry `Cache-Control: no-cache`, so browsers always revalidate and still see
+file edits immediately.
+
+With cache=True the serialized body of a 200 response is kept per URL together
+with gzip (and, when the brotli package is installed, brotli) variants for the
+current data version, so a full download of unchanged data skips both the
+handler and jsonify and the variant is picked from Accept-Encoding.
+
+`args` names the query parameters a handler reads. Only those are part of the
+ETag and the cache key, so cache-busters (?_=...) and unknown arguments neither
+defeat revalidation nor fill the cache with copies of the same body. The cache
+is bounded by total body bytes as well as by entry count.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+from data_store import file_signature
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (the overhead isn't worth it)
+MIN_COMPRESS_SIZE = 1024
+
+
+class ResponseCache:
+    """Serialized bodies per URL for the latest data version only, LRU-bounded by count and bytes."""
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (path, query) -> (etag, mimetype, {encoding: bytes})
+        self._sizes = {}  # key -> bytes held by the entry
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, mimetype, body):
+        bodies = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            bodies['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                bodies['br'] = brotli.compress(body, quality=5)
+        entry = (etag, mimetype, bodies)
+        size = sum(len(b) for b in bodies.values())
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return entry  # served, but too big to keep
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+        return entry
+
+    def _discard(self, key):
+        if self._entries.pop(key, None) is not None:
+            self._bytes -= self._sizes.pop(key)
+
+    @property
+    def size(self):
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+
+def _pick_encoding(bodies):
+    """Best encoding in `bodies` that the client accepts (br > gzip > identity)."""
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in bodies and accepted[encoding] > 0:
+            return encoding
+    return 'identity'
+
+
+class ConditionalGet:
+    """
+    Decorator factory: @conditional_get('file.json', ..., version=callable, args=(...), cache=False).
+    `version` covers state that is not a file on disk (in-memory lists, materialized
+    views that may lag behind their files); it is called before the handler runs.
+    `args` lists the query parameters the handler reads (None: the whole query string).
+    """
+
+    def __init__(self, store, salt=None, cache=None):
+        self.store = store
+        # Anything that changes the response format (e.g. the app module's signature)
+        self.salt = salt
+        self.cache = cache if cache is not None else ResponseCache()
+
+    @staticmethod
+    def query_key(args=None):
+        """The part of the query string that can change the response."""
+        if args is None:
+            return request.query_string
+        return tuple((name, tuple(request.args.getlist(name))) for name in args if name in request.args)
+
+    def validators(self, filenames, version=None, args=None):
+        """(etag, last_modified) for the current state of `filenames`."""
+        signatures = [file_signature(self.store.path(name)) for name in filenames]
+        extra = version() if version is not None else None
+        raw = repr((self.salt, request.path, self.query_key(args), signatures, extra))
+        etag = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+        mtimes = [sig[0] for sig in signatures if sig]
+        last_modified = None
+        if mtimes:
+            last_modified = datetime.fromtimestamp(max(mtimes) // 1_000_000_000, tz=timezone.utc)
+        return etag, last_modified
+
+    def is_fresh(self, etag, last_modified, has_version=False):
+        """True when the client's cached copy is still current."""
+        if request.if_none_match:
+            # Compressed variants carry a suffixed ETag (one validator per representation)
+            return any(request.if_none_match.contains(f'{etag}{suffix}') for suffix in ('', '-gzip', '-br'))
+        # In-memory versions have no timestamp, so only the ETag can prove freshness
+        if not has_version and last_modified is not None and request.if_modified_since is not None:
+            return last_modified <= request.if_modified_since
+        return False
+
+    @staticmethod
+    def _stamp(response, etag, last_modified):
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _cached_response(self, entry, last_modified):
+        etag, mimetype, bodies = entry
+        encoding = _pick_encoding(bodies)
+        response = make_response(bodies[encoding])
+        response.mimetype = mimetype
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+            etag = f'{etag}-{encoding}'
+        response.vary.add('Accept-Encoding')
+        return self._stamp(response, etag, last_modified)
+
+    def __call__(self, *filenames, version=None, args=None, cache=False):
+        query_args = args  # `args` is shadowed by the view's positional args below
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+                etag, last_modified = self.validators(filenames, version, query_args)
+                if self.is_fresh(etag, last_modified, version is not None):
+                    matched = next(
+                        (f'{etag}{suffix}' for suffix in ('-br', '-gzip') if request.if_none_match.contains(f'{etag}{suffix}')),
+                        etag,
+                    )
+                    return self._stamp(make_response('', 304), matched, last_modified)
+                key = (request.path, self.query_key(query_args))
+                if cache:
+                    entry = self.cache.get(key, etag)
+                    if entry is not None:
+                        return self._cached_response(entry, last_modified)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if cache and not response.direct_passthrough:
+                    entry = self.cache.put(key, etag, response.mimetype, response.get_data())
+                    return self._cached_response(entry, last_modified)
+                return self._stamp(response, etag, last_modified)
+            return wrapper
+        return decorator
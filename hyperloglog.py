@@ -0,0 +1,97 @@
+"""
+HyperLogLog sketches for approximate distinct counts (unique visitors).
+
+A sketch is 2**p one-byte registers (4 KB at the default p=12) and estimates
+the number of distinct values added to it within about 1.6% (1.04 / sqrt(2**p));
+small counts fall back to linear counting and are close to exact. Two sketches
+merge by taking the register-wise maximum, so per-day sketches can be combined
+into a week, a month or all time without ever keeping the raw values.
+
+Sketches are stored as plain bytes. register_sqlite_functions() exposes them
+to SQL:
+
+    hll_merge(a, b)      -- merged sketch (NULL-safe), for upserts
+    hll_count(sketch)    -- aggregate: distinct count of the union of all sketches
+"""
+import hashlib
+import math
+
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @classmethod
+    def from_bytes(cls, data):
+        m = len(data)
+        precision = m.bit_length() - 1
+        if m < 16 or m != 1 << precision:
+            raise ValueError(f"not a HyperLogLog sketch ({m} bytes)")
+        return cls(precision, data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        h = _hash64(value)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.m != self.m:
+            raise ValueError("cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+
+def merge_bytes(a, b):
+    """Register-wise max of two serialized sketches; either may be None."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return HyperLogLog.from_bytes(a).merge(HyperLogLog.from_bytes(b)).to_bytes()
+
+
+class _UnionCount:
+    """SQLite aggregate: hll_count(sketch)."""
+
+    def __init__(self):
+        self.sketch = None
+
+    def step(self, data):
+        if data is None:
+            return
+        sketch = HyperLogLog.from_bytes(data)
+        self.sketch = sketch if self.sketch is None else self.sketch.merge(sketch)
+
+    def finalize(self):
+        return self.sketch.count() if self.sketch is not None else 0
+
+
+def register_sqlite_functions(conn):
+    conn.create_function("hll_merge", 2, merge_bytes, deterministic=True)
+    conn.create_aggregate("hll_count", 1, _UnionCount)
@@ -1 +1,219 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Import the Excel exports in Data/ into the JSON databases the site reads.
+
+    python integrate_excel_data.py              # deals and funds
+    python integrate_excel_data.py deals        # Data/Deals.XLSX -> deals_data.json
+    python integrate_excel_data.py funds --dry-run
+
+Rows are streamed from the workbook and typed by the schemas in
+process_excel_data.py (empty cells -> null, no NaN). The import is incremental:
+every record is hashed by its key (DEAL ID + TARGET COMPANY ID, since one deal
+can cover several targets; FUND ID for funds) and compared with the current
+JSON. Unchanged records are kept as they are, and when nothing was added,
+changed or removed the JSON is not rewritten at all. If the workbook itself is
+byte-identical to the last import, it is not even parsed.
+
+Next to the JSON a binary cache (<output>.pickle in Data/) keeps the typed
+records, their hashes and the workbook hash; load_records() serves from it
+whenever it still matches the JSON file on disk.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+from atomic_write import file_lock, write_bytes
+from data_store import file_signature
+from process_excel_data import DEALS_SCHEMA, FUNDS_SCHEMA, read_xlsx_records
+from search_index_file import entity_hash
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_FORMAT = 1
+
+DATASETS = {
+    'deals': {
+        'source': os.path.join('Data', 'Deals.XLSX'),
+        'output': 'deals_data.json',
+        'schema': DEALS_SCHEMA,
+        'key': ('DEAL ID', 'TARGET COMPANY ID'),
+    },
+    'funds': {
+        'source': os.path.join('Data', 'Funds.XLSX'),
+        'output': 'funds_data.json',
+        'schema': FUNDS_SCHEMA,
+        'key': ('FUND ID',),
+    },
+}
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(spec, base_dir):
+    stem = os.path.splitext(spec['output'])[0]
+    return os.path.join(base_dir, 'Data', f'{stem}.pickle')
+
+
+def _read_cache(path):
+    try:
+        with open(path, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('format') != CACHE_FORMAT:
+        return None
+    return cache
+
+
+def _record_key(record, key_columns, seen):
+    """Stable string key; repeated keys within one file get a #n suffix."""
+    key = '|'.join(str(record.get(column)) for column in key_columns)
+    n = seen.get(key, 0)
+    seen[key] = n + 1
+    return key if n == 0 else f'{key}#{n}'
+
+
+def _previous_records(spec, base_dir, cache):
+    """(records, hashes by key) of the JSON currently on disk (from the cache when it is current)."""
+    output_path = os.path.join(base_dir, spec['output'])
+    if cache and cache.get('output') == file_signature(output_path):
+        return cache['records'], cache['hashes']
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)  # older hand exports contain NaN, which json accepts
+    except (OSError, ValueError):
+        return [], {}
+    if not isinstance(records, list):
+        return [], {}
+    seen = {}
+    hashes = {}
+    for record in records:
+        if isinstance(record, dict):
+            # Raw hash: a record holding NaN or untyped values counts as changed and is rewritten
+            hashes[_record_key(record, spec['key'], seen)] = entity_hash(record)
+    return records, hashes
+
+
+def import_dataset(name, base_dir=ROOT, dry_run=False, force=False):
+    """
+    Import one dataset from DATASETS. Returns stats:
+    added/changed/removed/unchanged/total, written (JSON rewritten) and skipped
+    (workbook unchanged since the last import).
+    """
+    spec = DATASETS[name]
+    source_path = os.path.join(base_dir, spec['source'])
+    output_path = os.path.join(base_dir, spec['output'])
+    cache_path = _cache_path(spec, base_dir)
+
+    source_hash = _file_hash(source_path)
+    cache = _read_cache(cache_path)
+    schema_columns = list(spec['schema'])
+    if (
+        not force and cache
+        and cache.get('source') == source_hash
+        and cache.get('columns') == schema_columns
+        and cache.get('output') == file_signature(output_path)
+    ):
+        total = len(cache['records'])
+        return {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': total, 'total': total, 'written': False, 'skipped': True}
+
+    old_records, old_hashes = _previous_records(spec, base_dir, cache)
+    old_by_key = {}
+    seen = {}
+    for record in old_records:
+        if isinstance(record, dict):
+            old_by_key[_record_key(record, spec['key'], seen)] = record
+
+    records = []
+    hashes = {}
+    stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    seen = {}
+    for record in read_xlsx_records(source_path, spec['schema']):
+        key = _record_key(record, spec['key'], seen)
+        record_hash = entity_hash(record)
+        previous_hash = old_hashes.get(key)
+        if previous_hash == record_hash:
+            record = old_by_key.get(key, record)
+            stats['unchanged'] += 1
+        elif previous_hash is None:
+            stats['added'] += 1
+        else:
+            stats['changed'] += 1
+        hashes[key] = record_hash
+        records.append(record)
+    stats['removed'] = sum(1 for key in old_hashes if key not in hashes)
+    stats['total'] = len(records)
+
+    same_order = list(hashes) == list(old_hashes)
+    stats['written'] = bool(stats['added'] or stats['changed'] or stats['removed'] or not same_order)
+    stats['skipped'] = False
+    if dry_run:
+        return stats
+
+    if stats['written']:
+        payload = json.dumps(records, indent=2, ensure_ascii=False, allow_nan=False)
+        with file_lock(output_path):
+            write_bytes(output_path, payload.encode('utf-8'))
+    write_bytes(cache_path, pickle.dumps({
+        'format': CACHE_FORMAT,
+        'source': source_hash,
+        'columns': schema_columns,
+        'output': file_signature(output_path),
+        'hashes': hashes,
+        'records': records,
+    }, protocol=pickle.HIGHEST_PROTOCOL), fsync=False)
+    return stats
+
+
+def load_records(name, base_dir=ROOT):
+    """
+    Typed records of an imported dataset: from the binary cache when it matches
+    the JSON on disk, otherwise parsed from the JSON.
+    """
+    spec = DATASETS[name]
+    cache = _read_cache(_cache_path(spec, base_dir))
+    return _previous_records(spec, base_dir, cache)[0]
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    dry_run = '--dry-run' in args
+    force = '--force' in args
+    names = [a for a in args if not a.startswith('--')] or list(DATASETS)
+    unknown = [n for n in names if n not in DATASETS]
+    if unknown:
+        print(f"Unknown dataset(s): {', '.join(unknown)} (choose from {', '.join(DATASETS)})")
+        return 1
+    for name in names:
+        spec = DATASETS[name]
+        print(f"📥 {spec['source']} -> {spec['output']}")
+        try:
+            stats = import_dataset(name, dry_run=dry_run, force=force)
+        except (OSError, KeyError, ValueError) as e:
+            print(f'❌ Import of {name} failed: {e}')
+            return 1
+        if stats['skipped']:
+            print(f"   Workbook unchanged since last import ({stats['total']} records)")
+            continue
+        print(
+            f"   {stats['total']} records: {stats['added']} added, {stats['changed']} changed, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+        )
+        if dry_run:
+            print('   Dry run, nothing written')
+        elif stats['written']:
+            print(f"✅ Wrote {spec['output']}")
+        else:
+            print(f"✅ {spec['output']} already up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
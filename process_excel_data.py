@@ -1 +1,312 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Streaming reader for the PitchBook/Preqin style exports in Data/ (Deals.XLSX, Funds.XLSX).
+
+An .xlsx file is a zip of XML parts. Rows are read from the sheet XML with
+ElementTree.iterparse and each <row> element is cleared once it has been
+yielded, so memory stays flat regardless of sheet size (the openpyxl read-only
+mode, without the dependency). Only the shared-string table and the cell
+styles are loaded up front: strings are referenced by index and dates are
+plain numbers whose cell style says "this is a date".
+
+Each dataset has a typed schema (column -> int/float/str/datetime). Empty
+cells become None, never NaN, so the JSON written from these records is valid.
+
+    python process_excel_data.py Data/Deals.XLSX      # print the first rows, typed
+"""
+import math
+import re
+import sys
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Built-in number formats that display a date/time (ECMA-376 18.8.30)
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {27, 30, 36, 45, 46, 47, 50, 57}
+# A custom format is a date when it has d/m/y/h/s outside quotes and [color] blocks
+_FORMAT_LITERALS_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_DATE_TOKENS_RE = re.compile(r'[dmyhs]', re.I)
+_CELL_COLUMN_RE = re.compile(r'^([A-Z]+)')
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Output format of datetime columns (matches the existing JSON exports)
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def column_index(ref):
+    """'A1' -> 0, 'AD396' -> 29."""
+    letters = _CELL_COLUMN_RE.match(ref).group(1)
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def excel_serial_to_datetime(serial):
+    """Excel day serial (1900 date system) -> datetime, rounded to the second."""
+    return _EXCEL_EPOCH + timedelta(seconds=round(float(serial) * 86400))
+
+
+def _is_date_format(num_fmt_id, format_code):
+    if num_fmt_id in _BUILTIN_DATE_FORMATS:
+        return True
+    if not format_code:
+        return False
+    return bool(_DATE_TOKENS_RE.search(_FORMAT_LITERALS_RE.sub('', format_code)))
+
+
+class XlsxReader:
+    """Row iterator over one worksheet of an .xlsx file."""
+
+    def __init__(self, path, sheet=None):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self.sheet_name, self._sheet_part = self._resolve_sheet(sheet)
+        self._strings = self._read_shared_strings()
+        self._date_styles = self._read_date_styles()
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _parts(self):
+        return set(self._zip.namelist())
+
+    def _resolve_sheet(self, sheet):
+        """(name, zip part) of `sheet` (a name), or of the first sheet."""
+        targets = {}
+        with self._zip.open('xl/_rels/workbook.xml.rels') as f:
+            for _, el in iterparse(f):
+                if el.tag == f'{_PKG_REL_NS}Relationship':
+                    target = el.get('Target', '')
+                    targets[el.get('Id')] = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+        with self._zip.open('xl/workbook.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag != f'{_NS}sheet':
+                    continue
+                name = el.get('name')
+                if sheet is None or name == sheet:
+                    return name, targets[el.get(f'{_REL_NS}id')]
+        raise KeyError(f'sheet not found in {self.path}: {sheet!r}')
+
+    def _read_shared_strings(self):
+        if 'xl/sharedStrings.xml' not in self._parts():
+            return []
+        strings = []
+        with self._zip.open('xl/sharedStrings.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag == f'{_NS}si':
+                    # Rich text splits one string over several <r><t> runs
+                    strings.append(''.join(t.text or '' for t in el.iter(f'{_NS}t')))
+                    el.clear()
+        return strings
+
+    def _read_date_styles(self):
+        """Indexes into cellXfs (the cell 's' attribute) whose number format is a date."""
+        if 'xl/styles.xml' not in self._parts():
+            return set()
+        custom = {}
+        cell_formats = []
+        in_cell_xfs = False
+        with self._zip.open('xl/styles.xml') as f:
+            for event, el in iterparse(f, events=('start', 'end')):
+                if el.tag == f'{_NS}cellXfs':
+                    in_cell_xfs = event == 'start'
+                elif event == 'end' and el.tag == f'{_NS}numFmt':
+                    custom[int(el.get('numFmtId'))] = el.get('formatCode', '')
+                elif event == 'end' and in_cell_xfs and el.tag == f'{_NS}xf':
+                    cell_formats.append(int(el.get('numFmtId', 0)))
+        return {
+            i for i, fmt_id in enumerate(cell_formats)
+            if _is_date_format(fmt_id, custom.get(fmt_id))
+        }
+
+    def _cell_value(self, cell):
+        kind = cell.get('t', 'n')
+        if kind == 'inlineStr':
+            return ''.join(t.text or '' for t in cell.iter(f'{_NS}t'))
+        value = cell.findtext(f'{_NS}v')
+        if value is None or kind == 'e':
+            return None
+        if kind == 's':
+            return self._strings[int(value)]
+        if kind == 'b':
+            return value == '1'
+        if kind in ('str', 'd'):
+            return value
+        if int(cell.get('s', 0)) in self._date_styles:
+            return excel_serial_to_datetime(value)
+        return int(value) if value.lstrip('-').isdigit() else float(value)
+
+    def rows(self):
+        """Yield each row as a list of cell values (None for empty cells), in sheet order."""
+        with self._zip.open(self._sheet_part) as f:
+            for _, el in iterparse(f):
+                if el.tag != f'{_NS}row':
+                    continue
+                values = []
+                for cell in el.iter(f'{_NS}c'):
+                    ref = cell.get('r')
+                    if ref:
+                        index = column_index(ref)
+                        if index > len(values):
+                            values.extend([None] * (index - len(values)))
+                    values.append(self._cell_value(cell))
+                el.clear()
+                yield values
+
+    def records(self):
+        """Yield {header: value} dicts, using the first row as headers."""
+        rows = self.rows()
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h).strip() if h is not None else '' for h in header]
+        width = len(header)
+        for values in rows:
+            if not any(v not in (None, '') for v in values):
+                continue
+            values = values[:width] + [None] * (width - len(values))
+            yield {h: v for h, v in zip(header, values) if h}
+
+
+# ---------------------------------------------------------------------------
+# Typed schemas
+# ---------------------------------------------------------------------------
+
+def _is_missing(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and value.strip() in ('', 'NaN', 'nan', '-')
+
+
+def to_int(value):
+    if _is_missing(value):
+        return None
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    number = float(value)
+    return int(number) if number.is_integer() else None
+
+
+def to_float(value):
+    if _is_missing(value):
+        return None
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    number = float(value)
+    return None if math.isnan(number) else number
+
+
+def to_str(value):
+    if _is_missing(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def to_datetime(value):
+    """datetime / Excel serial / ISO string -> 'YYYY-MM-DD HH:MM:SS' (or None)."""
+    if _is_missing(value):
+        return None
+    if isinstance(value, (int, float)):
+        value = excel_serial_to_datetime(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    return value.strftime(DATETIME_FORMAT)
+
+
+# Column order is the output key order
+DEALS_SCHEMA = {
+    'DEAL ID': to_int,
+    'TARGET COMPANY ID': to_int,
+    'TARGET COMPANY': to_str,
+    'TARGET COMPANY COUNTRY': to_str,
+    'DEAL DATE': to_datetime,
+    'DEAL STATUS': to_str,
+    'STRATEGY': to_str,
+    'DEAL TYPES': to_str,
+    'INVESTORS': to_str,
+    'FUNDS': to_str,
+    'PRIMARY INDUSTRY': to_str,
+    'SUB-INDUSTRIES': to_str,
+    'INDUSTRY VERTICALS': to_str,
+    'DEAL SIZE (USD MN)': to_float,
+    'ENTERPRISE VALUE (USD MN)': to_float,
+}
+
+FUNDS_SCHEMA = {
+    'FUND ID': to_int,
+    'FIRM ID': to_int,
+    'FUND SERIES ID': to_int,
+    'NAME': to_str,
+    'VINTAGE / INCEPTION YEAR': to_int,
+    'STATUS': to_str,
+    'STRATEGY': to_str,
+    'GEOGRAPHIC FOCUS': to_str,
+    'FUND SIZE (USD MN)': to_float,
+    'FINAL CLOSE DATE': to_datetime,
+    'FINAL CLOSE SIZE (USD MN)': to_float,
+    'FUND MANAGER': to_str,
+    'COUNTRY': to_str,
+    'REGION': to_str,
+    'ADDRESS': to_str,
+    'FUND STRUCTURE': to_str,
+    'DOMICILE': to_str,
+    'CORE INDUSTRIES': to_str,
+    'INDUSTRY VERTICALS': to_str,
+    'OPEN END RETURNS - AS AT DATE': to_datetime,
+    'OPEN END RETURNS - 1 MONTH(%)': to_float,
+    'OPEN END RETURNS - 3 MONTHS(%)': to_float,
+    'OPEN END RETURNS - 6 MONTHS(%)': to_float,
+    'OPEN END RETURNS - 9 MONTHS(%)': to_float,
+    'OPEN END RETURNS - 12 MONTHS(%)': to_float,
+    'OPEN END RETURNS YTD(%)': to_float,
+    'OPEN END RETURNS - 2 YEARS(% P.A.)': to_float,
+    'OPEN END RETURNS - 3 YEARS(% P.A.)': to_float,
+    'OPEN END RETURNS - 5 YEARS(% P.A.)': to_float,
+    'OPEN END RETURNS - 10 YEARS(% P.A.)': to_float,
+}
+
+
+def normalize_record(record, schema):
+    """Coerce one record (from XLSX or an older JSON export) to `schema`; unknown columns are dropped."""
+    out = {}
+    for column, convert in schema.items():
+        try:
+            out[column] = convert(record.get(column))
+        except (TypeError, ValueError):
+            out[column] = None
+    return out
+
+
+def read_xlsx_records(path, schema, sheet=None):
+    """Stream typed records from an .xlsx export."""
+    with XlsxReader(path, sheet) as reader:
+        for record in reader.records():
+            yield normalize_record(record, schema)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python process_excel_data.py <file.xlsx> [rows]')
+        sys.exit(1)
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with XlsxReader(sys.argv[1]) as reader:
+        print(f'Sheet: {reader.sheet_name}')
+        for i, record in enumerate(reader.records()):
+            if i >= limit:
+                break
+            print(record)
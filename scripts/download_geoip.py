@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Download the DB-IP "IP to Country Lite" database to Data/geoip-country.csv
+(or GEOIP_DB_PATH) for geoip.py. Run by the Render build; safe to re-run.
+
+DB-IP Lite is free and licensed under Creative Commons Attribution 4.0
+(https://db-ip.com/db/lite.php): pages that show countries derived from it
+must credit "IP Geolocation by DB-IP" with a link to https://db-ip.com.
+It is published monthly, so this tries this month's file and then last month's.
+
+    python scripts/download_geoip.py
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import sys
+import urllib.request
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from atomic_write import write_bytes
+from geoip import geoip
+
+URL = "https://download.db-ip.com/free/dbip-country-lite-{month}.csv.gz"
+
+
+def _months():
+    today = date.today()
+    yield f"{today.year}-{today.month:02d}"
+    if today.month == 1:
+        yield f"{today.year - 1}-12"
+    else:
+        yield f"{today.year}-{today.month - 1:02d}"
+
+
+def download(path=None):
+    """Fetch the newest published database and replace `path` with it. Returns the URL used."""
+    path = path or geoip.path
+    errors = []
+    for month in _months():
+        url = URL.format(month=month)
+        try:
+            with urllib.request.urlopen(url, timeout=60) as resp:
+                data = resp.read()
+        except Exception as e:
+            errors.append(f"{url}: {e}")
+            continue
+        if not path.endswith(".gz"):
+            data = gzip.decompress(data)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_bytes(path, data)
+        return url
+    raise RuntimeError("; ".join(errors))
+
+
+if __name__ == "__main__":
+    try:
+        url = download()
+    except Exception as e:
+        print(f"GeoIP download failed: {e}")
+        sys.exit(1)
+    print(f"Downloaded {url} -> {geoip.path} ({geoip.load()} ranges)")
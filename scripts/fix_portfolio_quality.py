@@ -5,13 +5,17 @@ Run from repo root: python scripts/fix_portfolio_quality.py
 """
 from __future__ import annotations
 
-import json
 import os
+import sys
 from copy import deepcopy
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PATH = os.path.join(ROOT, "portfolio_enriched.json")
 
+sys.path.insert(0, ROOT)
+
+from atomic_write import update_json
+
 
 def patch_company(c: dict, updates: dict) -> None:
     for k, v in updates.items():
@@ -21,9 +25,10 @@ def patch_company(c: dict, updates: dict) -> None:
 
 
 def main() -> None:
-    with open(PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    update_json(PATH, fix_portfolio)
 
+
+def fix_portfolio(data: dict) -> dict:
     companies: list = data["companies"]
     original_len = len(companies)
 
@@ -422,10 +427,8 @@ def main() -> None:
     )
     data["metadata"]["total_companies"] = len(companies)
 
-    with open(PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
     print(f"Done. Companies: {original_len} -> {len(companies)} (removed {removed})")
+    return data
 
 
 if __name__ == "__main__":
@@ -6,11 +6,16 @@ from __future__ import annotations
 import json
 import re
 import ssl
+import sys
 import time
 import urllib.error
 import urllib.request
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from atomic_write import update_json, write_json
+
 BASE = Path(__file__).resolve().parents[1]
 PORTFOLIO = BASE / "portfolio_enriched.json"
 
@@ -292,12 +297,6 @@ def scrape_url(url: str) -> tuple[dict, dict]:
 
 
 def main():
-    with open(PORTFOLIO, encoding="utf-8") as f:
-        db = json.load(f)
-
-    companies_list = db["companies"]
-    by_name = {c["company"]: c for c in companies_list}
-
     results = {}
     for name, url in COMPANIES:
         print(f"Scraping {name}...")
@@ -311,26 +310,29 @@ def main():
         time.sleep(1)
 
     debug_path = BASE / "scripts" / "allabolag_scrape_debug.json"
-    with open(debug_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    write_json(debug_path, results)
 
     updated = 0
-    for name, _url in COMPANIES:
-        r = results.get(name)
-        if not r or not r.get("ok") or name not in by_name:
-            continue
-        c = by_name[name]
-        c["metrics_source"] = "Allabolag"
-        c["metrics_url"] = r["url"]
-        c["financials"] = r["fin"]
-        rev = format_revenue_line(r["fin"])
-        if rev:
-            c["revenue"] = rev
-        updated += 1
-
-    with open(PORTFOLIO, "w", encoding="utf-8") as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+
+    def apply_results(db):
+        nonlocal updated
+        by_name = {c["company"]: c for c in db["companies"]}
+        for name, _url in COMPANIES:
+            r = results.get(name)
+            if not r or not r.get("ok") or name not in by_name:
+                continue
+            c = by_name[name]
+            c["metrics_source"] = "Allabolag"
+            c["metrics_url"] = r["url"]
+            c["financials"] = r["fin"]
+            rev = format_revenue_line(r["fin"])
+            if rev:
+                c["revenue"] = rev
+            updated += 1
+        return db
+
+    # Re-read under the write lock so edits made while scraping are kept
+    update_json(PORTFOLIO, apply_results, trailing_newline=True)
 
     print(f"\nUpdated {updated}/{len(COMPANIES)} companies")
 
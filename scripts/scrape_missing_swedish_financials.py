@@ -11,6 +11,9 @@ import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(1, str(Path(__file__).resolve().parents[1]))
+
+from atomic_write import update_json, write_json
 
 from scrape_allabolag_financials import PORTFOLIO, format_revenue_line
 from scrape_celero_eqt_financials import resolve_and_scrape, search_allabolag, try_scrape
@@ -92,15 +95,30 @@ def load_checkpoint() -> dict:
 
 
 def save_checkpoint(cp: dict) -> None:
-    with open(CHECKPOINT, "w", encoding="utf-8") as f:
-        json.dump(cp, f, ensure_ascii=False, indent=2)
-
-
-def save_portfolio(db: dict) -> None:
-    db["metadata"]["last_updated"] = time.strftime("%Y-%m-%d")
-    with open(PORTFOLIO, "w", encoding="utf-8") as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    write_json(CHECKPOINT, cp)
+
+
+def save_portfolio(updated: dict, added: list[dict]) -> None:
+    """
+    Merge this run's results into the current portfolio_enriched.json under its write
+    lock: `updated` maps company -> scrape result to apply, `added` are new rows. Both
+    hold everything scraped so far, so re-applying them on each save is idempotent and
+    edits made by other writers since the file was loaded are kept.
+    """
+    def merge(db: dict) -> dict:
+        by_name = {c["company"]: c for c in db["companies"]}
+        for name, r in updated.items():
+            apply_one(by_name, name, r)
+        for row in added:
+            if row["company"] not in by_name:
+                db["companies"].append(row)
+                by_name[row["company"]] = row
+        if added:
+            db["metadata"]["total_companies"] = len(db["companies"])
+        db["metadata"]["last_updated"] = time.strftime("%Y-%m-%d")
+        return db
+
+    update_json(PORTFOLIO, merge, trailing_newline=True)
 
 
 def apply_one(by_name: dict, name: str, r: dict) -> bool:
@@ -139,7 +157,7 @@ def pe_swedish_not_in_enriched(enriched_names: set[str]) -> list[tuple[str, str,
     return out
 
 
-def apply_checkpoint_to_portfolio(db: dict, by_name: dict, results: dict) -> int:
+def apply_checkpoint_to_portfolio(by_name: dict, results: dict, updated: dict) -> int:
     """Apply checkpoint ok+fin to companies still missing financials.tables."""
     applied = 0
     for name, r in (results or {}).items():
@@ -149,9 +167,10 @@ def apply_checkpoint_to_portfolio(db: dict, by_name: dict, results: dict) -> int
         if not c or has_uc_financials(c):
             continue
         if apply_one(by_name, name, r):
+            updated[name] = r
             applied += 1
     if applied:
-        save_portfolio(db)
+        save_portfolio(updated, [])
         print(f"Checkpoint applied fin to {applied} companies", flush=True)
     return applied
 
@@ -164,7 +183,9 @@ def main():
     pe_meta = load_pe_portfolio_meta()
     cp = load_checkpoint()
     results: dict = cp.get("results") or {}
-    apply_checkpoint_to_portfolio(db, by_name, results)
+    updated: dict = {}  # company -> scrape result applied this run
+    added: list[dict] = []  # rows added from pe_firms_database this run
+    apply_checkpoint_to_portfolio(by_name, results, updated)
 
     targets: list[tuple[str, dict]] = []
     for c in companies_list:
@@ -207,7 +228,8 @@ def main():
         if r.get("ok"):
             if apply_one(by_name, name, r):
                 ok_count += 1
-                save_portfolio(db)
+                updated[name] = r
+                save_portfolio(updated, added)
                 ent = r["fin"].get("legal_entity", "")
                 print(f"  OK {ent} {r['fin'].get('period_labels')}", flush=True)
             else:
@@ -248,8 +270,9 @@ def main():
             row = make_portfolio_entry(name, firm_key, r["fin"], r["url"], pe)
             companies_list.append(row)
             by_name[name] = row
+            added.append(row)
             added_from_pe += 1
-            save_portfolio(db)
+            save_portfolio(updated, added)
             print(f"  OK added {r['fin'].get('legal_entity')}", flush=True)
             ok_count += 1
         else:
@@ -260,17 +283,9 @@ def main():
         time.sleep(1.2)
 
     if added_from_pe:
-        db["metadata"]["total_companies"] = len(companies_list)
-        save_portfolio(db)
         print(f"Added {added_from_pe} companies from pe_firms_database", flush=True)
 
-    with open(DEBUG_OUT, "w", encoding="utf-8") as f:
-        json.dump(
-            {k: {kk: vv for kk, vv in v.items() if kk != "fin"} for k, v in results.items()},
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
+    write_json(DEBUG_OUT, {k: {kk: vv for kk, vv in v.items() if kk != "fin"} for k, v in results.items()})
 
     failed = [n for n, v in results.items() if not v.get("ok")]
     print(f"\nDone. OK={ok_count} FAIL={fail_count} (this run targets={len(targets)})", flush=True)
@@ -4,11 +4,16 @@ Updates pe_firms_database.json (curated firms) and portfolio_enriched.json (Heli
 """
 from __future__ import annotations
 
-import json
 import re
+import sys
 import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(1, str(Path(__file__).resolve().parents[1]))
+
+from atomic_write import update_json, write_json
+
 from scrape_allabolag_financials import (
     PORTFOLIO,
     format_revenue_line,
@@ -81,14 +86,8 @@ def apply_to_enriched_company(c: dict, fin: dict, url: str) -> None:
 
 
 def main():
-    with open(PE_FIRMS, encoding="utf-8") as f:
-        pe_db = json.load(f)
-
-    with open(PORTFOLIO, encoding="utf-8") as f:
-        port_db = json.load(f)
-
-    enriched_by_name = {c["company"]: c for c in port_db.get("companies", [])}
     results = {}
+    scraped = []  # (label, pe firm or None, match name, aliases, financials, url)
 
     for firm, match_name, url, aliases in BATCH:
         label = f"{firm or 'Helix'}:{match_name}"
@@ -103,40 +102,50 @@ def main():
                 "url": final_url,
             }
             print(f"  OK {fin.get('legal_entity')} {fin.get('period_labels')}")
-
-            if firm:
-                pe_firm = pe_db.get("pe_firms", {}).get(firm)
-                if not pe_firm:
-                    raise ValueError(f"PE firm not found: {firm}")
-                found = False
-                for pc in pe_firm.get("portfolio_companies", []):
-                    if names_match(pc.get("name", ""), match_name, aliases):
-                        apply_to_pe_pc(pc, fin, final_url)
-                        found = True
-                        break
-                if not found:
-                    raise ValueError(f"Portfolio company not found: {match_name} in {firm}")
-            else:
-                if match_name not in enriched_by_name:
-                    raise ValueError(f"Not in portfolio_enriched: {match_name}")
-                apply_to_enriched_company(enriched_by_name[match_name], fin, final_url)
+            scraped.append((label, firm, match_name, aliases, fin, final_url))
 
         except Exception as e:
             results[label] = {"ok": False, "error": str(e), "url": url}
             print(f"  FAIL {e}")
         time.sleep(1)
 
-    with open(PE_FIRMS, "w", encoding="utf-8") as f:
-        json.dump(pe_db, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    def fail(label, url, error):
+        results[label] = {"ok": False, "error": error, "url": url}
+        print(f"  FAIL {label}: {error}")
+
+    def apply_pe_firms(pe_db):
+        for label, firm, match_name, aliases, fin, url in scraped:
+            if not firm:
+                continue
+            pe_firm = pe_db.get("pe_firms", {}).get(firm)
+            if not pe_firm:
+                fail(label, url, f"PE firm not found: {firm}")
+                continue
+            for pc in pe_firm.get("portfolio_companies", []):
+                if names_match(pc.get("name", ""), match_name, aliases):
+                    apply_to_pe_pc(pc, fin, url)
+                    break
+            else:
+                fail(label, url, f"Portfolio company not found: {match_name} in {firm}")
+        return pe_db
+
+    def apply_portfolio(port_db):
+        enriched_by_name = {c["company"]: c for c in port_db.get("companies", [])}
+        for label, firm, match_name, aliases, fin, url in scraped:
+            if firm:
+                continue
+            if match_name not in enriched_by_name:
+                fail(label, url, f"Not in portfolio_enriched: {match_name}")
+                continue
+            apply_to_enriched_company(enriched_by_name[match_name], fin, url)
+        return port_db
 
-    with open(PORTFOLIO, "w", encoding="utf-8") as f:
-        json.dump(port_db, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    # Re-read both files under their write locks so edits made while scraping are kept
+    update_json(PE_FIRMS, apply_pe_firms, trailing_newline=True)
+    update_json(PORTFOLIO, apply_portfolio, trailing_newline=True)
 
     debug = BASE / "scripts" / "allabolag_pe_batch_debug.json"
-    with open(debug, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    write_json(debug, results)
 
     ok = sum(1 for r in results.values() if r.get("ok"))
     print(f"\nDone: {ok}/{len(BATCH)} succeeded")
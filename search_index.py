@@ -0,0 +1,140 @@
+"""
+In-memory search index for the site's typeahead / search endpoints.
+
+Documents are indexed by a handful of text fields (name, firm, sector, ...).
+A query scores each document by its best-matching field, using the same tiers
+as the original linear search in app.py, multiplied by the field's weight:
+
+    100  field equals the query
+     80  field starts with the query
+     50  query occurs anywhere in the field
+
+Exact matches are a dict lookup, prefix matches a bisect over the sorted field
+values (a flattened prefix trie), and substring matches intersect character
+bigram postings before verifying, so a query only touches matching values.
+"""
+import heapq
+from bisect import bisect_left
+
+EXACT = 100
+PREFIX = 80
+SUBSTRING = 50
+
+_NGRAM = 2
+
+
+def _normalize(value):
+    return (value or '').lower().strip()
+
+
+def _grams(text):
+    return {text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1)}
+
+
+class SearchIndex:
+    """Exact / prefix / substring index over documents with text fields."""
+
+    def __init__(self):
+        self.docs = []  # (doc, boost, rank, sort_name)
+        self._value_docs = {}  # normalized field value -> [(doc_id, weight), ...]
+        self._sorted_values = None
+        self._gram_values = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc, fields, boost=0, rank=0, sort_name=''):
+        """
+        Index one document. `fields` holds text values or (text, weight) pairs.
+        `boost` is added to the match score and `rank` breaks ties between equal
+        scores (lower first); remaining ties go by sort_name, then insertion order.
+        """
+        doc_id = len(self.docs)
+        self.docs.append((doc, boost, rank, _normalize(sort_name)))
+        for field in fields:
+            raw, weight = field if isinstance(field, tuple) else (field, 1)
+            value = _normalize(raw)
+            if not value:
+                continue
+            postings = self._value_docs.setdefault(value, [])
+            if postings and postings[-1][0] == doc_id:
+                if weight > postings[-1][1]:
+                    postings[-1] = (doc_id, weight)
+                continue
+            postings.append((doc_id, weight))
+        self._sorted_values = None
+        return doc_id
+
+    def _ensure_built(self):
+        if self._sorted_values is not None:
+            return
+        values = sorted(self._value_docs)
+        grams = {}
+        for value in values:
+            for g in _grams(value):
+                grams.setdefault(g, []).append(value)
+        self._gram_values = grams
+        self._sorted_values = values
+
+    def _prefix_values(self, q):
+        values = self._sorted_values
+        i = bisect_left(values, q)
+        while i < len(values) and values[i].startswith(q):
+            yield values[i]
+            i += 1
+
+    def _substring_values(self, q):
+        if len(q) < _NGRAM:
+            return [v for v in self._sorted_values if q in v]
+        postings = []
+        for g in _grams(q):
+            values = self._gram_values.get(g)
+            if not values:
+                return []
+            postings.append(values)
+        postings.sort(key=len)
+        candidates = postings[0]
+        if len(postings) > 1:
+            others = [set(p) for p in postings[1:]]
+            candidates = [v for v in candidates if all(v in o for o in others)]
+        return [v for v in candidates if q in v]
+
+    def match(self, query):
+        """{doc_id: score} for every document matching the query (boost not included)."""
+        q = _normalize(query)
+        if not q:
+            return {}
+        self._ensure_built()
+        best = {}
+
+        def _collect(values, tier):
+            for value in values:
+                for doc_id, weight in self._value_docs[value]:
+                    score = tier * weight
+                    if score > best.get(doc_id, 0):
+                        best[doc_id] = score
+
+        if q in self._value_docs:
+            _collect((q,), EXACT)
+        _collect(self._prefix_values(q), PREFIX)
+        _collect(self._substring_values(q), SUBSTRING)
+        return best
+
+    def order_key(self, doc_id, score):
+        """Sort key for a match: best score (plus boost) first, then rank, name, insertion."""
+        _, boost, rank, sort_name = self.docs[doc_id]
+        return (-(score + boost), rank, sort_name, doc_id)
+
+    def search(self, query, limit=None):
+        """Best matches first as (score, doc) pairs; score includes the document boost."""
+        best = self.match(query)
+        keys = (self.order_key(doc_id, score) for doc_id, score in best.items())
+        if limit is None:
+            ordered = sorted(keys)
+        else:
+            ordered = heapq.nsmallest(limit, keys)
+        return [(-key[0], self.docs[key[3]][0]) for key in ordered]
+
+    def filter(self, query):
+        """All matching documents in insertion order (no ranking)."""
+        return [self.docs[doc_id][0] for doc_id in sorted(self.match(query))]
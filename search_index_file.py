@@ -0,0 +1,136 @@
+"""
+Build output for the client-side typeahead index loaded by static/global_search.js.
+
+Each entity (firm / company row) gets a content hash, and the index version is a
+hash over those. If the version matches the last build, nothing is written, so
+gunicorn workers starting together don't all rewrite the file. Otherwise the
+index goes to a versioned file (search-index.<version>.json, safe to cache
+forever) with a .gz sibling, and a .br sibling when the brotli package is
+installed. The unversioned search-index.json is written too, for pages that
+still reference it. Every file is written to a temp file and renamed into place.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import os
+
+from atomic_write import write_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def entity_hash(item):
+    """Stable content hash of one index entry."""
+    raw = json.dumps(item, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _jsonable(value):
+    """Tuples -> lists, so a value compares equal to itself after a JSON round trip."""
+    return json.loads(json.dumps(value))
+
+
+class SearchIndexFile:
+    """Versioned, pre-compressed search index files under a static directory."""
+
+    def __init__(self, static_dir, name='search-index'):
+        self.static_dir = static_dir
+        self.name = name
+        self.manifest_path = os.path.join(static_dir, f'{name}.manifest.json')
+
+    def filename(self, version=None):
+        """Static filename for a version (the unversioned name when version is None)."""
+        return f'{self.name}.{version}.json' if version else f'{self.name}.json'
+
+    def path(self, version=None):
+        return os.path.join(self.static_dir, self.filename(version))
+
+    def outputs(self, version):
+        """Every file a build of `version` produces."""
+        base = self.path(version)
+        paths = [base, base + '.gz', self.path()]
+        if brotli is not None:
+            paths.append(base + '.br')
+        return paths
+
+    def read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def current(self, sources):
+        """
+        Versioned filename of the last build if it was made from the same
+        `sources` (e.g. input file signatures) and its files still exist, else None.
+        """
+        manifest = self.read_manifest()
+        version = manifest.get('version')
+        if not version or manifest.get('sources') != _jsonable(sources):
+            return None
+        if not all(os.path.exists(p) for p in self.outputs(version)):
+            return None
+        return self.filename(version)
+
+    def write(self, items, sources=None):
+        """
+        Write the index unless its content is unchanged.
+        Returns (filename, stats) where stats has changed/removed/total/written.
+        """
+        hashes = {}
+        for i, item in enumerate(items):
+            key = f"{item.get('type', '')}:{item.get('url', '')}"
+            if key in hashes:
+                key = f'{key}#{i}'
+            hashes[key] = entity_hash(item)
+        digest = hashlib.sha1()
+        for key, h in hashes.items():
+            digest.update(f'{key} {h}\n'.encode('utf-8'))
+        version = digest.hexdigest()[:12]
+
+        manifest = self.read_manifest()
+        previous = manifest.get('entities') or {}
+        stats = {
+            'changed': sum(1 for k, h in hashes.items() if previous.get(k) != h),
+            'removed': sum(1 for k in previous if k not in hashes),
+            'total': len(hashes),
+            'written': False,
+        }
+
+        if manifest.get('version') != version or not all(os.path.exists(p) for p in self.outputs(version)):
+            payload = json.dumps(items, ensure_ascii=False).encode('utf-8')
+            base = self.path(version)
+            write_bytes(base, payload)
+            write_bytes(base + '.gz', gzip.compress(payload, compresslevel=9, mtime=0))
+            if brotli is not None:
+                write_bytes(base + '.br', brotli.compress(payload))
+            write_bytes(self.path(), payload)
+            stats['written'] = True
+            self._remove_old_versions(keep={version, manifest.get('version')})
+
+        write_bytes(self.manifest_path, json.dumps({
+            'version': version,
+            'file': self.filename(version),
+            'sources': _jsonable(sources),
+            'entities': hashes,
+        }, ensure_ascii=False).encode('utf-8'))
+        return self.filename(version), stats
+
+    def _remove_old_versions(self, keep):
+        """Delete versioned files except `keep` (the previous version stays for already-rendered pages)."""
+        prefix = os.path.join(self.static_dir, self.name + '.')
+        for path in glob.glob(glob.escape(prefix) + '*.json*'):
+            if path == self.manifest_path:
+                continue
+            version = path[len(prefix):].split('.', 1)[0]
+            if version in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Append-only log of platform access signups (platform_signups.jsonl).
+
+One JSON object per line, oldest first. A signup is a single O_APPEND write
+of one line (plus fsync), so it costs the same however many signups exist and
+concurrent workers never overwrite each other. The admin page reads only the
+end of the file, backwards, until it has the newest N entries.
+
+The older platform_signups.json (a JSON list rewritten on every signup) is
+folded into the log once, on first use, and renamed to *.json.migrated.
+
+    python signup_log.py migrate      # run the one-time migration now
+    python signup_log.py tail [n]     # newest signups
+"""
+import json
+import os
+import sys
+
+from atomic_write import file_lock, write_bytes
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class SignupLog:
+    """JSONL signup log with O(1) appends and a tail reader."""
+
+    BLOCK = 8192
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._migrated = False
+
+    def append(self, email, created_at):
+        """Record one signup."""
+        self.migrate()
+        line = json.dumps({"email": email, "created_at": created_at}, ensure_ascii=True) + "\n"
+        with file_lock(self.path):
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # A crash mid-write can leave a torn last line; don't glue the new entry onto it
+                size = os.fstat(fd).st_size
+                if size and os.pread(fd, 1, size - 1) != b"\n":
+                    line = "\n" + line
+                os.write(fd, line.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def tail(self, n=200):
+        """Newest `n` signups, newest first."""
+        self.migrate()
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            # Read blocks from the end until n complete lines are in the buffer
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(self.BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        lines = buf.splitlines()
+        if pos > 0:
+            lines = lines[1:]  # starts mid-line
+        entries = []
+        for line in reversed(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn line
+            if isinstance(entry, dict):
+                entries.append(entry)
+                if len(entries) == n:
+                    break
+        return entries
+
+    def migrate(self):
+        """
+        Fold the legacy JSON list into the log (once). Entries already in the log
+        stay after the migrated ones. Returns the number of entries migrated.
+        """
+        if self._migrated or not self.legacy_path:
+            return 0
+        if not os.path.exists(self.legacy_path):
+            self._migrated = True
+            return 0
+        with file_lock(self.path):
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+            except FileNotFoundError:
+                # Another worker migrated it first
+                self._migrated = True
+                return 0
+            except ValueError as e:
+                # Unreadable legacy file: set it aside so new signups still get logged
+                os.replace(self.legacy_path, self.legacy_path + ".corrupt")
+                self._migrated = True
+                print(f"Could not migrate {os.path.basename(self.legacy_path)} ({e}); moved it to {os.path.basename(self.legacy_path)}.corrupt")
+                return 0
+            if not isinstance(legacy, list):
+                legacy = []
+            legacy = sorted((e for e in legacy if isinstance(e, dict)), key=lambda e: e.get("created_at", ""))
+            existing = b""
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    existing = f.read()
+                if existing and not existing.endswith(b"\n"):
+                    existing += b"\n"
+            payload = "".join(json.dumps(e, ensure_ascii=True) + "\n" for e in legacy).encode("utf-8")
+            write_bytes(self.path, payload + existing)
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        self._migrated = True
+        print(f"Migrated {len(legacy)} signups from {os.path.basename(self.legacy_path)} to {os.path.basename(self.path)}")
+        return len(legacy)
+
+
+signups = SignupLog(
+    os.path.join(ROOT, "platform_signups.jsonl"),
+    legacy_path=os.path.join(ROOT, "platform_signups.json"),
+)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "tail"
+    if command == "migrate":
+        migrated = signups.migrate()
+        if not migrated:
+            print("Nothing to migrate")
+    elif command == "tail":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        for entry in signups.tail(limit):
+            print(f"{entry.get('created_at', '')}  {entry.get('email', '')}")
+    else:
+        print("Usage: python signup_log.py [migrate | tail [n]]")
+        sys.exit(1)
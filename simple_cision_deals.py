@@ -4,10 +4,10 @@ Simple script to fetch Nordic PE deals from Cision RSS feeds
 """
 
 import requests
-import json
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import re
+from atomic_write import write_json
 
 def fetch_rss_feed(url):
     """Fetch and parse RSS feed"""
@@ -122,8 +122,7 @@ def main():
         "source": "Cision RSS feeds"
     }
     
-    with open('deal_flow_database.json', 'w', encoding='utf-8') as f:
-        json.dump(deals_data, f, indent=2, ensure_ascii=False)
+    write_json('deal_flow_database.json', deals_data)
     
     print(f"✅ Saved {len(deals)} deals to deal_flow_database.json")
     
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite copy of the JSON databases, for indexed queries (DATA_BACKEND=sqlite).
+
+The JSON files stay the editable source of truth. Each collection (one record
+list in one JSON file) is copied into its own table: the record as JSON text,
+keyed by position, plus a few typed, indexed columns and a trigram FTS5 table
+over its text fields (trigram FTS matches case-insensitive substrings, the
+same matching the in-memory SearchIndex uses). The deal collections also get
+a facets table (one row per investor / industry / ... value per deal) and the
+date/size columns and sort ranks of deal_store.DealTable, so filtered, sorted
+and cursor-paged deal queries return exactly what the in-memory tables return.
+
+A collection is re-copied when its file's bytes change: ensure_current() stats
+the file on each query (cheap). Only the very first copy is made inline; after
+that a changed file is re-synced on a background thread while queries keep
+reading the previous copy, like data_store.MaterializedView. A sync is one
+write transaction, which also serializes concurrent workers (the second finds
+the copy already current), and the database runs in WAL mode, so readers never
+wait for it. Queries that must agree with each other run in one read snapshot
+(reading()).
+
+    python sqlite_store.py sync [--force] [collection ...]
+    python sqlite_store.py status
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from data_store import DatasetStore, file_signature
+from deal_store import DEAL_FLOW_COLUMNS, DEALS_DATA_COLUMNS, DealTable, iter_bits
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(ROOT, 'data.sqlite3')
+
+# name -> source file, key of the record list (None: the file is the list),
+# indexed columns (record field names) and FTS text fields. Only collections that
+# app.py queries are copied: the deal-flow page and league tables (deal_flow,
+# deals_data) and the family office / investment company searches, whose text
+# fields match SEARCH_DOMAINS in app.py.
+COLLECTIONS = {
+    'deal_flow': {
+        'file': 'deal_flow_database.json', 'key': 'deals',
+        'columns': ('id', 'company', 'pe_firm'),
+        'deal_columns': DEAL_FLOW_COLUMNS,
+    },
+    'deals_data': {
+        'file': 'deals_data.json', 'key': None,
+        'columns': ('DEAL ID', 'TARGET COMPANY'),
+        'deal_columns': DEALS_DATA_COLUMNS,
+    },
+    'family_offices': {
+        'file': 'family_offices_database.json', 'key': 'family_offices',
+        'columns': ('name', 'type'),
+        'text': ('name', 'founding_family', 'investment_focus'),
+    },
+    'investment_companies': {
+        'file': 'investmentbolag_database.json', 'key': 'investment_companies',
+        'columns': ('name', 'ticker', 'type'),
+        'text': ('name', 'holdings', 'investment_focus'),
+    },
+}
+
+# Trigram FTS needs at least this many characters; shorter queries scan with LIKE
+_TRIGRAM = 3
+
+# Bumped when the table layout, stored text or size ranks change, so older databases are re-synced in full
+_LAYOUT_VERSION = 4
+
+
+def column_name(field):
+    """SQL column for a record field: 'DEAL ID' -> 'deal_id'."""
+    return re.sub(r'\W+', '_', field.strip().lower()).strip('_')
+
+
+def _text(value):
+    """Searchable text of a field (lists joined, missing/NaN empty)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value)
+    return str(value).strip()
+
+
+def _scalar(value):
+    """Value for a typed SQL column (containers as JSON, NaN as NULL)."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _fts_phrase(query):
+    return '"' + query.replace('"', '""') + '"'
+
+
+class SqliteStore:
+    """Collections from COLLECTIONS in one SQLite file, synced from `datasets`."""
+
+    def __init__(self, db_path=DEFAULT_DB, datasets=None, collections=None):
+        self.db_path = db_path
+        self.datasets = datasets or DatasetStore(ROOT)
+        self.collections = collections or COLLECTIONS
+        self._local = threading.local()
+        self._synced = {}  # collection -> file signature last seen in the sources table
+        self._syncing = {}  # collection -> pid of the process running its background sync
+        self._lock = threading.Lock()
+
+    # -- connections -------------------------------------------------------
+
+    def connection(self):
+        """This thread's connection (reopened after a fork, e.g. gunicorn --preload)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            'collection TEXT PRIMARY KEY, file TEXT NOT NULL, signature TEXT, sha1 TEXT, '
+            'rows INTEGER, synced_at REAL)'
+        )
+        if conn.execute('PRAGMA user_version').fetchone()[0] != _LAYOUT_VERSION:
+            self._reset(conn)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _reset(conn):
+        """Drop every copied table of an older layout; each collection is rebuilt on its next sync."""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != _LAYOUT_VERSION:
+                # Virtual (FTS) tables first: dropping one also drops its shadow tables
+                for (table,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'sources' "
+                    "ORDER BY sql NOT LIKE 'CREATE VIRTUAL TABLE%'"
+                ).fetchall():
+                    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+                conn.execute('DELETE FROM sources')
+                conn.execute(f'PRAGMA user_version = {_LAYOUT_VERSION}')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    # -- sync --------------------------------------------------------------
+
+    def _records(self, spec):
+        data = self.datasets.get(spec['file'])
+        records = data if spec['key'] is None else data.get(spec['key'], [])
+        if isinstance(records, dict):
+            return [dict(value, key=key) if isinstance(value, dict) else {'key': key, 'value': value}
+                    for key, value in records.items()]
+        return [r for r in records if isinstance(r, dict)]
+
+    def _create(self, conn, name, spec):
+        columns = [column_name(f) for f in spec['columns']]
+        deal = 'deal_columns' in spec
+        extra = ', date INTEGER, size REAL, size_desc_rank INTEGER, size_asc_rank INTEGER' if deal else ''
+        text = self._text_fields(spec)
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{name}_fts"')
+        conn.execute(f'DROP TABLE IF EXISTS "{name}_facets"')
+        conn.execute(
+            f'CREATE TABLE "{name}" (pos INTEGER PRIMARY KEY, doc TEXT NOT NULL'
+            + ''.join(f', "{c}"' for c in columns) + extra + ')'
+        )
+        for c in columns:
+            conn.execute(f'CREATE INDEX "{name}_{c}" ON "{name}" ("{c}")')
+        conn.execute(
+            f'CREATE VIRTUAL TABLE "{name}_fts" USING fts5('
+            + ', '.join(f'"{column_name(f)}"' for f in text) + ", tokenize='trigram')"
+        )
+        if deal:
+            conn.execute(f'CREATE INDEX "{name}_date" ON "{name}" (date)')
+            conn.execute(f'CREATE INDEX "{name}_size_desc_rank" ON "{name}" (size_desc_rank)')
+            conn.execute(f'CREATE INDEX "{name}_size_asc_rank" ON "{name}" (size_asc_rank)')
+            conn.execute(
+                f'CREATE TABLE "{name}_facets" (category TEXT NOT NULL, code INTEGER NOT NULL, '
+                'label TEXT NOT NULL, value TEXT NOT NULL, pos INTEGER NOT NULL)'
+            )
+            conn.execute(f'CREATE INDEX "{name}_facets_value" ON "{name}_facets" (category, value, pos)')
+            conn.execute(f'CREATE INDEX "{name}_facets_pos" ON "{name}_facets" (pos, category, code)')
+
+    @staticmethod
+    def _text_fields(spec):
+        if 'text' in spec:
+            return spec['text']
+        return spec['deal_columns'].get('text', ())
+
+    def _load(self, conn, name, spec):
+        """Copy one collection into freshly created tables. Returns the row count."""
+        records = self._records(spec)
+        fields = spec['columns']
+        placeholders = ', '.join('?' for _ in range(2 + len(fields)))
+        text = self._text_fields(spec)
+        if 'deal_columns' not in spec:
+            conn.executemany(
+                f'INSERT INTO "{name}" VALUES ({placeholders})',
+                ((pos, json.dumps(r, ensure_ascii=False), *(_scalar(r.get(f)) for f in fields))
+                 for pos, r in enumerate(records)),
+            )
+            rows = list(enumerate(records))
+        else:
+            # Same row order, parsing and categories as the in-memory DealTable
+            table = DealTable(records, spec['deal_columns'])
+            desc_rank = [0] * len(table)
+            asc_rank = [0] * len(table)
+            for rank, pos in enumerate(table.size_desc):
+                desc_rank[pos] = rank
+            for rank, pos in enumerate(table.size_asc):
+                asc_rank[pos] = rank
+            conn.executemany(
+                f'INSERT INTO "{name}" VALUES ({placeholders}, ?, ?, ?, ?)',
+                ((pos, json.dumps(r, ensure_ascii=False), *(_scalar(r.get(f)) for f in fields),
+                  table.dates[pos], None if table.sizes[pos] != table.sizes[pos] else table.sizes[pos],
+                  desc_rank[pos], asc_rank[pos])
+                 for pos, r in enumerate(table.records)),
+            )
+            for category, column in table.categories.items():
+                conn.executemany(
+                    f'INSERT INTO "{name}_facets" VALUES (?, ?, ?, ?, ?)',
+                    ((category, code, label, label.lower(), pos)
+                     for code, (label, mask) in enumerate(zip(column.labels, column.masks))
+                     for pos in iter_bits(mask)),
+                )
+            rows = list(enumerate(table.records))
+        conn.executemany(
+            f'INSERT INTO "{name}_fts" (rowid, ' + ', '.join(f'"{column_name(f)}"' for f in text)
+            + ') VALUES (?' + ', ?' * len(text) + ')',
+            # Lowercased here (as SearchIndex does) because SQLite's LIKE only folds ASCII
+            ((pos, *(_text(r.get(f)).lower() for f in text)) for pos, r in rows),
+        )
+        return len(records)
+
+    def sync(self, names=None, force=False):
+        """
+        Copy collections whose source file changed since the last sync (all with force).
+        Returns {collection: rows copied, or None when it was already current}.
+        """
+        conn = self.connection()
+        result = {}
+        for name in names or self.collections:
+            spec = self.collections[name]
+            path = self.datasets.path(spec['file'])
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT signature, sha1 FROM sources WHERE collection = ?', (name,)).fetchone()
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+                ).fetchone()
+                if not force and exists and row and row[0] == repr(signature):
+                    conn.execute('COMMIT')
+                    result[name] = None
+                    self._synced[name] = signature
+                    continue
+                with open(path, 'rb') as f:
+                    sha1 = hashlib.sha1(f.read()).hexdigest()
+                if not force and exists and row and row[1] == sha1:
+                    rows = None  # touched, not edited
+                else:
+                    self._create(conn, name, spec)
+                    rows = self._load(conn, name, spec)
+                conn.execute(
+                    'INSERT OR REPLACE INTO sources (collection, file, signature, sha1, rows, synced_at) '
+                    'VALUES (?, ?, ?, ?, COALESCE(?, (SELECT rows FROM sources WHERE collection = ?)), ?)',
+                    (name, spec['file'], repr(signature), sha1, rows, name, time.time()),
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._synced[name] = signature
+            result[name] = rows
+        return result
+
+    def ensure_current(self, name):
+        """
+        Make `name` queryable and schedule a re-sync if its file changed since it was
+        copied. Only a collection that was never copied is synced inline.
+        """
+        spec = self.collections[name]
+        signature = file_signature(self.datasets.path(spec['file']))
+        if self._synced.get(name) == signature:
+            return
+        if name not in self._synced:
+            row = self.connection().execute(
+                'SELECT signature FROM sources WHERE collection = ?', (name,)
+            ).fetchone()
+            if row is None:
+                self.sync([name])
+                return
+            if row[0] == repr(signature):
+                self._synced[name] = signature
+                return
+        self._sync_in_background(name)
+
+    def _sync_in_background(self, name):
+        with self._lock:
+            if self._syncing.get(name) == os.getpid():
+                return
+            self._syncing[name] = os.getpid()
+        threading.Thread(
+            target=self._background_sync, args=(name,), name=f'sqlite-sync-{name}', daemon=True,
+        ).start()
+
+    def _background_sync(self, name):
+        try:
+            self.sync([name])
+        except Exception as e:
+            print(f'SQLite sync of {name} failed, serving the previous copy: {e}')
+        finally:
+            self._syncing.pop(name, None)
+
+    @contextmanager
+    def reading(self, *names):
+        """Run the queries in the block on one read snapshot (re-entrant); `names` are made current first."""
+        for name in names:
+            self.ensure_current(name)
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.execute('COMMIT')
+
+    def source_version(self, name):
+        """(sha1 of the source file, row count) of the copy of `name` being served."""
+        with self.reading(name) as conn:
+            row = conn.execute('SELECT sha1, rows FROM sources WHERE collection = ?', (name,)).fetchone()
+        return tuple(row) if row else (None, 0)
+
+    def status(self):
+        conn = self.connection()
+        return conn.execute('SELECT collection, file, rows, synced_at FROM sources ORDER BY collection').fetchall()
+
+    # -- queries -----------------------------------------------------------
+
+    def _text_clause(self, name, query, alias='d'):
+        """(sql, params) restricting rows to FTS substring matches of `query` (the FTS text is lowercased)."""
+        q = (query or '').lower().strip()
+        if len(q) >= _TRIGRAM:
+            return f'{alias}.pos IN (SELECT rowid FROM "{name}_fts" WHERE "{name}_fts" MATCH ?)', [_fts_phrase(q)]
+        fields = self._text_fields(self.collections[name])
+        pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        ors = ' OR '.join(f'"{column_name(f)}" LIKE ? ESCAPE \'\\\'' for f in fields)
+        return f'{alias}.pos IN (SELECT rowid FROM "{name}_fts" WHERE {ors})', [pattern] * len(fields)
+
+    def search(self, name, query):
+        """Records whose text fields contain `query`, in file order."""
+        clause, params = self._text_clause(name, query)
+        with self.reading(name) as conn:
+            rows = conn.execute(f'SELECT doc FROM "{name}" d WHERE {clause} ORDER BY d.pos', params).fetchall()
+        return [json.loads(doc) for doc, in rows]
+
+    def _deal_where(self, name, start=None, end=None, query=None, **filters):
+        """(sql, params) for DealTable.where(start, end, **filters) plus an optional text query."""
+        clauses = []
+        params = []
+        if start is not None or end is not None:
+            # Undated rows (ordinal 0) only match when there are no bounds, as in DealTable.date_mask
+            clauses.append('d.date >= ?')
+            params.append(max(start or 1, 1))
+            if end is not None:
+                clauses.append('d.date <= ?')
+                params.append(end)
+        for category, values in filters.items():
+            values = [v.strip().lower() for v in values or () if v.strip()]
+            if not values:
+                continue
+            clauses.append(
+                f'd.pos IN (SELECT pos FROM "{name}_facets" WHERE category = ? AND value IN ('
+                + ', '.join('?' for _ in values) + '))'
+            )
+            params.extend([category, *values])
+        if query and query.strip():
+            clause, text_params = self._text_clause(name, query)
+            clauses.append(clause)
+            params.extend(text_params)
+        return ' AND '.join(clauses) or '1', params
+
+    def deal_page(self, name, start=None, end=None, filters=None, query=None, sort='-date', after=None, limit=50):
+        """
+        One page of a deal collection, like DealTable.where + page.
+        Returns (records, total matches, cursor of the next page or None).
+        """
+        with self.reading(name) as conn:
+            _, rows = self.source_version(name)
+            if after is not None and not 0 <= after < rows:
+                raise ValueError(f'cursor {after} is out of range')
+            where, params = self._deal_where(name, start, end, query, **(filters or {}))
+            total = conn.execute(f'SELECT COUNT(*) FROM "{name}" d WHERE {where}', params).fetchone()[0]
+            key, direction = {
+                '-date': ('d.pos', 'DESC'),
+                'date': ('d.pos', 'ASC'),
+                '-size': ('d.size_desc_rank', 'ASC'),
+                'size': ('d.size_asc_rank', 'ASC'),
+            }[sort]
+            page_where, page_params = where, list(params)
+            if after is not None:
+                page_where += f" AND {key} {'<' if direction == 'DESC' else '>'} ?"
+                page_params.append(after)
+            rows = conn.execute(
+                f'SELECT {key}, doc FROM "{name}" d WHERE {page_where} ORDER BY {key} {direction} LIMIT ?',
+                page_params + [limit + 1],
+            ).fetchall()
+            next_after = rows[limit - 1][0] if len(rows) > limit else None
+        return [json.loads(doc) for _, doc in rows[:limit]], total, next_after
+
+    def deal_group(self, name, category, start=None, end=None, filters=None):
+        """League-table rows for a category, like DealTable.group(category, where(...)); also the total."""
+        with self.reading(name) as conn:
+            where, params = self._deal_where(name, start, end, **(filters or {}))
+            total = conn.execute(f'SELECT COUNT(*) FROM "{name}" d WHERE {where}', params).fetchone()[0]
+            rows = [
+                {
+                    'name': label,
+                    'deals': deals,
+                    'total_size_usd_mn': round(total_size or 0.0, 1),
+                    'disclosed_sizes': disclosed,
+                }
+                for label, deals, total_size, disclosed in conn.execute(
+                    f'SELECT f.label, COUNT(*), SUM(d.size), COUNT(d.size) FROM "{name}_facets" f '
+                    f'JOIN "{name}" d ON d.pos = f.pos WHERE f.category = ? AND {where} GROUP BY f.code',
+                    [category] + params,
+                )
+            ]
+        rows.sort(key=lambda r: (-r['deals'], -r['total_size_usd_mn'], r['name'].lower()))
+        return rows, total
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    command = args.pop(0) if args else 'sync'
+    db_path = os.environ.get('SQLITE_DATA_PATH', DEFAULT_DB)
+    store = SqliteStore(db_path)
+    if command == 'status':
+        for collection, file, rows, synced_at in store.status():
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(synced_at)) if synced_at else '-'
+            print(f'{collection:22} {rows or 0:6} rows  from {file}  (synced {when})')
+        return 0
+    if command != 'sync':
+        print('Usage: python sqlite_store.py [sync [--force] [collection ...] | status]')
+        return 1
+    force = '--force' in args
+    names = [a for a in args if not a.startswith('--')] or None
+    unknown = [n for n in names or () if n not in COLLECTIONS]
+    if unknown:
+        print(f"Unknown collection(s): {', '.join(unknown)} (choose from {', '.join(COLLECTIONS)})")
+        return 1
+    started = time.perf_counter()
+    for name, rows in store.sync(names, force=force).items():
+        print(f'  {name}: ' + ('up to date' if rows is None else f'{rows} rows copied'))
+    print(f'✅ Synced {db_path} in {(time.perf_counter() - started) * 1000:.0f}ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
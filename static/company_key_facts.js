@@ -956,6 +956,35 @@
         }
     }
 
+    /**
+     * Portfolio lists are fetched with ?exclude=financials; load the tables for one
+     * company from /api/company/<slug> when it is opened.
+     * @param {object} company - row with .slug (financials missing)
+     * @returns {Promise<boolean>} true when company.financials was filled in
+     */
+    function ensureFinancials(company) {
+        if (!company || typeof company !== 'object' || 'financials' in company || !company.slug) {
+            return Promise.resolve(false);
+        }
+        if (!company._financialsRequest) {
+            company._financialsRequest = fetch('/api/company/' + encodeURIComponent(company.slug))
+                .then(function (res) {
+                    return res.ok ? res.json() : null;
+                })
+                .then(function (data) {
+                    const f = data && data.success && data.company ? data.company.financials : undefined;
+                    company.financials = f === undefined ? null : f;
+                    return hasFinancialsPayload(company.financials);
+                })
+                .catch(function (err) {
+                    console.error('Financials load failed:', err);
+                    delete company._financialsRequest;
+                    return false;
+                });
+        }
+        return company._financialsRequest;
+    }
+
     function getOverviewText(company) {
         const split = splitOverviewAndSnapshot(company);
         if (split.overview) return split.overview;
@@ -973,5 +1002,6 @@
         getOverviewText: getOverviewText,
         renderKeyFactsSection: renderKeyFactsSection,
         renderFinancialsSection: renderFinancialsSection,
+        ensureFinancials: ensureFinancials,
     };
 })(typeof window !== 'undefined' ? window : this);
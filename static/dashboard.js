@@ -377,7 +377,7 @@ let trendsCountryChartInstance = null;
 
 async function loadPortfolioTrends() {
     try {
-        const response = await fetch('/api/portfolio?_=' + Date.now(), { cache: 'no-store' });
+        const response = await fetch('/api/portfolio?fields=entry,sector,market,headquarters,country', { cache: 'no-cache' });
         const data = await response.json();
         if (!data.success || !data.companies || data.companies.length === 0) {
             renderTrendsEmpty();
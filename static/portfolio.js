@@ -145,7 +145,7 @@ async function loadPortfolio() {
     hideStatusMessage();
     
     try {
-        const response = await fetch('/api/portfolio?_=' + Date.now(), { cache: 'no-store' });
+        const response = await fetch('/api/portfolio?exclude=financials', { cache: 'no-cache' });
         const data = await response.json();
         
         if (data.success) {
@@ -1723,6 +1723,14 @@ async function openCompanyModal(company) {
         modalFinancialsEl.style.display = 'none';
         modalFinancialsEl.hidden = true;
     }
+    // The grid is loaded without financials; fetch them for this company only
+    if (window.companyKeyFacts && companyKeyFacts.ensureFinancials) {
+        companyKeyFacts.ensureFinancials(company).then(function (loaded) {
+            if (!loaded || document.getElementById('modalCompanyName').textContent !== company.company) return;
+            if (modalKeyFactsEl) companyKeyFacts.renderKeyFactsSection(modalKeyFactsEl, company);
+            if (modalFinancialsEl) companyKeyFacts.renderFinancialsSection(modalFinancialsEl, company);
+        });
+    }
 
     // Investment Details
     document.getElementById('modalPEFirm').textContent = company.source || 'N/A';
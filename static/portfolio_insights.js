@@ -69,7 +69,7 @@ function highlightActiveInsightsTab() {
 }
 
 async function loadPortfolioData() {
-    const response = await fetch('/api/portfolio?_=' + Date.now(), { cache: 'no-store' });
+    const response = await fetch('/api/portfolio?exclude=financials', { cache: 'no-cache' });
     const data = await response.json();
     portfolioCompanies = data.success && Array.isArray(data.companies) ? data.companies : [];
 }
@@ -803,15 +803,9 @@ async function loadNews() {
     hideStatusMessage();
     
     try {
-        console.log('🔍 Loading investment news with cache-busting...');
-        const timestamp = Date.now();
-        const response = await fetch('/api/investment-news?_=' + timestamp + '&t=' + Math.random(), {
-            cache: 'no-store',
-            headers: {
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache'
-            }
-        });
+        console.log('🔍 Loading investment news...');
+        // The API sends Cache-Control: no-cache + an ETag, so the browser revalidates every time
+        const response = await fetch('/api/investment-news', { cache: 'no-cache' });
         const data = await response.json();
         
         if (data.success && data.news) {
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Add missing IK Partners portfolio companies (verified against online sources)"""
 
-import json
+from atomic_write import update_json
 
 # 50 missing IK Partners companies from user's table - verified via web research
 NEW_IK_PARTNERS = [
@@ -62,23 +62,22 @@ NEW_IK_PARTNERS = [
 ]
 
 def main():
-    with open('portfolio_enriched.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    existing = {(c.get('company'), c.get('source')) for c in data['companies']}
     added = 0
-    
-    for co in NEW_IK_PARTNERS:
-        co['source'] = 'IK Partners'
-        co['status'] = 'Active'
-        key = (co['company'], 'IK Partners')
-        if key not in existing:
-            data['companies'].append(co)
-            existing.add(key)
-            added += 1
-    
-    with open('portfolio_enriched.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def add_companies(data):
+        nonlocal added
+        existing = {(c.get('company'), c.get('source')) for c in data['companies']}
+        for co in NEW_IK_PARTNERS:
+            co['source'] = 'IK Partners'
+            co['status'] = 'Active'
+            key = (co['company'], 'IK Partners')
+            if key not in existing:
+                data['companies'].append(co)
+                existing.add(key)
+                added += 1
+        return data
+
+    data = update_json('portfolio_enriched.json', add_companies)
     
     ik_count = len([c for c in data['companies'] if c.get('source') == 'IK Partners'])
     print(f"Added {added} IK Partners companies. Total IK Partners: {ik_count}")
@@ -9,6 +9,8 @@ import re
 from pathlib import Path
 from difflib import SequenceMatcher
 
+from atomic_write import update_json, write_json
+
 # Try rapidfuzz for better fuzzy matching, fallback to difflib
 try:
     from rapidfuzz import fuzz
@@ -206,22 +208,25 @@ def main():
 
     # Output verdane_entry_years.json
     output = {"metadata": {"source": "deal_flow_database.json + deals_data.json", "match_count": matched, "total": len(entry_years)}, "entry_years": entry_years}
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    write_json(output_path, output)
     print(f"Wrote {output_path}")
 
-    # Update portfolio_enriched.json
+    # Update portfolio_enriched.json (re-read under its write lock, it may have changed while matching)
     entry_lookup = dict(entry_years)
     updated = 0
-    for c in portfolio.get("companies", []):
-        if c.get("source") == "Verdane" and c.get("company"):
-            name = c.get("company", "").strip()
-            new_entry = entry_lookup.get(name, "2020")
-            if c.get("entry") != new_entry:
-                c["entry"] = new_entry
-                updated += 1
-    with open(portfolio_path, "w", encoding="utf-8") as f:
-        json.dump(portfolio, f, indent=2, ensure_ascii=False)
+
+    def apply_entry_years(portfolio):
+        nonlocal updated
+        for c in portfolio.get("companies", []):
+            if c.get("source") == "Verdane" and c.get("company"):
+                name = c.get("company", "").strip()
+                new_entry = entry_lookup.get(name, "2020")
+                if c.get("entry") != new_entry:
+                    c["entry"] = new_entry
+                    updated += 1
+        return portfolio
+
+    update_json(portfolio_path, apply_entry_years)
     print(f"Updated {updated} entry years in {portfolio_path}")
 
 
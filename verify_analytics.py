@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """
 Verification script for Moderation analytics.
-Queries the real page_views data from forum.db - NO fake numbers.
+Queries the real page-view data from forum.db - NO fake numbers.
 Outputs: unique views per day, total views per day, sample raw records.
 """
 import os
 import sqlite3
 
+from hyperloglog import register_sqlite_functions
+
 FORUM_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forum.db")
 
 
@@ -18,30 +20,34 @@ def main():
 
     conn = sqlite3.connect(FORUM_DB)
     conn.row_factory = sqlite3.Row
+    register_sqlite_functions(conn)
     cur = conn.cursor()
 
-    # Verify table exists and get row count
-    cur.execute(
-        "SELECT COUNT(*) as c FROM page_views"
-    )
+    # Totals come from the daily rollups, which keep counting after old raw rows are pruned
+    cur.execute("SELECT COALESCE(SUM(views), 0) as c FROM page_view_daily")
     total = cur.fetchone()["c"]
+    cur.execute("SELECT COUNT(*) as c FROM page_views")
+    raw_total = cur.fetchone()["c"]
 
     print("=" * 60)
     print("ANALYTICS VERIFICATION – Data from forum.db (real, not made up)")
     print("=" * 60)
-    print(f"\nTotal page view records in database: {total}")
+    print(f"\nTotal page views (rollups): {total}")
+    print(f"Raw page view records still in database: {raw_total}")
     if total == 0:
         print("No page views logged yet.")
         conn.close()
         return
 
-    # Unique visitors (by ip_hash) per day – last 30 days
+    # Unique visitors (HyperLogLog estimate over ip_hash) per day – last 30 days
     cur.execute("""
-        SELECT date, COUNT(DISTINCT ip_hash) as unique_visitors, COUNT(*) as total_views
-        FROM page_views
-        WHERE ip_hash IS NOT NULL AND ip_hash != ''
-        GROUP BY date
-        ORDER BY date DESC
+        SELECT v.date, u.unique_visitors, v.total_views
+        FROM (SELECT date, SUM(views) as total_views FROM page_view_daily GROUP BY date) v
+        LEFT JOIN (
+            SELECT date, hll_count(sketch) as unique_visitors FROM page_view_uniques
+            WHERE country = '' GROUP BY date
+        ) u ON u.date = v.date
+        ORDER BY v.date DESC
         LIMIT 30
     """)
     rows = cur.fetchall()
@@ -50,35 +56,30 @@ def main():
     print(f"{'Date':<12} {'Unique':>8} {'Total':>8}")
     print("-" * 30)
     for r in rows:
-        print(f"{r['date']:<12} {r['unique_visitors']:>8} {r['total_views']:>8}")
+        print(f"{r['date']:<12} {r['unique_visitors'] or 0:>8} {r['total_views']:>8}")
 
     # Total unique visitors (all time)
-    cur.execute(
-        "SELECT COUNT(DISTINCT ip_hash) as c FROM page_views WHERE ip_hash IS NOT NULL AND ip_hash != ''"
-    )
+    cur.execute("SELECT hll_count(sketch) as c FROM page_view_uniques WHERE date = 'all' AND country = ''")
     unique_all = cur.fetchone()["c"]
-    print(f"\nAll-time unique visitors (by IP hash): {unique_all}")
-
-    # Geography (if country column exists)
-    try:
-        cur.execute("""
-            SELECT COALESCE(country, 'Unknown') as country, COUNT(DISTINCT ip_hash) as cnt
-            FROM page_views
-            WHERE ip_hash IS NOT NULL AND ip_hash != ''
-            GROUP BY COALESCE(country, 'Unknown')
-            ORDER BY cnt DESC
-        """)
-        geo = cur.fetchall()
-        if geo:
-            print("\n--- GEOGRAPHY (unique visitors by country) ---")
-            for r in geo:
-                print(f"  {r['country']:<20} {r['cnt']}")
-    except Exception:
-        pass
+    print(f"\nAll-time unique visitors (by IP hash, ~2% estimate): {unique_all}")
+
+    # Geography
+    cur.execute("""
+        SELECT country, hll_count(sketch) as cnt
+        FROM page_view_uniques
+        WHERE country != '' AND date != 'all'
+        GROUP BY country
+        ORDER BY cnt DESC
+    """)
+    geo = cur.fetchall()
+    if geo:
+        print("\n--- GEOGRAPHY (unique visitors by country) ---")
+        for r in geo:
+            print(f"  {r['country']:<20} {r['cnt']}")
 
     # Top paths
     cur.execute("""
-        SELECT path, COUNT(*) as cnt FROM page_views
+        SELECT path, SUM(views) as cnt FROM page_view_daily
         GROUP BY path ORDER BY cnt DESC LIMIT 15
     """)
     paths = cur.fetchall()
@@ -97,7 +98,8 @@ def main():
         print(f"  {s['created_at'][:19]} | {s['date']} | {s['path']:<40} | ip_hash: {s['ip_hash'] or '(empty)'}")
 
     print("\n--- NOTE ---")
-    print("  Data: path, date, ip_hash, country (from ipapi.co geo lookup).")
+    print("  Data: path, date, ip_hash, country (from the local GeoIP database).")
+    print("  Totals and unique visitors are read from page_view_daily / page_view_uniques.")
 
     conn.close()
 